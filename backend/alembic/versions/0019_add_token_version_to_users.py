@@ -0,0 +1,28 @@
+"""add token_version to users
+
+Revision ID: 0019_add_token_version_to_users
+Revises: 0018_add_collection_type_to_collections
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0019_add_token_version_to_users"
+down_revision: Union[str, None] = "0018_add_collection_type_to_collections"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,57 @@
+"""add composite and partial indexes for hot query shapes
+
+Revision ID: 0021_add_composite_indexes_for_hot_queries
+Revises: 0020_add_refresh_tokens_table
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0021_add_composite_indexes_for_hot_queries"
+down_revision: Union[str, None] = "0020_add_refresh_tokens_table"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial on live collections?)
+INDEXES = [
+    ("ix_collections_user_id_scheduled_at_live", "collections", ["user_id", "scheduled_at"], True),
+    ("ix_collections_driver_id_scheduled_at_live", "collections", ["driver_id", "scheduled_at"], True),
+    ("ix_collections_slot_id_scheduled_at", "collections", ["collection_slot_id", "scheduled_at"], False),
+    ("ix_wallet_transactions_user_id_ts", "wallet_transactions", ["user_id", "ts"], False),
+    ("ix_subscriptions_user_id_id_desc", "subscriptions", ["user_id", sa.text("id DESC")], False),
+    ("ix_notifications_user_id_created_at", "notifications", ["user_id", "created_at"], False),
+    ("ix_driver_earnings_driver_id_created_at", "driver_earnings", ["driver_id", "created_at"], False),
+    ("ix_claims_status_created_at", "claims", ["status", "created_at"], False),
+]
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    def _create_all() -> None:
+        for name, table, columns, live_only in INDEXES:
+            kwargs = {}
+            if live_only:
+                kwargs["postgresql_where"] = sa.text("is_archived = false")
+                kwargs["sqlite_where"] = sa.text("is_archived = 0")
+            if is_postgres:
+                # Build without blocking writes on large production tables.
+                kwargs["postgresql_concurrently"] = True
+            op.create_index(name, table, columns, **kwargs)
+
+    if is_postgres:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            _create_all()
+    else:
+        _create_all()
+
+
+def downgrade() -> None:
+    for name, table, _columns, _live_only in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
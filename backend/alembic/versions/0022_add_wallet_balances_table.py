@@ -0,0 +1,43 @@
+"""add wallet_balances table and backfill from the ledger
+
+Revision ID: 0022_add_wallet_balances_table
+Revises: 0021_add_composite_indexes_for_hot_queries
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0022_add_wallet_balances_table"
+down_revision: Union[str, None] = "0021_add_composite_indexes_for_hot_queries"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_balances",
+        sa.Column("user_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("balance_cents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_updated", sa.DateTime(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Same rule as services.wallet: donations are in the ledger but not in the balance.
+    op.execute(
+        """
+        INSERT INTO wallet_balances (user_id, balance_cents, last_updated, version)
+        SELECT user_id,
+               COALESCE(SUM(CASE WHEN kind = 'donation' THEN 0 ELSE amount_cents END), 0),
+               MAX(ts),
+               COUNT(*)
+        FROM wallet_transactions
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("wallet_balances")
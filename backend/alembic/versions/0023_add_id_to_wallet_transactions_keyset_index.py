@@ -0,0 +1,43 @@
+"""add id to the wallet_transactions (user_id, ts) index for keyset paging
+
+Revision ID: 0023_add_id_to_wallet_transactions_keyset_index
+Revises: 0022_add_wallet_balances_table
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0023_add_id_to_wallet_transactions_keyset_index"
+down_revision: Union[str, None] = "0022_add_wallet_balances_table"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _swap(create_name: str, create_columns: list[str], drop_name: str) -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    kwargs = {"postgresql_concurrently": True} if is_postgres else {}
+
+    def _run() -> None:
+        # Create first so history reads are never left without an index.
+        op.create_index(create_name, "wallet_transactions", create_columns, **kwargs)
+        op.drop_index(drop_name, table_name="wallet_transactions", **kwargs)
+
+    if is_postgres:
+        # CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            _run()
+    else:
+        _run()
+
+
+def upgrade() -> None:
+    # History pages are ordered and keyed by (ts, id); with id in the index
+    # Postgres can seek straight to the cursor without a sort.
+    _swap("ix_wallet_transactions_user_id_ts_id", ["user_id", "ts", "id"], "ix_wallet_transactions_user_id_ts")
+
+
+def downgrade() -> None:
+    _swap("ix_wallet_transactions_user_id_ts", ["user_id", "ts"], "ix_wallet_transactions_user_id_ts_id")
@@ -0,0 +1,99 @@
+"""add collection_id to wallet_transactions, backfilled from notes
+
+Revision ID: 0024_add_collection_id_to_wallet_transactions
+Revises: 0023_add_id_to_wallet_transactions_keyset_index
+Create Date: 2026-10-17 00:00:00
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0024_add_collection_id_to_wallet_transactions"
+down_revision: Union[str, None] = "0023_add_id_to_wallet_transactions_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+# Notes written by services.wallet / services.drivers: "... collection #123 ..."
+COLLECTION_ID_PATTERN = re.compile(r"collection #(\d+)", re.IGNORECASE)
+LINKED_KINDS = ("collection_credit", "collection_completed", "donation")
+
+
+def _backfill(conn: sa.engine.Connection) -> None:
+    wt = sa.table(
+        "wallet_transactions",
+        sa.column("id", sa.Integer),
+        sa.column("kind", sa.String),
+        sa.column("note", sa.String),
+        sa.column("collection_id", sa.Integer),
+    )
+    select_batch = (
+        sa.select(wt.c.id, wt.c.note)
+        .where(wt.c.id > sa.bindparam("last_id"), wt.c.kind.in_(LINKED_KINDS), wt.c.note.is_not(None))
+        .order_by(wt.c.id)
+        .limit(BATCH_SIZE)
+    )
+    update_row = wt.update().where(wt.c.id == sa.bindparam("row_id")).values(collection_id=sa.bindparam("cid"))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(select_batch, {"last_id": last_id}).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        params = []
+        for row in rows:
+            match = COLLECTION_ID_PATTERN.search(row.note)
+            if match:
+                params.append({"row_id": row.id, "cid": int(match.group(1))})
+        if params:
+            conn.execute(update_row, params)
+
+    # Legacy duplicates (same collection credited twice) would block the unique
+    # index: keep the link on the earliest row and leave the rest unlinked.
+    conn.execute(
+        sa.text(
+            """
+            UPDATE wallet_transactions SET collection_id = NULL
+            WHERE collection_id IS NOT NULL
+              AND id NOT IN (
+                SELECT keep_id FROM (
+                  SELECT MIN(id) AS keep_id FROM wallet_transactions
+                  WHERE collection_id IS NOT NULL
+                  GROUP BY collection_id, kind
+                ) AS firsts
+              )
+            """
+        )
+    )
+
+
+def upgrade() -> None:
+    op.add_column("wallet_transactions", sa.Column("collection_id", sa.Integer(), nullable=True))
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        # Commit each batch on its own and build the index without blocking writes.
+        with op.get_context().autocommit_block():
+            _backfill(conn)
+            op.create_index(
+                "uq_wallet_transactions_collection_id_kind",
+                "wallet_transactions",
+                ["collection_id", "kind"],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+    else:
+        _backfill(conn)
+        op.create_index(
+            "uq_wallet_transactions_collection_id_kind", "wallet_transactions", ["collection_id", "kind"], unique=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_wallet_transactions_collection_id_kind", table_name="wallet_transactions")
+    op.drop_column("wallet_transactions", "collection_id")
@@ -0,0 +1,52 @@
+"""add keyset indexes for the admin collection list and its filters
+
+Revision ID: 0025_add_admin_collection_list_indexes
+Revises: 0024_add_collection_id_to_wallet_transactions
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0025_add_admin_collection_list_indexes"
+down_revision: Union[str, None] = "0024_add_collection_id_to_wallet_transactions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial on live collections?)
+INDEXES = [
+    ("ix_collections_scheduled_at_id_live", "collections", ["scheduled_at", "id"], True),
+    ("ix_collections_status_scheduled_at_id_live", "collections", ["status", "scheduled_at", "id"], True),
+    ("ix_collections_return_point_id_scheduled_at_id_live", "collections", ["return_point_id", "scheduled_at", "id"], True),
+    ("ix_drivers_zone", "drivers", ["zone"], False),
+]
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    def _create_all() -> None:
+        for name, table, columns, live_only in INDEXES:
+            kwargs = {}
+            if live_only:
+                kwargs["postgresql_where"] = sa.text("is_archived = false")
+                kwargs["sqlite_where"] = sa.text("is_archived = 0")
+            if is_postgres:
+                kwargs["postgresql_concurrently"] = True
+            op.create_index(name, table, columns, **kwargs)
+
+    if is_postgres:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            _create_all()
+    else:
+        _create_all()
+
+
+def downgrade() -> None:
+    for name, table, _columns, _live_only in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""add gazetteer-resolved coordinates to users and collections
+
+Revision ID: 0026_add_coordinates_to_users_and_collections
+Revises: 0025_add_admin_collection_list_indexes
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0026_add_coordinates_to_users_and_collections"
+down_revision: Union[str, None] = "0025_add_admin_collection_list_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: a metadata-only change on Postgres. Existing rows are
+    # filled in by `python -m app.scripts.geocode_addresses`.
+    op.add_column("users", sa.Column("lat", sa.Float(), nullable=True))
+    op.add_column("users", sa.Column("lng", sa.Float(), nullable=True))
+    op.add_column("collections", sa.Column("pickup_lat", sa.Float(), nullable=True))
+    op.add_column("collections", sa.Column("pickup_lng", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("collections", "pickup_lng")
+    op.drop_column("collections", "pickup_lat")
+    op.drop_column("users", "lng")
+    op.drop_column("users", "lat")
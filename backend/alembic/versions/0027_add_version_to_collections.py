@@ -0,0 +1,28 @@
+"""add version to collections
+
+Revision ID: 0027_add_version_to_collections
+Revises: 0026_add_coordinates_to_users_and_collections
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0027_add_version_to_collections"
+down_revision: Union[str, None] = "0026_add_coordinates_to_users_and_collections"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "collections",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("collections", "version")
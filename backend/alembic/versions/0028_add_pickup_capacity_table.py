@@ -0,0 +1,112 @@
+"""add pickup_capacity table and backfill it from upcoming collections
+
+Revision ID: 0028_add_pickup_capacity_table
+Revises: 0027_add_version_to_collections
+Create Date: 2026-10-17 00:00:00
+
+"""
+import re
+from collections import Counter
+from datetime import datetime, time, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0028_add_pickup_capacity_table"
+down_revision: Union[str, None] = "0027_add_version_to_collections"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of core.eircode.routing_key and services.capacity window bucketing,
+# with the settings defaults of this revision (PICKUP_WINDOW_MINUTES=120,
+# PICKUP_WINDOW_CAPACITY=12). Deployments that override those should run
+# `python -m app.scripts.rebuild_capacity` after upgrading.
+_ROUTING_KEY = r"(?:[AC-FHKNPRTV-Y]\d{2}|D6W)"
+_EIRCODE_RE = re.compile(rf"\b({_ROUTING_KEY})\s?[0-9AC-FHKNPRTV-Y]{{4}}\b", re.IGNORECASE)
+_ROUTING_KEY_RE = re.compile(rf"^{_ROUTING_KEY}$", re.IGNORECASE)
+_DUBLIN_DISTRICT_RE = re.compile(r"\bDublin\s+(\d{1,2}W?)\b", re.IGNORECASE)
+_UNZONED = "*"
+_SERVICE_START = time(8, 0)
+_WINDOW_MINUTES = 120
+_WINDOWS_PER_DAY = 6  # 08:00-20:00
+_CAPACITY = 12
+
+
+def _zone(address: str | None) -> str:
+    if not address:
+        return _UNZONED
+    m = _EIRCODE_RE.search(address)
+    if m:
+        return m.group(1).upper()
+    stripped = address.strip()
+    if _ROUTING_KEY_RE.match(stripped):
+        return stripped.upper()
+    m = _DUBLIN_DISTRICT_RE.search(address)
+    if m:
+        district = m.group(1).upper()
+        if district == "6W":
+            return "D6W"
+        if district.isdigit():
+            return f"D{int(district):02d}"
+    return _UNZONED
+
+
+def _window_start(scheduled_at: datetime) -> datetime:
+    day_start = datetime.combine(scheduled_at.date(), _SERVICE_START)
+    minutes = max(0, int((scheduled_at - day_start).total_seconds()) // 60)
+    index = min(minutes // _WINDOW_MINUTES, _WINDOWS_PER_DAY - 1)
+    return day_start + timedelta(minutes=index * _WINDOW_MINUTES)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pickup_capacity",
+        sa.Column("zone", sa.String(8), primary_key=True),
+        sa.Column("starts_at", sa.DateTime(), primary_key=True),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("booked", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Count the live, non-canceled bookings from today on, so booking doesn't
+    # start from zero. The zone is parsed from the free-text address, so SQL
+    # groups by (address, time) and the groups are bucketed here.
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    collections = sa.table(
+        "collections",
+        sa.column("pickup_address", sa.String()),
+        sa.column("scheduled_at", sa.DateTime()),
+        sa.column("status", sa.String()),
+        sa.column("is_archived", sa.Boolean()),
+    )
+    rows = op.get_bind().execute(
+        sa.select(collections.c.pickup_address, collections.c.scheduled_at, sa.func.count())
+        .where(
+            collections.c.is_archived == sa.false(),
+            collections.c.status != "canceled",
+            collections.c.scheduled_at >= today,
+        )
+        .group_by(collections.c.pickup_address, collections.c.scheduled_at)
+    )
+    counts: Counter = Counter()
+    for address, scheduled_at, n in rows:
+        counts[(_zone(address), _window_start(scheduled_at))] += n
+    if counts:
+        table = sa.table(
+            "pickup_capacity",
+            sa.column("zone", sa.String()),
+            sa.column("starts_at", sa.DateTime()),
+            sa.column("capacity", sa.Integer()),
+            sa.column("booked", sa.Integer()),
+        )
+        op.bulk_insert(
+            table,
+            [
+                {"zone": zone, "starts_at": starts_at, "capacity": _CAPACITY, "booked": n}
+                for (zone, starts_at), n in counts.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("pickup_capacity")
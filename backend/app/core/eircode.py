@@ -0,0 +1,90 @@
+"""
+Eircode parsing.
+
+An Eircode is a 3-character routing key (letter, two digits, or the special
+"D6W") followed by a 4-character unique identifier, e.g. "D04 X2Y3". The
+routing key is the postal district, which is what driver zones are keyed on
+(Dublin's are D01-D24 and D6W). Driver zones are labels from the driver app
+("Dublin 2-4", "South County"), which zone_routing_keys() expands into keys.
+"""
+
+import re
+
+_ROUTING_KEY = r"(?:[AC-FHKNPRTV-Y]\d{2}|D6W)"
+_UNIQUE_ID = r"[0-9AC-FHKNPRTV-Y]{4}"
+
+EIRCODE_RE = re.compile(rf"\b({_ROUTING_KEY})\s?({_UNIQUE_ID})\b", re.IGNORECASE)
+ROUTING_KEY_RE = re.compile(rf"^{_ROUTING_KEY}$", re.IGNORECASE)
+# Free-text Dublin postal districts ("Dublin 4", "Dublin 6W") map onto the routing key.
+_DUBLIN_DISTRICT_RE = re.compile(r"\bDublin\s+(\d{1,2}W?)\b", re.IGNORECASE)
+_DISTRICT_RANGE_RE = re.compile(r"^(?:Dublin\s+|D)(\d{1,2})\s*-\s*(\d{1,2})$", re.IGNORECASE)
+# County Dublin outside the numbered districts, as offered by the driver app.
+COUNTY_ROUTING_KEYS = {
+    "SOUTH COUNTY": ("A94", "A96", "D14", "D16", "D18", "D22", "D24"),
+    "NORTH COUNTY": ("D11", "D13", "D15", "D17", "K32", "K34", "K36", "K45", "K56", "K67"),
+}
+
+
+def normalize(code: str) -> str | None:
+    """Canonical "RRR UUUU" form of a full Eircode, or None if `code` isn't one."""
+    m = EIRCODE_RE.fullmatch(code.strip())
+    if m is None:
+        return None
+    return f"{m.group(1).upper()} {m.group(2).upper()}"
+
+
+def find_eircode(text: str | None) -> str | None:
+    """First full Eircode found in free text, normalized."""
+    if not text:
+        return None
+    m = EIRCODE_RE.search(text)
+    return f"{m.group(1).upper()} {m.group(2).upper()}" if m else None
+
+
+def routing_key(text: str | None) -> str | None:
+    """
+    Routing key (postal district) for an address or Eircode.
+
+    Tries a full Eircode, then a bare routing key, then a "Dublin N" district.
+    """
+    if not text:
+        return None
+    code = find_eircode(text)
+    if code:
+        return code[:3]
+    stripped = text.strip()
+    if ROUTING_KEY_RE.match(stripped):
+        return stripped.upper()
+    m = _DUBLIN_DISTRICT_RE.search(text)
+    if m:
+        district = m.group(1).upper()
+        return "D6W" if district == "6W" else f"D{int(district):02d}" if district.isdigit() else None
+    return None
+
+
+def zone_routing_keys(label: str | None) -> frozenset[str]:
+    """
+    Routing keys covered by a zone label: a routing key or "Dublin N", a
+    "Dublin N-M" range (D6W goes with 6), a county label, or a comma-separated
+    list of those. Empty when nothing in the label is recognised.
+    """
+    keys: set[str] = set()
+    for part in (label or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        county = COUNTY_ROUTING_KEYS.get(" ".join(part.upper().split()))
+        if county:
+            keys.update(county)
+            continue
+        m = _DISTRICT_RANGE_RE.match(part)
+        if m:
+            low, high = sorted((int(m.group(1)), int(m.group(2))))
+            keys.update(f"D{n:02d}" for n in range(low, high + 1))
+            if low <= 6 <= high:
+                keys.add("D6W")
+            continue
+        key = routing_key(part)
+        if key:
+            keys.add(key)
+    return frozenset(keys)
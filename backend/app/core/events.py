@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Iterable
 
 logger = logging.getLogger("gc.events")
 
@@ -19,6 +20,17 @@ async def publish_event(event_name: str, payload: dict[str, Any]) -> None:
             logger.exception("Handler %s failed for event %s", handler.__name__, event_name)
 
 
+async def publish_events(events: Iterable[tuple[str, dict[str, Any]]], concurrency: int = 10) -> None:
+    """Publish many (event_name, payload) pairs, at most `concurrency` at a time."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def _one(event_name: str, payload: dict[str, Any]) -> None:
+        async with gate:
+            await publish_event(event_name, payload)
+
+    await asyncio.gather(*(_one(name, payload) for name, payload in events))
+
+
 def clear_handlers(event_name: str | None = None) -> None:
     if event_name is None:
         _handlers.clear()
@@ -0,0 +1,147 @@
+"""
+Offline Eircode gazetteer: Eircode / routing key -> (lat, lng), no network.
+
+On-disk format (little-endian):
+
+    header   b"GCEG", u16 version (=1), u16 routing-key count K, u32 record count N
+    index    K x 12 bytes: 3-byte routing key, 1 pad, u32 first record, u32 end record
+    records  N x 16 bytes, sorted by key: 7-byte key, 1 pad, i32 lat * 1e6, i32 lng * 1e6
+
+A record key is a full Eircode without the space ("D04X2Y3") or a bare
+routing key padded with spaces ("D04    "), which sorts first in its range
+and holds the district centroid. The file is mmapped; only the small index
+is read into memory, and a lookup binary-searches its routing key's range.
+A national file (~2.2M codes) is ~35 MB on disk and opens instantly.
+
+Build one from CSV with `python -m app.scripts.build_gazetteer`.
+"""
+
+import logging
+import mmap
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from ..config import get_settings
+from .eircode import find_eircode, routing_key
+from .geo import DISTRICT_CENTROIDS, LatLng
+
+MAGIC = b"GCEG"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+_INDEX = struct.Struct("<3sxII")
+_RECORD = struct.Struct("<7sxii")
+_SCALE = 1_000_000
+_KEY_LEN = 7
+
+logger = logging.getLogger("gc.gazetteer")
+
+
+def _record_key(code: str) -> bytes:
+    """Record key for "D04 X2Y3" / "D04X2Y3" / "D04"."""
+    key = code.replace(" ", "").upper()
+    if len(key) not in (3, _KEY_LEN):
+        raise ValueError(f"Not an Eircode or routing key: {code!r}")
+    return key.ljust(_KEY_LEN).encode("ascii")
+
+
+def build(entries: Iterable[tuple[str, float, float]]) -> bytes:
+    """
+    Serialize (code, lat, lng) entries. Routing keys without their own entry
+    get the mean of their full codes as centroid. Later duplicates win.
+    """
+    records: dict[bytes, tuple[int, int]] = {}
+    for code, lat, lng in entries:
+        records[_record_key(code)] = (round(lat * _SCALE), round(lng * _SCALE))
+    sums: dict[bytes, list[int]] = {}
+    for key, (lat, lng) in records.items():
+        acc = sums.setdefault(key[:3], [0, 0, 0])
+        acc[0] += lat
+        acc[1] += lng
+        acc[2] += 1
+    for rk, (lat, lng, n) in sums.items():
+        records.setdefault(rk.ljust(_KEY_LEN), (lat // n, lng // n))
+
+    keys = sorted(records)
+    index: list[tuple[bytes, int, int]] = []
+    for i, key in enumerate(keys):
+        if index and index[-1][0] == key[:3]:
+            index[-1] = (key[:3], index[-1][1], i + 1)
+        else:
+            index.append((key[:3], i, i + 1))
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, len(index), len(keys)))
+    for rk, start, end in index:
+        out += _INDEX.pack(rk, start, end)
+    for key in keys:
+        out += _RECORD.pack(key, *records[key])
+    return bytes(out)
+
+
+class Gazetteer:
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        magic, version, key_count, self.size = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a GCEG v1 gazetteer")
+        self._data = data
+        self._records_at = _HEADER.size + key_count * _INDEX.size
+        self._index: dict[bytes, tuple[int, int]] = {}
+        for i in range(key_count):
+            rk, start, end = _INDEX.unpack_from(data, _HEADER.size + i * _INDEX.size)
+            self._index[rk] = (start, end)
+
+    @classmethod
+    def open(cls, path: str | Path) -> "Gazetteer":
+        with open(path, "rb") as fh:
+            return cls(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _key_at(self, i: int) -> bytes:
+        at = self._records_at + i * _RECORD.size
+        return bytes(self._data[at:at + _KEY_LEN])
+
+    def _coords_at(self, i: int) -> LatLng:
+        _, lat, lng = _RECORD.unpack_from(self._data, self._records_at + i * _RECORD.size)
+        return lat / _SCALE, lng / _SCALE
+
+    def _find(self, key: bytes) -> LatLng | None:
+        span = self._index.get(key[:3])
+        if span is None:
+            return None
+        lo, hi = span
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < span[1] and self._key_at(lo) == key:
+            return self._coords_at(lo)
+        return None
+
+    def lookup(self, text: str | None) -> LatLng | None:
+        """
+        Coordinates for an address or code: the exact Eircode if known,
+        otherwise its routing key's centroid.
+        """
+        code = find_eircode(text)
+        if code:
+            exact = self._find(_record_key(code))
+            if exact is not None:
+                return exact
+        key = routing_key(text)
+        return self._find(_record_key(key)) if key else None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """The configured gazetteer file, or the built-in Dublin district centroids."""
+    path = get_settings().eircode_gazetteer_path
+    if path:
+        if Path(path).exists():
+            return Gazetteer.open(path)
+        logger.warning("Eircode gazetteer %s not found; using district centroids only", path)
+    return Gazetteer(build((key, lat, lng) for key, (lat, lng) in DISTRICT_CENTROIDS.items()))
+
+
+def geocode(address: str | None) -> LatLng | None:
+    return get_gazetteer().lookup(address)
@@ -0,0 +1,44 @@
+"""
+Coordinates and distances.
+
+DISTRICT_CENTROIDS places a stop at the approximate centre of its Dublin
+postal district (Eircode routing key) when nothing more precise is known.
+"""
+
+import math
+
+LatLng = tuple[float, float]
+
+_EARTH_RADIUS_KM = 6371.0088
+
+DISTRICT_CENTROIDS: dict[str, LatLng] = {
+    "D01": (53.3522, -6.2606),
+    "D02": (53.3381, -6.2525),
+    "D03": (53.3634, -6.2183),
+    "D04": (53.3282, -6.2280),
+    "D05": (53.3845, -6.1905),
+    "D06": (53.3180, -6.2650),
+    "D6W": (53.3090, -6.3000),
+    "D07": (53.3550, -6.2850),
+    "D08": (53.3380, -6.2900),
+    "D09": (53.3780, -6.2500),
+    "D10": (53.3380, -6.3450),
+    "D11": (53.3930, -6.2900),
+    "D12": (53.3220, -6.3200),
+    "D13": (53.3900, -6.1450),
+    "D14": (53.2950, -6.2500),
+    "D15": (53.3900, -6.3800),
+    "D16": (53.2800, -6.2700),
+    "D17": (53.4000, -6.2100),
+    "D18": (53.2600, -6.1800),
+    "D20": (53.3500, -6.3600),
+    "D22": (53.3250, -6.4000),
+    "D24": (53.2850, -6.3750),
+}
+
+
+def haversine_km(a: LatLng, b: LatLng) -> float:
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(h))
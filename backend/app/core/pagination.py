@@ -0,0 +1,36 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row on a page (e.g. (ts, id)).
+The next page asks for rows strictly after that key, so deep pages cost the
+same as the first and concurrent inserts don't shift rows between pages.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+
+def encode_cursor(*values: Any) -> str:
+    parts = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple[Any, ...]:
+    """Decode a cursor made by encode_cursor, converting each part to the given type. Raises ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(parts, list) or len(parts) != len(types):
+        raise ValueError("Malformed cursor")
+    values = []
+    for part, typ in zip(parts, types):
+        try:
+            values.append(datetime.fromisoformat(part) if typ is datetime else typ(part))
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Malformed cursor") from exc
+    return tuple(values)
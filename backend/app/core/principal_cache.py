@@ -0,0 +1,97 @@
+"""
+In-process cache of authenticated principals (User rows keyed by id).
+
+get_current_user runs on almost every request and used to issue the same
+primary-key lookup each time. We keep a small LRU of column snapshots with a
+TTL; callers that change a user row must call invalidate(user_id).
+
+The cache and invalidate() are per process: with several workers, a
+token_version bump, deactivation or role change reaches the other workers
+only when their entry expires, i.e. after at most principal_cache_ttl_seconds.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import inspect as sa_inspect
+
+from app.config import get_settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, user_id: int) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, values = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return values
+
+    def put(self, user: User) -> None:
+        if not self.enabled:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_settings = get_settings()
+principal_cache = PrincipalCache(
+    ttl_seconds=_settings.principal_cache_ttl_seconds,
+    max_entries=_settings.principal_cache_max_entries,
+)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
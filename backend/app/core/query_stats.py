@@ -0,0 +1,170 @@
+"""
+Per-request SQL statement counting, Server-Timing header and slow-query log.
+
+Engine-level cursor events (registered once on the Engine class, so they also
+cover the test engine and the read replica) add to a per-request accumulator
+held in a ContextVar. QueryStatsMiddleware creates the accumulator, emits
+`Server-Timing: db;dur=...;desc="N queries"` and folds the totals into
+per-route aggregates served by /admin/stats/queries.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger("gc.sql")
+
+_MAX_LOGGED_STATEMENT = 500
+
+
+@dataclass
+class RequestQueryStats:
+    scope: dict[str, Any] = field(default_factory=dict)
+    statements: int = 0
+    db_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI stores the matched route in the scope once routing has run.
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or "<unmatched>"
+        return f"{self.scope.get('method', '-')} {path}"
+
+
+@dataclass
+class RouteQueryStats:
+    requests: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    db_seconds: float = 0.0
+    max_db_seconds: float = 0.0
+    slow_statements: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": self.statements / self.requests if self.requests else 0.0,
+            "max_statements": self.max_statements,
+            "db_ms": self.db_seconds * 1000,
+            "avg_db_ms": self.db_seconds * 1000 / self.requests if self.requests else 0.0,
+            "max_db_ms": self.max_db_seconds * 1000,
+            "slow_statements": self.slow_statements,
+        }
+
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("gc_request_query_stats", default=None)
+_routes: dict[str, RouteQueryStats] = {}
+_slow_by_route: dict[str, int] = {}
+_installed = False
+
+
+def current_stats() -> RequestQueryStats | None:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    conn.info.setdefault("gc_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    starts = conn.info.get("gc_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    threshold_ms = get_settings().slow_query_threshold_ms
+    if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+        route = stats.route if stats is not None else "-"
+        _slow_by_route[route] = _slow_by_route.get(route, 0) + 1
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000,
+            route,
+            " ".join(statement.split())[:_MAX_LOGGED_STATEMENT],
+        )
+
+
+def _handle_error(exception_context) -> None:  # noqa: ANN001
+    # after_cursor_execute doesn't run for a failed statement; drop its start time so the
+    # next statement on this connection isn't timed from it.
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("gc_query_start")
+        if starts:
+            starts.pop()
+
+
+def install_query_instrumentation() -> None:
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+def _record(stats: RequestQueryStats) -> None:
+    agg = _routes.setdefault(stats.route, RouteQueryStats())
+    agg.requests += 1
+    agg.statements += stats.statements
+    agg.max_statements = max(agg.max_statements, stats.statements)
+    agg.db_seconds += stats.db_seconds
+    agg.max_db_seconds = max(agg.max_db_seconds, stats.db_seconds)
+
+
+def route_stats() -> dict[str, dict[str, Any]]:
+    out = {}
+    for route, agg in sorted(_routes.items(), key=lambda kv: kv[1].db_seconds, reverse=True):
+        agg.slow_statements = _slow_by_route.get(route, 0)
+        out[route] = agg.as_dict()
+    return out
+
+
+def reset_route_stats() -> None:
+    _routes.clear()
+    _slow_by_route.clear()
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware) so streaming responses are untouched."""
+
+    def __init__(self, app) -> None:  # noqa: ANN001
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope=scope)
+        token = _current.set(stats)
+
+        async def send_with_timing(message) -> None:  # noqa: ANN001
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (
+                        b"server-timing",
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'.encode(),
+                    )
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _record(stats)
+            _current.reset(token)
@@ -1,4 +1,9 @@
-from datetime import datetime, timedelta, timezone
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, Optional
 
 from jose import jwt
@@ -18,17 +23,139 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_access_token(subject: str | int, expires_minutes: Optional[int] = None) -> str:
+def create_access_token(
+    subject: str | int,
+    expires_minutes: Optional[int] = None,
+    claims: Optional[dict[str, Any]] = None,
+) -> str:
     settings = get_settings()
     expire = datetime.now(tz=timezone.utc) + timedelta(
         minutes=expires_minutes or settings.access_token_expire_minutes
     )
-    to_encode: dict[str, Any] = {"sub": str(subject), "exp": expire}
+    to_encode: dict[str, Any] = {**(claims or {}), "sub": str(subject), "exp": expire}
     return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
-def decode_token(token: str) -> dict[str, Any]:
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified tokens, keyed by a digest of the token.
+
+    Clients resend the same bearer token for the whole session, so we verify
+    the signature once and reuse the payload until the token's own exp.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: bytes, payload: dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._entries[key] = (float(exp), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+token_cache = VerifiedTokenCache(max_entries=get_settings().token_cache_max_entries)
+
+
+def _verify_token(token: str) -> dict[str, Any]:
     settings = get_settings()
     return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
 
 
+def decode_token(token: str) -> dict[str, Any]:
+    settings = get_settings()
+    if token_cache.max_entries <= 0:
+        return _verify_token(token)
+    # Secret and algorithm are part of the key so a key rotation never serves stale entries.
+    key = hashlib.sha256(
+        f"{settings.jwt_algorithm}:{settings.jwt_secret_key}:{token}".encode()
+    ).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = _verify_token(token)
+        token_cache.put(key, payload)
+    return dict(payload)
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """
+    Authorization claims carried in an access token.
+
+    Role flags and subscription_active_until are None for tokens issued before
+    these claims existed; callers must then fall back to the database.
+    """
+
+    user_id: int
+    token_version: int = 0
+    is_admin: bool | None = None
+    is_driver: bool | None = None
+    subscription_active_until: date | None = None
+
+
+def build_token_claims(
+    *, is_admin: bool, is_driver: bool, token_version: int, subscription_active_until: date | None
+) -> dict[str, Any]:
+    return {
+        "is_admin": bool(is_admin),
+        "is_driver": bool(is_driver),
+        "tv": int(token_version or 0),
+        "sub_active_until": subscription_active_until.isoformat() if subscription_active_until else None,
+    }
+
+
+def parse_token_claims(payload: dict[str, Any]) -> TokenClaims:
+    sub = payload.get("sub")
+    if not sub:
+        raise ValueError("missing sub")
+    active_until = payload.get("sub_active_until")
+    return TokenClaims(
+        user_id=int(sub),
+        token_version=int(payload.get("tv") or 0),
+        is_admin=payload.get("is_admin"),
+        is_driver=payload.get("is_driver"),
+        subscription_active_until=date.fromisoformat(active_until) if active_until else None,
+    )
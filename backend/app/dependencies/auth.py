@@ -1,11 +1,14 @@
+from datetime import date
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 
-from app.core.security import decode_token
+from app.core.principal_cache import principal_cache
+from app.core.security import TokenClaims, decode_token, parse_token_claims
 from app.services.db import get_db_session
 from app.models.user import User
 from app.services.subscriptions import is_subscription_active
@@ -13,23 +16,41 @@ from app.services.subscriptions import is_subscription_active
 bearer_scheme = HTTPBearer(auto_error=True)
 
 
-async def get_current_user(
+async def get_token_claims(
     creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db_session),
-) -> User:
+) -> TokenClaims:
     token = creds.credentials
     try:
-        payload = decode_token(token)
-        sub = payload.get("sub")
-        if not sub:
-            raise ValueError("missing sub")
+        return parse_token_claims(decode_token(token))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
-    stmt = select(User).where(User.id == int(sub))
+
+def _check_token_version(claims: TokenClaims, current_version: int | None) -> None:
+    if claims.token_version != int(current_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+
+async def get_current_user(
+    claims: TokenClaims = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db_session),
+) -> User:
+    user_id = claims.user_id
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        _check_token_version(claims, cached.get("token_version"))
+        # Rebuild a clean instance from the snapshot and attach it without a SELECT.
+        user = User(**cached)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    stmt = select(User).where(User.id == user_id)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     if not user:
@@ -37,20 +58,35 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    principal_cache.put(user)
+    _check_token_version(claims, user.token_version)
     return user
 
 
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
-    if not getattr(user, "is_admin", False):
+def _has_role(claim: bool | None, user: User, attr: str) -> bool:
+    # Tokens minted before role claims existed fall back to the loaded row.
+    if claim is not None:
+        return bool(claim)
+    return bool(getattr(user, attr, False))
+
+
+def require_admin(
+    user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> User:
+    if not _has_role(claims.is_admin, user, "is_admin"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return user
 
 
-def require_driver(user: User = Depends(get_current_user)) -> User:
-    if not getattr(user, "is_driver", False):
+def require_driver(
+    user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> User:
+    if not _has_role(claims.is_driver, user, "is_driver"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Driver only")
     return user
 
@@ -60,12 +96,19 @@ DriverUserDep = Annotated[User, Depends(require_driver)]
 
 async def require_active_subscription(
     user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_token_claims),
     db: AsyncSession = Depends(get_db_session),
 ) -> User:
     # Admins and drivers do not need a subscription for the MVP.
-    if getattr(user, "is_admin", False) or getattr(user, "is_driver", False):
+    if _has_role(claims.is_admin, user, "is_admin") or _has_role(claims.is_driver, user, "is_driver"):
+        return user
+
+    # Common case: the token already proves an active subscription.
+    until = claims.subscription_active_until
+    if until is not None and until >= date.today():
         return user
 
+    # Token predates a purchase/renewal (or carries no claim): ask the DB.
     ok = await is_subscription_active(db, user.id)
     if not ok:
         raise HTTPException(
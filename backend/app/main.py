@@ -11,6 +11,7 @@ from .routers import subscriptions, collection_slots, collections, admin, users
 from .routers import payments, stripe_webhooks, drivers, uploads
 from .services.db import engine, SessionLocal
 from .config import get_settings
+from .core.query_stats import QueryStatsMiddleware, install_query_instrumentation
 from .routers import dev_utils
 from .services.seed import seed_return_points
 from .events.notification_handlers import register_notification_handlers
@@ -38,7 +39,11 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing"],
     )
+    # Per-request SQL statement count / DB time -> Server-Timing header + /admin/stats/queries
+    install_query_instrumentation()
+    app.add_middleware(QueryStatsMiddleware)
 
     # Local file uploads (MVP): serve uploaded files from /uploads/*
     uploads_dir = Path(__file__).resolve().parent.parent / "uploads"
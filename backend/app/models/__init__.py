@@ -3,13 +3,16 @@ from .return_point import ReturnPoint
 from .subscription import Subscription
 from .collection_slot import CollectionSlot
 from .collection import Collection
+from .pickup_capacity import PickupCapacity
 from .voucher import Voucher
 from .wallet_transaction import WalletTransaction
+from .wallet_balance import WalletBalance
 from .driver import Driver
 from .driver_earning import DriverEarning
 from .driver_payout import DriverPayout
 from .claim import Claim
 from .notification import Notification
+from .refresh_token import RefreshToken
 
 __all__ = [
     "User",
@@ -17,13 +20,16 @@ __all__ = [
     "Subscription",
     "CollectionSlot",
     "Collection",
+    "PickupCapacity",
     "Voucher",
     "WalletTransaction",
+    "WalletBalance",
     "Driver",
     "DriverEarning",
     "DriverPayout",
     "Claim",
     "Notification",
+    "RefreshToken",
 ]
 
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, Integer, func
+from sqlalchemy import String, DateTime, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..services.db import Base
@@ -8,6 +8,7 @@ from ..services.db import Base
 
 class Claim(Base):
     __tablename__ = "claims"
+    __table_args__ = (Index("ix_claims_status_created_at", "status", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
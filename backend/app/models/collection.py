@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, Integer, Boolean, func
+from sqlalchemy import String, DateTime, Float, Integer, Boolean, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..services.db import Base
@@ -8,6 +8,48 @@ from ..services.db import Base
 
 class Collection(Base):
     __tablename__ = "collections"
+    __table_args__ = (
+        # Partial: live (non-archived) rows are all the user/driver views ever read.
+        Index(
+            "ix_collections_user_id_scheduled_at_live",
+            "user_id",
+            "scheduled_at",
+            postgresql_where=text("is_archived = false"),
+            sqlite_where=text("is_archived = 0"),
+        ),
+        Index(
+            "ix_collections_driver_id_scheduled_at_live",
+            "driver_id",
+            "scheduled_at",
+            postgresql_where=text("is_archived = false"),
+            sqlite_where=text("is_archived = 0"),
+        ),
+        Index("ix_collections_slot_id_scheduled_at", "collection_slot_id", "scheduled_at"),
+        # Admin list: keyset on (scheduled_at, id), optionally behind a status / return point filter.
+        Index(
+            "ix_collections_scheduled_at_id_live",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("is_archived = false"),
+            sqlite_where=text("is_archived = 0"),
+        ),
+        Index(
+            "ix_collections_status_scheduled_at_id_live",
+            "status",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("is_archived = false"),
+            sqlite_where=text("is_archived = 0"),
+        ),
+        Index(
+            "ix_collections_return_point_id_scheduled_at_id_live",
+            "return_point_id",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("is_archived = false"),
+            sqlite_where=text("is_archived = 0"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(nullable=False, index=True)
@@ -20,6 +62,8 @@ class Collection(Base):
     bag_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     notes: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     pickup_address: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    pickup_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    pickup_lng: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     driver_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
     proof_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
@@ -29,6 +73,8 @@ class Collection(Base):
     collection_type: Mapped[str | None] = mapped_column(String(8), nullable=True, default="bottles")  # "bottles" | "glass" | "both"
 
     is_archived: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="0")
+    # Bumped by every status / driver change; transitions are conditional on it (optimistic locking).
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
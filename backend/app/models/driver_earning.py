@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, DateTime, ForeignKey, func
+from sqlalchemy import Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..services.db import Base
@@ -8,6 +8,7 @@ from ..services.db import Base
 
 class DriverEarning(Base):
     __tablename__ = "driver_earnings"
+    __table_args__ = (Index("ix_driver_earnings_driver_id_created_at", "driver_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     driver_id: Mapped[int] = mapped_column(Integer, ForeignKey("drivers.id"), nullable=False, index=True)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..services.db import Base
+
+
+class PickupCapacity(Base):
+    """
+    Bookable pickups per (zone, time window), with a running count of live bookings.
+
+    Only services.capacity writes `booked`, in the same transaction as the
+    collection rows it counts. A row appears on the first booking in its
+    window with the default capacity; change `capacity` to open or close a window.
+    """
+
+    __tablename__ = "pickup_capacity"
+
+    # Eircode routing key of the pickup address, or "*" when it has none.
+    zone: Mapped[str] = mapped_column(String(8), primary_key=True)
+    starts_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    booked: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
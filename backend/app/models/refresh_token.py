@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Integer, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..services.db import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # sha256 hex of the opaque token; the raw value is only ever returned to the client.
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+    # All tokens produced by rotating one login share a family; reuse revokes the family.
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    replaced_by_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now(), default=lambda: datetime.utcnow()
+    )
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import String, Date, DateTime
+from sqlalchemy import String, Date, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..services.db import Base
@@ -8,6 +8,8 @@ from ..services.db import Base
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    # get_me reads the newest row per user
+    __table_args__ = (Index("ix_subscriptions_user_id_id_desc", "user_id", text("id DESC")),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(index=True, nullable=False)
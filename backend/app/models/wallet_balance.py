@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..services.db import Base
+
+
+class WalletBalance(Base):
+    """
+    Running total of a user's wallet_transactions, maintained on write.
+
+    Only services.wallet.add_transaction writes here, in the same transaction
+    as the ledger row. `version` counts ledger rows folded in so far.
+    """
+
+    __tablename__ = "wallet_balances"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # Donations are recorded in the ledger but don't count towards the balance.
+    balance_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_updated: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
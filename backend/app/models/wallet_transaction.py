@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, DateTime
+from sqlalchemy import String, Integer, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..services.db import Base
@@ -8,6 +8,12 @@ from ..services.db import Base
 
 class WalletTransaction(Base):
     __tablename__ = "wallet_transactions"
+    __table_args__ = (
+        # (ts, id) is the history sort and keyset cursor.
+        Index("ix_wallet_transactions_user_id_ts_id", "user_id", "ts", "id"),
+        # One credit (or donation) per collection; inserts rely on ON CONFLICT against this.
+        Index("uq_wallet_transactions_collection_id_kind", "collection_id", "kind", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(nullable=False, index=True)
@@ -16,6 +22,7 @@ class WalletTransaction(Base):
     kind: Mapped[str] = mapped_column(String(32), nullable=False)
     amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
     note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    collection_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
 
 
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from pydantic import BaseModel
 
+from ..core.pagination import decode_cursor, encode_cursor
+from ..core.password_hasher import password_hasher
+from ..core.principal_cache import principal_cache
+from ..core.query_stats import reset_route_stats, route_stats
+from ..core.security import token_cache
 from ..dependencies.auth import require_admin
 from ..models import (
     Collection,
@@ -14,17 +23,32 @@ from ..models import (
     User,
 )
 from ..models.claim import Claim
-from ..services.collections import admin_transition_status, assign_driver as svc_assign_driver
+from ..services.collections import (
+    TransitionConflict,
+    admin_transition_status,
+    bulk_assign_driver as svc_bulk_assign_driver,
+    bulk_transition_status as svc_bulk_transition_status,
+    assign_driver as svc_assign_driver,
+    list_admin as svc_list_admin,
+)
 from ..services.drivers import create_driver as svc_create_driver, list_drivers as svc_list_drivers
+from ..services.tokens import revoke_tokens as svc_revoke_tokens
 from ..services.driver_payouts import (
     create_payout,
     get_driver_balance,
     get_driver_earnings,
     list_all_payouts,
 )
-from ..services.db import get_db_session
+from ..services.dispatch import apply_dispatch, plan_dispatch
+from ..services.routes import plan_driver_route
+from ..services.db import get_db_session, get_read_session, get_read_session_factory, pool_stats, read_engine
+from ..services.statements import MEDIA_TYPES, stream_statement
 from ..schemas import (
     AssignDriverRequest,
+    BulkAssignDriverRequest,
+    BulkResultResponse,
+    BulkStatusRequest,
+    DispatchRequest,
     ClaimOut,
     ClaimStatusUpdate,
     ClaimsListResponse,
@@ -39,7 +63,7 @@ from ..schemas import (
     NotificationOut,
     NotificationsListResponse,
 )
-from ..core.events import publish_event
+from ..core.events import publish_event, publish_events
 from ..services.recurring_generation import generate_collections as svc_generate_collections
 from ..services.claims import (
     get_all_claims as svc_get_all_claims,
@@ -58,6 +82,39 @@ async def ping():
     return {"status": "ok"}
 
 
+@router.get("/stats/principal-cache")
+async def principal_cache_stats():
+    return principal_cache.stats()
+
+
+@router.get("/stats/token-cache")
+async def token_cache_stats():
+    return token_cache.stats()
+
+
+@router.get("/stats/db-pool")
+async def db_pool_stats():
+    return {
+        "primary": pool_stats(),
+        "replica": pool_stats(read_engine) if read_engine is not None else {"configured": False},
+    }
+
+
+@router.get("/stats/queries")
+async def query_stats():
+    return route_stats()
+
+
+@router.delete("/stats/queries", status_code=204)
+async def clear_query_stats():
+    reset_route_stats()
+
+
+@router.get("/stats/password-hashing")
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+
 PLAN_PRICES = {"weekly": 499, "monthly": 1499, "yearly": 14999}
 
 
@@ -77,7 +134,7 @@ def _plan_price_cents(plan_code: str | None) -> int:
 
 
 @router.get("/metrics")
-async def metrics(session: AsyncSession = Depends(get_db_session)):
+async def metrics(session: AsyncSession = Depends(get_read_session)):
     users_total = await session.scalar(select(func.count()).select_from(User))
     active_subscriptions = await session.scalar(
         select(func.count()).select_from(Subscription).where(Subscription.status == "active")
@@ -159,15 +216,33 @@ async def generate_collections(
 @router.get("/collections")
 async def list_collections(
     status: str | None = Query(default=None),
+    since: datetime | None = Query(default=None, description="scheduledAt >= since"),
+    until: datetime | None = Query(default=None, description="scheduledAt < until"),
+    driverId: int | None = Query(default=None),
+    returnPointId: int | None = Query(default=None),
+    zone: str | None = Query(default=None, description="Assigned driver's zone"),
     limit: int = Query(default=50, ge=1, le=200),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: str | None = Query(default=None, description="nextCursor from the previous page"),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    stmt = select(Collection).where(Collection.is_archived == False)  # noqa: E712
-    if status:
-        stmt = stmt.where(Collection.status == status)
-    stmt = stmt.order_by(Collection.scheduled_at.desc()).limit(limit)
-    rows = (await session.execute(stmt)).scalars().all()
-    return [
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, next_key = await svc_list_admin(
+        session,
+        limit,
+        after=after,
+        status=status,
+        since=since,
+        until=until,
+        driver_id=driverId,
+        return_point_id=returnPointId,
+        zone=zone,
+    )
+    items = [
         {
             "id": c.id,
             "user_id": c.user_id,
@@ -181,9 +256,11 @@ async def list_collections(
             "voucher_amount_cents": c.voucher_amount_cents,
             "collection_slot_id": c.collection_slot_id,
             "collection_type": c.collection_type,
+            "version": c.version,
         }
         for c in rows
     ]
+    return {"items": items, "nextCursor": encode_cursor(*next_key) if next_key else None}
 
 class UpdateStatusRequest(BaseModel):
     status: str
@@ -192,13 +269,17 @@ class UpdateStatusRequest(BaseModel):
 async def update_collection_status(
     id: int,
     payload: UpdateStatusRequest,
+    version: int | None = Query(default=None, description="only apply if the collection is still at this version"),
     session: AsyncSession = Depends(get_db_session),
 ):
-    col, err = await admin_transition_status(session, id, payload.status)
-    if col is None:
-        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        col, err = await admin_transition_status(session, id, payload.status, expected_version=version)
+    except TransitionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if err:
         raise HTTPException(status_code=400, detail=err)
+    if col is None:
+        raise HTTPException(status_code=404, detail="Not found")
 
     return {
         "id": col.id,
@@ -214,6 +295,30 @@ async def update_collection_status(
         "collectionType": col.collection_type,
         "createdAt": col.created_at,
         "updatedAt": col.updated_at,
+        "version": col.version,
+    }
+
+
+@router.post("/collections/bulk-status", response_model=BulkResultResponse)
+async def bulk_update_collection_status(
+    payload: BulkStatusRequest,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_db_session),
+):
+    try:
+        outcomes, events = await svc_bulk_transition_status(session, payload.collectionIds, payload.status)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Notifications go out after the response so thousands of emails don't hold it open.
+    if events:
+        background_tasks.add_task(publish_events, events)
+    return _bulk_response(outcomes)
+
+
+def _bulk_response(outcomes: dict[int, str | None]) -> dict:
+    return {
+        "updated": sum(1 for err in outcomes.values() if err is None),
+        "results": [{"id": id_, "ok": err is None, "error": err} for id_, err in outcomes.items()],
     }
 
 
@@ -246,6 +351,16 @@ async def create_driver(
     )
 
 
+@router.post("/users/{user_id}/revoke-tokens")
+async def revoke_user_tokens(
+    user_id: int,
+    session: AsyncSession = Depends(get_db_session),
+):
+    if not await svc_revoke_tokens(session, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"ok": True}
+
+
 @router.get("/drivers")
 async def list_drivers(session: AsyncSession = Depends(get_db_session)):
     drivers = await svc_list_drivers(session)
@@ -288,9 +403,53 @@ async def assign_driver_to_collection(
         "collectionType": col.collection_type,
         "createdAt": col.created_at,
         "updatedAt": col.updated_at,
+        "version": col.version,
+    }
+
+
+@router.post("/collections/bulk-assign-driver", response_model=BulkResultResponse)
+async def bulk_assign_drivers(
+    payload: BulkAssignDriverRequest,
+    session: AsyncSession = Depends(get_db_session),
+):
+    outcomes = await svc_bulk_assign_driver(session, [(a.collectionId, a.driverId) for a in payload.assignments])
+    return _bulk_response(outcomes)
+
+
+@router.post("/dispatch")
+async def dispatch_collections(
+    payload: DispatchRequest,
+    session: AsyncSession = Depends(get_db_session),
+):
+    plan = await plan_dispatch(session, payload.date)
+    if not payload.dryRun:
+        await apply_dispatch(session, plan)
+    return {
+        "date": plan.day,
+        "dryRun": payload.dryRun,
+        "assigned": len(plan.assignments),
+        "assignments": [
+            {"collectionId": col_id, "driverId": driver_id, "zone": plan.zones.get(col_id)}
+            for col_id, driver_id in plan.assignments.items()
+        ],
+        "unassigned": [{"collectionId": col_id, "reason": reason} for col_id, reason in plan.unassigned.items()],
+        "drivers": [
+            {"driverId": d.id, "zone": d.zone, "capacityBags": d.capacity, "loadBags": d.load} for d in plan.drivers
+        ],
     }
 
 
+@router.get("/drivers/{driver_id}/route")
+async def get_driver_route(
+    driver_id: int,
+    day: date | None = Query(default=None, alias="date"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if await session.get(Driver, driver_id) is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return await plan_driver_route(session, driver_id, day or date.today())
+
+
 @router.get("/drivers/{driver_id}/earnings")
 async def get_driver_earnings_admin(
     driver_id: int,
@@ -352,6 +511,23 @@ async def list_payouts(session: AsyncSession = Depends(get_db_session)):
     ]
 
 
+@router.get("/wallet/export")
+async def export_wallet_transactions(
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    userId: int | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    body = stream_statement(session_factory, format, user_id=userId, since=since, until=until)
+    name = f"wallet-{userId}" if userId is not None else "wallet-transactions"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
 @router.get("/claims", response_model=ClaimsListResponse)
 async def admin_list_claims(
     status: str | None = Query(default=None),
@@ -3,12 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.config import get_settings
-from app.core.security import create_access_token, verify_password
+from app.core.password_hasher import check_password, hash_password
 from app.dependencies.auth import get_current_user
-from app.schemas import LoginRequest, TokenResponse, UserOut, RegisterRequest
+from app.schemas import LoginRequest, RefreshRequest, TokenResponse, UserOut, RegisterRequest
 from app.services.db import get_db_session
+from app.services.tokens import issue_token_pair, revoke_refresh_token, rotate_refresh_token
 from app.models.user import User
-from app.core.security import get_password_hash
 
 router = APIRouter()
 
@@ -23,19 +23,33 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db_session
         user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No users available in mock mode")
-        token = create_access_token(subject=user.id)
-        return TokenResponse(access_token=token)
+        token, refresh = await issue_token_pair(db, user)
+        return TokenResponse(access_token=token, refresh_token=refresh)
 
     result = await db.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
     if not user or not user.password_hash:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    if not verify_password(payload.password, user.password_hash):
+    if not await check_password(payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    token = create_access_token(subject=user.id)
-    return TokenResponse(access_token=token)
+    token, refresh = await issue_token_pair(db, user)
+    return TokenResponse(access_token=token, refresh_token=refresh)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(payload: RefreshRequest, db: AsyncSession = Depends(get_db_session)) -> TokenResponse:
+    try:
+        token, new_refresh = await rotate_refresh_token(db, payload.refresh_token)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc))
+    return TokenResponse(access_token=token, refresh_token=new_refresh)
+
+
+@router.post("/logout", status_code=204)
+async def logout(payload: RefreshRequest, db: AsyncSession = Depends(get_db_session)) -> None:
+    await revoke_refresh_token(db, payload.refresh_token)
 
 
 @router.get("/me", response_model=UserOut)
@@ -63,7 +77,7 @@ async def register(payload: RegisterRequest, db: AsyncSession = Depends(get_db_s
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    user = User(email=email, full_name=payload.full_name, password_hash=get_password_hash(payload.password))
+    user = User(email=email, full_name=payload.full_name, password_hash=await hash_password(payload.password))
     db.add(user)
     await db.commit()
     await db.refresh(user)
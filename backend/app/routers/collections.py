@@ -1,17 +1,23 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
 from ..core.events import publish_event
+from ..core.pagination import decode_cursor, encode_cursor
 from ..dependencies.auth import CurrentUserDep, require_active_subscription
 from ..models.user import User
-from ..models.return_point import ReturnPoint
 from ..services.db import get_db_session
-from ..services.collections import create as svc_create, list_me as svc_list_me, cancel as svc_cancel, delete_canceled as svc_delete_canceled
+from ..services.capacity import availability as svc_availability, capacity_zone
+from ..services.collections import (
+    TransitionConflict,
+    create as svc_create,
+    list_me as svc_list_me,
+    cancel as svc_cancel,
+    delete_canceled as svc_delete_canceled,
+)
 
 
 
@@ -36,7 +42,7 @@ async def create_collection(
 ):
     scheduled_at = datetime.fromisoformat(payload.scheduledAt)  # assume ISO from client
     try:
-        created = await svc_create(
+        created, rp_name = await svc_create(
             session,
             current_user.id,
             scheduled_at,
@@ -50,15 +56,11 @@ async def create_collection(
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    rp_name = ""
-    rp_row = (await session.execute(select(ReturnPoint).where(ReturnPoint.id == created.return_point_id).limit(1))).scalars().first()
-    if rp_row:
-        rp_name = rp_row.name
     await publish_event("collection.scheduled", {
         "email": current_user.email,
         "collection_id": created.id,
         "scheduled_at": str(created.scheduled_at),
-        "return_point_name": rp_name,
+        "return_point_name": rp_name or "",
     })
     return {
         "id": created.id,
@@ -75,6 +77,7 @@ async def create_collection(
         "collectionType": created.collection_type,
         "createdAt": created.created_at,
         "updatedAt": created.updated_at,
+        "version": created.version,
     }
 
 
@@ -84,9 +87,16 @@ async def list_my_collections(
     status: str | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="nextCursor from the previous page; overrides page"),
     session: AsyncSession = Depends(get_db_session),
 ):
-    rows, total = await svc_list_me(session, current_user.id, status, page, pageSize)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, total, next_key = await svc_list_me(session, current_user.id, status, page, pageSize, after=after)
     items = [
         {
             "id": r.id,
@@ -103,19 +113,43 @@ async def list_my_collections(
             "collectionType": r.collection_type,
             "createdAt": r.created_at,
             "updatedAt": r.updated_at,
+            "version": r.version,
         }
         for r in rows
     ]
-    return {"items": items, "total": total, "page": page, "pageSize": pageSize}
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "pageSize": pageSize,
+        "nextCursor": encode_cursor(*next_key) if next_key else None,
+    }
+
+
+@router.get("/availability")
+async def get_availability(
+    current_user: CurrentUserDep,
+    weekStart: date | None = Query(default=None, description="first day of the 7-day range (default today)"),
+    zone: str | None = Query(default=None, description="Eircode routing key (default: the zone of your address)"),
+    session: AsyncSession = Depends(get_db_session),
+):
+    zone = zone.strip().upper() if zone else capacity_zone(current_user.address)
+    start = weekStart or datetime.utcnow().date()
+    windows = await svc_availability(session, zone, start)
+    return {"zone": zone, "weekStart": start, "windows": windows}
 
 
 @router.patch("/{id}/cancel")
 async def cancel_collection(
     id: int,
     current_user: CurrentUserDep,
+    version: int | None = Query(default=None, description="only cancel if the collection is still at this version"),
     session: AsyncSession = Depends(get_db_session),
 ):
-    col = await svc_cancel(session, current_user.id, id)
+    try:
+        col = await svc_cancel(session, current_user.id, id, expected_version=version)
+    except TransitionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if col is None:
         raise HTTPException(status_code=404, detail="Not found")
     return {
@@ -133,6 +167,7 @@ async def cancel_collection(
         "collectionType": col.collection_type,
         "createdAt": col.created_at,
         "updatedAt": col.updated_at,
+        "version": col.version,
     }
 
 
@@ -1,13 +1,13 @@
 # Purpose: quick helper to generate a bcrypt hash for a password (dev use only)
 from fastapi import APIRouter
-from app.core.security import get_password_hash
+from app.core.password_hasher import hash_password
 
 
 router = APIRouter(prefix="/dev", tags=["dev"], include_in_schema=False)
 
 
 @router.get("/hash/{plain}")
-def hash_password(plain: str):
-    return {"hash": get_password_hash(plain)}
+async def dev_hash_password(plain: str):
+    return {"hash": await hash_password(plain)}
 
 
@@ -1,7 +1,10 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..dependencies.auth import require_driver
+from ..services.collections import TransitionConflict
 from ..services.db import get_db_session
 from ..services.drivers import (
     get_driver_by_user_id,
@@ -10,6 +13,7 @@ from ..services.drivers import (
     mark_collected,
     mark_completed,
 )
+from ..services.routes import plan_driver_route
 from ..services.driver_payouts import (
     get_driver_balance,
     get_driver_earnings,
@@ -99,18 +103,35 @@ async def get_my_collections(
             "collectionType": c.collection_type,
             "createdAt": c.created_at,
             "updatedAt": c.updated_at,
+            "version": c.version,
         }
         for c in collections
     ]
 
 
+@router.get("/me/route")
+async def get_my_route(
+    day: date | None = Query(default=None, alias="date"),
+    user=Depends(require_driver),
+    session: AsyncSession = Depends(get_db_session),
+):
+    driver = await get_driver_by_user_id(session, user.id)
+    if driver is None:
+        raise HTTPException(status_code=404, detail="Driver profile not found")
+    return await plan_driver_route(session, driver.id, day or date.today())
+
+
 @router.patch("/me/collections/{id}/mark-collected")
 async def mark_collection_collected(
     id: int,
+    version: int | None = Query(default=None, description="only apply if the collection is still at this version"),
     user=Depends(require_driver),
     session: AsyncSession = Depends(get_db_session),
 ):
-    col, err = await mark_collected(session, id, user.id)
+    try:
+        col, err = await mark_collected(session, id, user.id, expected_version=version)
+    except TransitionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if col is None and err is None:
         raise HTTPException(status_code=404, detail="Collection not found")
     if col is None:
@@ -134,6 +155,7 @@ async def mark_collection_collected(
         "collectionType": col.collection_type,
         "createdAt": col.created_at,
         "updatedAt": col.updated_at,
+        "version": col.version,
     }
 
 
@@ -141,16 +163,21 @@ async def mark_collection_collected(
 async def mark_collection_completed(
     id: int,
     payload: MarkCollectedRequest,
+    version: int | None = Query(default=None, description="only apply if the collection is still at this version"),
     user=Depends(require_driver),
     session: AsyncSession = Depends(get_db_session),
 ):
-    col, err = await mark_completed(
-        session,
-        id,
-        user.id,
-        payload.proofUrl,
-        payload.voucherAmountCents,
-    )
+    try:
+        col, err = await mark_completed(
+            session,
+            id,
+            user.id,
+            payload.proofUrl,
+            payload.voucherAmountCents,
+            expected_version=version,
+        )
+    except TransitionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if col is None and err is None:
         raise HTTPException(status_code=404, detail="Collection not found")
     if col is None:
@@ -174,6 +201,7 @@ async def mark_collection_completed(
         "collectionType": col.collection_type,
         "createdAt": col.created_at,
         "updatedAt": col.updated_at,
+        "version": col.version,
     }
 
 
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Query, Depends
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..services.db import get_db_session
+from ..services.db import get_read_session
 from ..services.return_points import list_return_points as svc_list
 from ..schemas import ReturnPointsResponse, ReturnPoint as ReturnPointSchema
 
@@ -17,7 +17,7 @@ async def list_return_points_endpoint(
     near: str | None = Query(default=None, description="lat,lng"),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=100, ge=1, le=500),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     near_tuple = None
     if near:
@@ -5,6 +5,8 @@ from sqlalchemy import select, and_, delete as sa_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
+from ..core.gazetteer import geocode
+from ..core.principal_cache import invalidate_principal
 from ..dependencies.auth import CurrentUserDep
 from ..services.db import get_db_session
 from ..models import (
@@ -12,11 +14,13 @@ from ..models import (
     Collection,
     CollectionSlot,
     WalletTransaction,
+    WalletBalance,
     Driver,
     DriverEarning,
     DriverPayout,
     Claim,
     Notification,
+    RefreshToken,
     User,
 )
 
@@ -39,7 +43,9 @@ async def update_me(
         raise HTTPException(status_code=404, detail="User not found")
     user.full_name = payload.full_name
     user.address = payload.address
+    user.lat, user.lng = geocode(payload.address) or (None, None)
     await session.commit()
+    invalidate_principal(current_user.id)
     return {"ok": True}
 
 
@@ -83,11 +89,13 @@ async def delete_me(
 
     # Delete all user-owned rows (order respects FK dependencies)
     await session.execute(sa_delete(WalletTransaction).where(WalletTransaction.user_id == current_user.id))
+    await session.execute(sa_delete(WalletBalance).where(WalletBalance.user_id == current_user.id))
     await session.execute(sa_delete(Notification).where(Notification.user_id == current_user.id))
     await session.execute(sa_delete(Claim).where(Claim.user_id == current_user.id))
     await session.execute(sa_delete(CollectionSlot).where(CollectionSlot.user_id == current_user.id))
     await session.execute(sa_delete(Collection).where(Collection.user_id == current_user.id))
     await session.execute(sa_delete(Subscription).where(Subscription.user_id == current_user.id))
+    await session.execute(sa_delete(RefreshToken).where(RefreshToken.user_id == current_user.id))
     if driver:
         await session.execute(sa_delete(Driver).where(Driver.user_id == current_user.id))
 
@@ -96,3 +104,4 @@ async def delete_me(
         return
     await session.delete(user)
     await session.commit()
+    invalidate_principal(current_user.id)
@@ -1,18 +1,18 @@
-import re
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
 
-from ..models import Collection
-from ..services.db import get_db_session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.pagination import decode_cursor, encode_cursor
+from ..services.db import get_db_session, get_read_session, get_read_session_factory
+from ..services.statements import MEDIA_TYPES, stream_statement
 from ..dependencies.auth import CurrentUserDep
 from ..services.wallet import get_balance, get_history
 from ..schemas import WalletBalanceResponse, WalletHistoryResponse, Transaction
 
-COLLECTION_ID_PATTERN = re.compile(r"collection #(\d+)", re.IGNORECASE)
-
 
 router = APIRouter()
 
@@ -28,42 +28,26 @@ async def history(
     current_user: CurrentUserDep,
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: str | None = Query(default=None, description="nextCursor from the previous page; overrides page"),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    rows, total = await get_history(session, current_user.id, page, pageSize)
-
-    # Collect collection IDs from collection-related transactions
-    collection_ids: set[int] = set()
-    for r in rows:
-        if r.kind in ("collection_credit", "collection_completed") and r.note:
-            match = COLLECTION_ID_PATTERN.search(r.note)
-            if match:
-                collection_ids.add(int(match.group(1)))
-
-    # Fetch collection details for user's collections only
-    collection_map: dict[int, dict] = {}
-    if collection_ids:
-        stmt = select(Collection.id, Collection.status, Collection.proof_url).where(
-            Collection.id.in_(collection_ids),
-            Collection.user_id == current_user.id,
-        )
-        result = (await session.execute(stmt)).all()
-        for row in result:
-            collection_map[row[0]] = {"status": row[1], "proof_url": row[2]}
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, total, next_key = await get_history(session, current_user.id, page, pageSize, after=after)
 
     items = []
-    for r in rows:
+    for r, collection_status, proof_url in rows:
         extra: dict = {}
-        if r.kind in ("collection_credit", "collection_completed") and r.note:
-            match = COLLECTION_ID_PATTERN.search(r.note)
-            if match:
-                cid = int(match.group(1))
-                if cid in collection_map:
-                    extra = {
-                        "collectionId": cid,
-                        "collectionStatus": collection_map[cid]["status"],
-                        "proofUrl": collection_map[cid]["proof_url"],
-                    }
+        if r.collection_id is not None and collection_status is not None:
+            extra = {
+                "collectionId": r.collection_id,
+                "collectionStatus": collection_status,
+                "proofUrl": proof_url,
+            }
         items.append(
             Transaction(
                 id=r.id,
@@ -75,6 +59,26 @@ async def history(
             )
         )
 
-    return {"items": items, "total": total, "page": page, "pageSize": pageSize}
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "pageSize": pageSize,
+        "nextCursor": encode_cursor(*next_key) if next_key else None,
+    }
 
 
+@router.get("/export")
+async def export(
+    current_user: CurrentUserDep,
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    body = stream_statement(session_factory, format, user_id=current_user.id, since=since, until=until)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="wallet-{current_user.id}.{format}"'},
+    )
@@ -40,6 +40,8 @@ class WalletHistoryResponse(BaseModel):
     total: int
     page: int
     pageSize: int
+    # Opaque keyset cursor for the next page (pass as ?cursor=); null on the last page.
+    nextCursor: Optional[str] = None
 
 
 class Subscription(BaseModel):
@@ -95,6 +97,11 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class UserOut(BaseModel):
@@ -146,6 +153,39 @@ class AssignDriverRequest(BaseModel):
     driverId: int
 
 
+BULK_MAX_ITEMS = 5000
+
+
+class BulkStatusRequest(BaseModel):
+    collectionIds: List[int] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    status: str
+
+
+class DispatchRequest(BaseModel):
+    date: date
+    dryRun: bool = True
+
+
+class BulkAssignment(BaseModel):
+    collectionId: int
+    driverId: int
+
+
+class BulkAssignDriverRequest(BaseModel):
+    assignments: List[BulkAssignment] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    ok: bool
+    error: Optional[str] = None
+
+
+class BulkResultResponse(BaseModel):
+    updated: int
+    results: List[BulkItemResult]
+
+
 class MarkCollectedRequest(BaseModel):
     proofUrl: Optional[str] = None
     voucherAmountCents: int
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Build a GCEG gazetteer file from a CSV of Eircodes and coordinates.
+
+    python -m app.scripts.build_gazetteer eircodes.csv data/eircodes.gceg
+    python -m app.scripts.build_gazetteer eircodes.csv data/eircodes.gceg --code-column Eircode
+
+The CSV needs a header row; columns default to eircode,lat,lng. Rows may hold
+a full Eircode or a bare routing key (its centroid); invalid codes are skipped.
+Point EIRCODE_GAZETTEER_PATH at the output file.
+"""
+import argparse
+import csv
+import logging
+import sys
+from pathlib import Path
+
+from app.core.eircode import ROUTING_KEY_RE, normalize
+from app.core.gazetteer import Gazetteer, build
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("gc")
+
+
+def read_entries(path: Path, code_column: str, lat_column: str, lng_column: str) -> tuple[list, int]:
+    entries, skipped = [], 0
+    with path.open(newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            raw = (row.get(code_column) or "").strip()
+            code = normalize(raw) or (raw.upper() if ROUTING_KEY_RE.match(raw) else None)
+            try:
+                lat, lng = float(row[lat_column]), float(row[lng_column])
+            except (KeyError, TypeError, ValueError):
+                code = None
+            if code is None:
+                skipped += 1
+                continue
+            entries.append((code, lat, lng))
+    return entries, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="CSV file")
+    parser.add_argument("output", type=Path, help="gazetteer file to write")
+    parser.add_argument("--code-column", default="eircode")
+    parser.add_argument("--lat-column", default="lat")
+    parser.add_argument("--lng-column", default="lng")
+    args = parser.parse_args()
+
+    entries, skipped = read_entries(args.source, args.code_column, args.lat_column, args.lng_column)
+    if not entries:
+        logger.error("[gazetteer] no usable rows in %s", args.source)
+        sys.exit(1)
+    data = build(entries)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_bytes(data)
+    gazetteer = Gazetteer.open(args.output)
+    logger.info(
+        "[gazetteer] wrote %s: %d records (%d input rows, %d skipped), %.1f KB",
+        args.output, gazetteer.size, len(entries), skipped, len(data) / 1024,
+    )
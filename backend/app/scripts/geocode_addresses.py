@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Fill in missing coordinates on users and collections from the offline gazetteer.
+
+    python -m app.scripts.geocode_addresses              # rows with no coordinates yet
+    python -m app.scripts.geocode_addresses --all        # re-resolve every address (new gazetteer file)
+
+Rows are walked in id order in batches; addresses the gazetteer can't place are left as they are.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select, update
+
+from app.core.gazetteer import geocode
+from app.models import Collection
+from app.models.user import User
+from app.services.db import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("gc")
+
+BATCH_SIZE = 1000
+
+
+async def backfill(session, model, address_col, lat_col, lng_col, everything: bool) -> tuple[int, int]:  # noqa: ANN001
+    """Geocode `address_col` into (`lat_col`, `lng_col`). Returns (rows seen, rows updated)."""
+    seen = updated = 0
+    last_id = 0
+    while True:
+        stmt = select(model.id, address_col).where(model.id > last_id, address_col.is_not(None))
+        if not everything:
+            stmt = stmt.where(lat_col.is_(None))
+        rows = (await session.execute(stmt.order_by(model.id).limit(BATCH_SIZE))).all()
+        if not rows:
+            return seen, updated
+        last_id = rows[-1].id
+        seen += len(rows)
+        params = []
+        for row in rows:
+            point = geocode(row[1])
+            if point is not None:
+                params.append({"id": row.id, lat_col.key: point[0], lng_col.key: point[1]})
+        if params:
+            await session.execute(update(model), params)
+            await session.commit()
+            updated += len(params)
+
+
+async def main(everything: bool) -> None:
+    if SessionLocal is None:
+        logger.warning("[geocode] Database not configured. Set DATABASE_URL.")
+        return
+    async with SessionLocal() as session:
+        seen, updated = await backfill(session, User, User.address, User.lat, User.lng, everything)
+        logger.info("[geocode] users: %d of %d located", updated, seen)
+        seen, updated = await backfill(
+            session, Collection, Collection.pickup_address, Collection.pickup_lat, Collection.pickup_lng, everything
+        )
+        logger.info("[geocode] collections: %d of %d located", updated, seen)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="re-resolve rows that already have coordinates")
+    args = parser.parse_args()
+    asyncio.run(main(args.all))
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+Recount the pickup capacity calendar from the collections table.
+
+    python -m app.scripts.rebuild_capacity                  # windows from today on
+    python -m app.scripts.rebuild_capacity --from 2026-01-01
+
+Run once after migrating, and whenever collections were written around the
+service layer (bulk imports, manual SQL).
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime
+
+from app.services.capacity import rebuild
+from app.services.db import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("gc")
+
+
+async def main(from_day: date) -> None:
+    if SessionLocal is None:
+        logger.warning("[capacity] Database not configured. Set DATABASE_URL.")
+        return
+    async with SessionLocal() as session:
+        windows = await rebuild(session, from_day)
+        await session.commit()
+    logger.info("[capacity] recounted bookings from %s: %d windows in use", from_day, windows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="from_day", type=date.fromisoformat, default=datetime.utcnow().date())
+    args = parser.parse_args()
+    asyncio.run(main(args.from_day))
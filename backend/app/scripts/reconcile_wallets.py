@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Check wallet_balances against the wallet_transactions ledger.
+
+    python -m app.scripts.reconcile_wallets          # report drift, exit 1 if any
+    python -m app.scripts.reconcile_wallets --fix    # rebuild drifted rows from the ledger
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.services.db import SessionLocal
+from app.services.wallet import find_balance_drift, rebuild_balances
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("gc")
+
+
+async def reconcile(fix: bool) -> int:
+    if SessionLocal is None:
+        logger.warning("[reconcile] Database not configured. Set DATABASE_URL.")
+        return 0
+    async with SessionLocal() as session:
+        drift = await find_balance_drift(session)
+        for row in drift:
+            logger.warning(
+                "[reconcile] user %s: stored %s cents (%s), ledger %s cents (%s)",
+                row["user_id"],
+                row["stored_cents"],
+                row["stored_last_updated"],
+                row["ledger_cents"],
+                row["ledger_last_updated"],
+            )
+        if drift and fix:
+            await rebuild_balances(session, [row["user_id"] for row in drift])
+            await session.commit()
+            logger.info("[reconcile] rebuilt %d balance rows", len(drift))
+        elif not drift:
+            logger.info("[reconcile] all balances match the ledger")
+    return len(drift)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted rows from the ledger")
+    args = parser.parse_args()
+    drifted = asyncio.run(reconcile(args.fix))
+    sys.exit(1 if drifted and not args.fix else 0)
@@ -1,11 +1,41 @@
 #!/usr/bin/env python
+"""
+Dev seeding.
+
+    python -m app.scripts.seed                                  # demo user + return points
+    python -m app.scripts.seed --users 100000 --collections 1000000   # bulk synthetic dataset
+"""
+import argparse
 import asyncio
 import logging
-from sqlalchemy import insert
+import random
+import time as _time
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import Table, func, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.gazetteer import geocode
+from app.core.security import get_password_hash
+from app.services.capacity import rebuild as rebuild_capacity
 from app.services.db import engine, SessionLocal, Base
-from app.models import User, ReturnPoint
+from app.services.driver_payouts import EARNING_PER_BAG_CENTS
+from app.services.wallet import rebuild_balances
+from app.models import (
+    Claim,
+    Collection,
+    CollectionSlot,
+    Driver,
+    DriverEarning,
+    DriverPayout,
+    Notification,
+    ReturnPoint,
+    Subscription,
+    User,
+    WalletTransaction,
+)
 
 DEMO_USER = {
     "email": "demo@example.com",
@@ -88,5 +118,392 @@ async def seed() -> None:
         await session.commit()
 
 
+# ---------------------------------------------------------------------------
+# Bulk synthetic data for load testing
+# ---------------------------------------------------------------------------
+
+CHARITY_IDS = ["friends_of_earth", "irish_cancer_society", "barnardos", "an_taisce", "clean_coasts"]
+PLAN_CODES = ["weekly", "monthly", "yearly"]
+COLLECTION_STATUSES = ["scheduled", "assigned", "collected", "completed", "canceled"]
+# Roughly the production mix: most history is completed, a slice is still open.
+COLLECTION_STATUS_WEIGHTS = [10, 8, 4, 68, 10]
+DUBLIN_ZONES = [f"D{n:02d}" for n in range(1, 25)]
+
+
+@dataclass
+class BulkSpec:
+    """
+    Row counts for generate_bulk. Unset counts are derived from users/collections.
+
+    IDs are allocated after the current max of each table, in this order:
+    customers, then one user per driver, then admins. Recurring slots go to the
+    last slot_fraction of the customers, so the first customers can always
+    book one-off collections.
+    """
+
+    users: int
+    collections: int
+    drivers: int | None = None
+    admins: int = 1
+    return_points: int = 200
+    slot_fraction: float = 0.2
+    payouts: int | None = None
+    claims: int | None = None
+    notifications: int | None = None
+    email_prefix: str = "load"
+    password: str = "password123"
+    seed: int = 42
+    batch_size: int = 5_000
+
+    def __post_init__(self) -> None:
+        if self.drivers is None:
+            self.drivers = max(self.users // 100, 1)
+        if self.payouts is None:
+            self.payouts = self.collections // 50
+        if self.claims is None:
+            self.claims = self.collections // 50
+        if self.notifications is None:
+            self.notifications = self.collections // 20
+        if self.users < 1 and (self.collections or self.claims or self.notifications):
+            raise ValueError("collections, claims and notifications belong to customers: users must be at least 1")
+
+
+class _BulkWriter:
+    """Batched inserts: COPY on asyncpg, multi-row executemany everywhere else."""
+
+    def __init__(self, session: AsyncSession, batch_size: int) -> None:
+        self.session = session
+        self.batch_size = batch_size
+        self.use_copy = session.bind.dialect.name == "postgresql" and session.bind.dialect.driver == "asyncpg"
+        self.counts: dict[str, int] = {}
+
+    def _python_defaults(self, table: Table) -> dict[str, Any]:
+        # COPY bypasses SQLAlchemy, so fill the client-side defaults (created_at etc.) ourselves.
+        values = {}
+        for col in table.columns:
+            default = col.default
+            if col.primary_key or default is None:
+                continue
+            if default.is_callable:
+                values[col.name] = default.arg(None)
+            elif default.is_scalar:
+                values[col.name] = default.arg
+        return values
+
+    async def _flush(self, table: Table, batch: list[dict[str, Any]]) -> None:
+        if self.use_copy:
+            defaults = self._python_defaults(table)
+            columns = list({**defaults, **batch[0]})
+            records = [tuple({**defaults, **row}[c] for c in columns) for row in batch]
+            conn = await self.session.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        else:
+            await self.session.execute(insert(table), batch)
+
+    async def write(self, table: Table, rows: Iterable[dict[str, Any]]) -> int:
+        count = 0
+        batch: list[dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self._flush(table, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await self._flush(table, batch)
+            count += len(batch)
+        await self.session.commit()
+        self.counts[table.name] = self.counts.get(table.name, 0) + count
+        logger.info("[seed] %s: %d rows", table.name, count)
+        return count
+
+    async def fix_sequences(self) -> None:
+        # Explicit ids don't advance Postgres serial sequences.
+        if self.session.bind.dialect.name != "postgresql":
+            return
+        for name in self.counts:
+            await self.session.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {name}), 0) + 1, false)"
+                )
+            )
+        await self.session.commit()
+
+
+async def _next_id(session: AsyncSession, model: type) -> int:
+    return int(await session.scalar(select(func.coalesce(func.max(model.id), 0))) or 0) + 1
+
+
+async def generate_bulk(session: AsyncSession, spec: BulkSpec) -> dict[str, int]:
+    """Insert a synthetic dataset shaped like production. Returns rows written per table."""
+    rnd = random.Random(spec.seed)
+    now = datetime.utcnow()
+    writer = _BulkWriter(session, spec.batch_size)
+    if session.bind.dialect.name == "sqlite":
+        await session.execute(text("PRAGMA synchronous = OFF"))
+
+    first_user = await _next_id(session, User)
+    first_driver = await _next_id(session, Driver)
+    first_rp = await _next_id(session, ReturnPoint)
+    first_collection = await _next_id(session, Collection)
+
+    customers = range(first_user, first_user + spec.users)
+    driver_users = range(customers.stop, customers.stop + spec.drivers)
+    admin_users = range(driver_users.stop, driver_users.stop + spec.admins)
+    slot_users = range(customers.stop - int(spec.users * spec.slot_fraction), customers.stop)
+    driver_ids = range(first_driver, first_driver + spec.drivers)
+    rp_ids = range(first_rp, first_rp + spec.return_points)
+    # One bcrypt call for the whole dataset; every generated account shares the password.
+    password_hash = get_password_hash(spec.password)
+    district_points = {zone: geocode(zone) for zone in DUBLIN_ZONES}
+
+    def home(uid: int) -> tuple[str, float | None, float | None]:
+        """Each user's address (and its gazetteer coordinates) is fixed by id."""
+        zone = DUBLIN_ZONES[uid % len(DUBLIN_ZONES)]
+        lat, lng = district_points[zone] or (None, None)
+        return f"{uid} Load Street, Dublin {zone[1:]}", lat, lng
+
+    def users():
+        for uid in range(customers.start, admin_users.stop):
+            address, lat, lng = home(uid)
+            yield {
+                "id": uid,
+                "email": f"{spec.email_prefix}{uid}@example.com",
+                "full_name": f"Load User {uid}",
+                "address": address,
+                "lat": lat,
+                "lng": lng,
+                "password_hash": password_hash,
+                "is_admin": uid in admin_users,
+                "is_driver": uid in driver_users,
+                "token_version": 0,
+            }
+
+    await writer.write(User.__table__, users())
+    await writer.write(
+        Driver.__table__,
+        (
+            {
+                "id": did,
+                "user_id": uid,
+                "vehicle_type": rnd.choice(["van", "car", "bike"]),
+                "is_available": True,
+                "zone": DUBLIN_ZONES[i % len(DUBLIN_ZONES)],
+            }
+            for i, (did, uid) in enumerate(zip(driver_ids, driver_users))
+        ),
+    )
+    await writer.write(
+        ReturnPoint.__table__,
+        (
+            {
+                "id": rp,
+                "external_id": f"{spec.email_prefix}_rp_{rp}",
+                "name": f"Return Point {rp}",
+                "type": "RVM" if rp % 3 else "Manual",
+                "retailer": f"Chain {rp % 7}",
+                "lat": 53.2 + rnd.random() * 0.3,
+                "lng": -6.45 + rnd.random() * 0.35,
+            }
+            for rp in rp_ids
+        ),
+    )
+    today = now.date()
+    await writer.write(
+        Subscription.__table__,
+        (
+            {
+                "user_id": uid,
+                "status": "active" if rnd.random() < 0.9 else "canceled",
+                "plan_code": rnd.choice(PLAN_CODES),
+                "start_date": today - timedelta(days=rnd.randrange(365)),
+                "current_period_start": today - timedelta(days=rnd.randrange(28)),
+                "current_period_end": today + timedelta(days=rnd.randrange(1, 28)),
+            }
+            for uid in customers
+        ),
+    )
+    await writer.write(
+        CollectionSlot.__table__,
+        (
+            {
+                "user_id": uid,
+                "weekday": rnd.randrange(7),
+                "start_time": time(start_hour, 0),
+                "end_time": time(start_hour + 2, 0),
+                "preferred_return_point_id": rnd.choice(rp_ids),
+                "frequency": rnd.choice(["weekly", "fortnightly"]),
+                "status": "active",
+            }
+            for uid, start_hour in ((uid, 8 + rnd.randrange(10)) for uid in slot_users)
+        ),
+    )
+
+    # Completed collections drive wallet credits/donations and driver earnings.
+    completed: list[tuple[int, int, int, str, datetime]] = []
+    collected: list[tuple[int, int, int, datetime]] = []
+
+    def collections():
+        for cid in range(first_collection, first_collection + spec.collections):
+            status = rnd.choices(COLLECTION_STATUSES, COLLECTION_STATUS_WEIGHTS)[0]
+            # Open work sits in the next fortnight, finished work in the past year.
+            if status in ("scheduled", "assigned"):
+                scheduled_at = now + timedelta(minutes=rnd.randrange(14 * 24 * 60))
+            else:
+                scheduled_at = now - timedelta(minutes=rnd.randrange(365 * 24 * 60))
+            scheduled_at = scheduled_at.replace(second=0, microsecond=0)
+            user_id = rnd.choice(customers)
+            driver_id = rnd.choice(driver_ids) if status not in ("scheduled", "canceled") else None
+            bags = rnd.randint(1, 4)
+            donate = rnd.random() < 0.1
+            amount = rnd.randint(100, 2000) if status == "completed" else None
+            if status == "completed":
+                completed.append((cid, user_id, amount, "donate" if donate else "wallet", scheduled_at))
+            if driver_id is not None and status in ("collected", "completed"):
+                collected.append((cid, driver_id, bags, scheduled_at))
+            address, lat, lng = home(user_id)
+            yield {
+                "id": cid,
+                "user_id": user_id,
+                "return_point_id": rnd.choice(rp_ids),
+                "collection_slot_id": None,
+                "scheduled_at": scheduled_at,
+                "status": status,
+                "bag_count": bags,
+                "pickup_address": address,
+                "pickup_lat": lat,
+                "pickup_lng": lng,
+                "driver_id": driver_id,
+                "voucher_amount_cents": amount,
+                "voucher_preference": "donate" if donate else "wallet",
+                "charity_id": rnd.choice(CHARITY_IDS) if donate else None,
+                "collection_type": rnd.choice(["bottles", "glass", "both"]),
+                "is_archived": status in ("completed", "canceled") and rnd.random() < 0.05,
+                "created_at": scheduled_at - timedelta(days=rnd.randint(1, 14)),
+                "updated_at": scheduled_at,
+            }
+
+    await writer.write(Collection.__table__, collections())
+
+    def wallet_rows():
+        for cid, user_id, amount, preference, ts in completed:
+            if preference == "donate":
+                yield {"user_id": user_id, "ts": ts, "kind": "donation", "amount_cents": amount, "collection_id": cid,
+                       "note": f"Donated to a charity — collection #{cid} (€{amount / 100:.2f})"}
+            else:
+                yield {"user_id": user_id, "ts": ts, "kind": "collection_credit", "amount_cents": amount, "collection_id": cid,
+                       "note": f"Credit for collection #{cid} (voucher €{amount / 100:.2f})"}
+
+    await writer.write(WalletTransaction.__table__, wallet_rows())
+    # The ledger is the source of truth; cheaper to recompute once than to upsert per row.
+    await rebuild_balances(session)
+    # Likewise the capacity calendar: count upcoming bookings once, not per insert.
+    await rebuild_capacity(session, now.date())
+    await session.commit()
+    await writer.write(
+        DriverEarning.__table__,
+        (
+            {"driver_id": did, "collection_id": cid, "amount_cents": bags * EARNING_PER_BAG_CENTS, "created_at": ts}
+            for cid, did, bags, ts in collected
+        ),
+    )
+    await writer.write(
+        DriverPayout.__table__,
+        (
+            {"driver_id": rnd.choice(driver_ids), "amount_cents": rnd.randint(20, 200) * 100, "note": "Weekly payout",
+             "created_at": now - timedelta(days=rnd.randrange(365))}
+            for _ in range(spec.payouts)
+        ),
+    )
+    await writer.write(
+        Claim.__table__,
+        (
+            {
+                "user_id": rnd.choice(customers),
+                "description": "Bags were not collected at the scheduled time.",
+                "status": rnd.choices(["open", "in_review", "resolved"], [2, 1, 7])[0],
+                "created_at": now - timedelta(days=rnd.randrange(365)),
+                "updated_at": now,
+            }
+            for _ in range(spec.claims)
+        ),
+    )
+    await writer.write(
+        Notification.__table__,
+        (
+            {
+                # ~5% are broadcasts (user_id NULL).
+                "user_id": rnd.choice(customers) if rnd.random() >= 0.05 else None,
+                "title": "Collection update",
+                "body": "Your bottles have been collected.",
+                "is_read": rnd.random() < 0.7,
+                "created_at": now - timedelta(days=rnd.randrange(365)),
+            }
+            for _ in range(spec.notifications)
+        ),
+    )
+    await writer.fix_sequences()
+    return writer.counts
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Seed demo data, or generate a bulk synthetic dataset with --users/--collections.",
+    )
+    parser.add_argument("--users", type=int, default=0, help="customer accounts to generate")
+    parser.add_argument("--collections", type=int, default=0, help="collections to generate")
+    parser.add_argument("--drivers", type=int, default=None, help="default: users / 100")
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--return-points", type=int, default=200)
+    parser.add_argument("--slot-fraction", type=float, default=0.2, help="share of customers with a recurring slot")
+    parser.add_argument("--payouts", type=int, default=None, help="default: collections / 50")
+    parser.add_argument("--claims", type=int, default=None, help="default: collections / 50")
+    parser.add_argument("--notifications", type=int, default=None, help="default: collections / 20")
+    parser.add_argument("--email-prefix", default="load", help="generated emails are <prefix><id>@example.com")
+    parser.add_argument("--password", default="password123", help="password for every generated account")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same dataset)")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    args = parser.parse_args(argv)
+    if args.users < 1:
+        # These rows belong to generated customers; without --users they'd silently seed the demo data.
+        for flag in ("collections", "claims", "notifications"):
+            if getattr(args, flag):
+                parser.error(f"--{flag} needs --users (they belong to generated customers)")
+    return args
+
+
+async def seed_bulk(args: argparse.Namespace) -> None:
+    if engine is None or SessionLocal is None:
+        logger.warning("[seed] Database not configured. Set DATABASE_URL.")
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    spec = BulkSpec(
+        users=args.users,
+        collections=args.collections,
+        drivers=args.drivers,
+        admins=args.admins,
+        return_points=args.return_points,
+        slot_fraction=args.slot_fraction,
+        payouts=args.payouts,
+        claims=args.claims,
+        notifications=args.notifications,
+        email_prefix=args.email_prefix,
+        password=args.password,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    started = _time.perf_counter()
+    async with SessionLocal() as session:
+        counts = await generate_bulk(session, spec)
+    logger.info("[seed] %d rows in %.1fs", sum(counts.values()), _time.perf_counter() - started)
+
+
 if __name__ == "__main__":
-    asyncio.run(seed())
+    cli_args = _parse_args()
+    if cli_args.users or cli_args.collections:
+        asyncio.run(seed_bulk(cli_args))
+    else:
+        asyncio.run(seed())
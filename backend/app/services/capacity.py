@@ -0,0 +1,174 @@
+"""
+Pickup capacity calendar: booked counters per (zone, time window).
+
+A zone is the Eircode routing key of the pickup address (UNZONED when it
+has none); windows tile the service day in `pickup_window_minutes` slices.
+`pickup_capacity.booked` follows the live, non-canceled collections in each
+window and is maintained by the write paths in their own transaction:
+reserve() on booking, add_bookings() on recurring generation, release() on
+cancel. Checking or taking a place is one primary-key upsert, never a
+COUNT over collections; rebuild() recomputes the counters from scratch.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..core.eircode import routing_key
+from ..models import Collection, PickupCapacity
+from .collection_slots import SERVICE_END, SERVICE_START
+from .db import dialect_insert
+
+UNZONED = "*"
+_UPSERT_CHUNK = 1000
+
+Window = tuple[str, datetime]  # (zone, starts_at)
+
+
+def capacity_zone(pickup_address: str | None) -> str:
+    return routing_key(pickup_address) or UNZONED
+
+
+def _window_minutes() -> int:
+    return max(1, get_settings().pickup_window_minutes)
+
+
+def _windows_per_day() -> int:
+    span = (SERVICE_END.hour - SERVICE_START.hour) * 60 + SERVICE_END.minute - SERVICE_START.minute
+    return max(1, -(-span // _window_minutes()))
+
+
+def window_start(scheduled_at: datetime) -> datetime:
+    """Start of the window `scheduled_at` falls in; SERVICE_END itself belongs to the last window."""
+    day_start = datetime.combine(scheduled_at.date(), SERVICE_START)
+    minutes = max(0, int((scheduled_at - day_start).total_seconds()) // 60)
+    index = min(minutes // _window_minutes(), _windows_per_day() - 1)
+    return day_start + timedelta(minutes=index * _window_minutes())
+
+
+def window_for(pickup_address: str | None, scheduled_at: datetime) -> Window:
+    return capacity_zone(pickup_address), window_start(scheduled_at)
+
+
+def day_windows(day: date) -> list[tuple[datetime, datetime]]:
+    """(starts_at, ends_at) of every window on `day`, the last one cut at SERVICE_END."""
+    day_start = datetime.combine(day, SERVICE_START)
+    day_end = datetime.combine(day, SERVICE_END)
+    step = timedelta(minutes=_window_minutes())
+    return [
+        (day_start + i * step, min(day_start + (i + 1) * step, day_end))
+        for i in range(_windows_per_day())
+    ]
+
+
+async def reserve(session: AsyncSession, window: Window) -> bool:
+    """
+    Take one place in `window`; False when it is full (roll back then). The
+    upsert's WHERE re-checks under the row lock, so concurrent bookings can't overfill.
+    """
+    default_capacity = get_settings().pickup_window_capacity
+    zone, starts_at = window
+    stmt = dialect_insert(session, PickupCapacity).values(
+        zone=zone, starts_at=starts_at, capacity=default_capacity, booked=1
+    )
+    current = PickupCapacity.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[current.zone, current.starts_at],
+        set_={"booked": current.booked + 1},
+        where=current.booked < current.capacity,
+    ).returning(current.booked, current.capacity)
+    row = (await session.execute(stmt)).first()
+    return row is not None and row.booked <= row.capacity
+
+
+async def add_bookings(session: AsyncSession, windows: Iterable[Window]) -> None:
+    """Count bookings that must not be refused (recurring pickups): may push a window over capacity."""
+    counts = Counter(windows)
+    if not counts:
+        return
+    default_capacity = get_settings().pickup_window_capacity
+    rows = [
+        {"zone": zone, "starts_at": starts_at, "capacity": default_capacity, "booked": n}
+        for (zone, starts_at), n in counts.items()
+    ]
+    current = PickupCapacity.__table__.c
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = dialect_insert(session, PickupCapacity).values(rows[start:start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.zone, current.starts_at],
+            set_={"booked": current.booked + stmt.excluded.booked},
+        )
+        await session.execute(stmt)
+
+
+async def release(session: AsyncSession, windows: Iterable[Window]) -> None:
+    """Give back one place per entry in `windows` (one executemany for all of them)."""
+    counts = Counter(windows)
+    if not counts:
+        return
+    table = PickupCapacity.__table__
+    n = bindparam("n")
+    stmt = (
+        update(table)
+        .where(table.c.zone == bindparam("w_zone"), table.c.starts_at == bindparam("w_starts_at"))
+        .values(booked=case((table.c.booked > n, table.c.booked - n), else_=0))
+    )
+    await session.execute(
+        stmt, [{"w_zone": zone, "w_starts_at": starts_at, "n": count} for (zone, starts_at), count in counts.items()]
+    )
+
+
+async def availability(session: AsyncSession, zone: str, week_start: date, now: datetime | None = None) -> list[dict]:
+    """
+    Open windows in `zone` for the 7 days from `week_start`: every window that
+    hasn't ended and has a place left, read from the counters in one range scan.
+    """
+    now = now or datetime.utcnow()
+    first = datetime.combine(week_start, SERVICE_START)
+    rows = (
+        await session.execute(
+            select(PickupCapacity.starts_at, PickupCapacity.capacity, PickupCapacity.booked).where(
+                PickupCapacity.zone == zone,
+                PickupCapacity.starts_at >= first,
+                PickupCapacity.starts_at < first + timedelta(days=7),
+            )
+        )
+    ).all()
+    counters = {r.starts_at: (r.capacity, r.booked) for r in rows}
+    default_capacity = get_settings().pickup_window_capacity
+    windows = []
+    for offset in range(7):
+        for starts_at, ends_at in day_windows(week_start + timedelta(days=offset)):
+            capacity, booked = counters.get(starts_at, (default_capacity, 0))
+            if ends_at <= now or booked >= capacity:
+                continue
+            windows.append({"startsAt": starts_at, "endsAt": ends_at, "capacity": capacity, "remaining": capacity - booked})
+    return windows
+
+
+async def rebuild(session: AsyncSession, from_day: date) -> int:
+    """
+    Recount `booked` for every window from `from_day` on, from the live
+    collections. Returns the number of windows with bookings; doesn't commit.
+    """
+    since = datetime.combine(from_day, datetime.min.time())
+    counts: Counter[Window] = Counter()
+    result = await session.stream(
+        select(Collection.pickup_address, Collection.scheduled_at)
+        .where(
+            Collection.is_archived == False,  # noqa: E712
+            Collection.status != "canceled",
+            Collection.scheduled_at >= since,
+        )
+        .execution_options(yield_per=_UPSERT_CHUNK)
+    )
+    async for partition in result.partitions():
+        counts.update(window_for(address, scheduled_at) for address, scheduled_at in partition)
+
+    await session.execute(update(PickupCapacity).where(PickupCapacity.starts_at >= since).values(booked=0))
+    await add_bookings(session, counts.elements())
+    return len(counts)
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select as sa_select, and_
 
 from ..models import CollectionSlot, ReturnPoint, Collection
+from ..models.user import User
 from datetime import datetime
 
 SERVICE_START = time_cls(8, 0)
@@ -15,6 +16,16 @@ def _validate_service_time(value: time_cls) -> None:
         raise ValueError("You can only book collections between 08:00 and 20:00.")
 
 
+async def lock_user_bookings(session: AsyncSession, user_id: int) -> None:
+    """
+    Serialise one user's booking checks until the transaction ends, so two
+    concurrent requests can't both pass "no slot / one per week" under READ
+    COMMITTED. Postgres only: SQLite already runs one writer at a time.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+
 async def get_me(session: AsyncSession, user_id: int) -> CollectionSlot | None:
     stmt = (
         select(CollectionSlot)
@@ -60,6 +71,7 @@ async def upsert(
 
     # Block enabling schedule if user has any upcoming one-off collection
     # (exclude recurring collections, canceled, completed)
+    await lock_user_bookings(session, user_id)
     now = datetime.utcnow()
     upcoming = await session.scalar(
         sa_select(sa_select(Collection.id).where(
@@ -134,6 +146,7 @@ async def resume_slot(session: AsyncSession, user_id: int, slot_id: int) -> Coll
     if slot.status not in ("paused",):
         return None
     # Same validation as upsert: no conflicting one-offs
+    await lock_user_bookings(session, user_id)
     now = datetime.utcnow()
     upcoming = await session.scalar(
         sa_select(sa_select(Collection.id).where(
@@ -1,19 +1,26 @@
 from datetime import datetime, timedelta, time as time_cls
 from typing import Tuple, List
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import Row, select, func, and_, case, desc, insert, literal, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.events import publish_event
-from ..models import Collection, CollectionSlot, Driver, WalletTransaction
+from ..core.gazetteer import geocode
+from ..models import Collection, CollectionSlot, Driver, ReturnPoint
 from ..models.user import User
-from .wallet import credit_wallet_for_collection
+from .capacity import release, reserve, window_for
+from .collection_slots import lock_user_bookings
+from .wallet import add_transactions, credit_wallet_for_collection, get_balance, get_balances
 from pathlib import Path
 
 SERVICE_START = time_cls(8, 0)
 SERVICE_END = time_cls(20, 0)
 
 
+class TransitionConflict(ValueError):
+    """A guarded status transition matched no row: the collection's status or version has moved on."""
+
+
 def _validate_scheduled_at(scheduled_at: datetime) -> None:
     now = datetime.utcnow()
     if scheduled_at < now:
@@ -23,39 +30,21 @@ def _validate_scheduled_at(scheduled_at: datetime) -> None:
         raise ValueError("You can only book collections between 08:00 and 20:00.")
 
 
-async def create(
-    session: AsyncSession,
-    user_id: int,
-    scheduled_at: datetime,
-    return_point_id: int,
-    bag_count: int | None,
-    notes: str | None,
-    pickup_address: str | None = None,
-    voucher_preference: str | None = "wallet",
-    charity_id: str | None = None,
-    collection_type: str | None = "bottles",
-) -> Collection:
-    _validate_scheduled_at(scheduled_at)
-    # Block if user has an active recurring slot
-    has_slot = await session.scalar(
-        select(select(CollectionSlot.id).where(
-            CollectionSlot.user_id == user_id,
-            CollectionSlot.status == "active",
-        ).exists())
+def _has_active_slot(user_id: int):
+    return (
+        select(CollectionSlot.id)
+        .where(CollectionSlot.user_id == user_id, CollectionSlot.status == "active")
+        .exists()
     )
-    if has_slot:
-        raise ValueError("You already have a recurring pickup scheduled. Disable it before creating a one-off collection.")
-    # Enforce 1 pickup per ISO week per user (exclude archived/canceled)
-    year, week, _ = scheduled_at.isocalendar()
-    # Compute week start (Monday) and end (Sunday)
-    # Find Monday of that week
+
+
+def _has_one_off_in_week(user_id: int, scheduled_at: datetime):
+    # ISO week: Monday 00:00 to the following Monday (exclude archived/canceled)
     monday = scheduled_at - timedelta(days=scheduled_at.weekday())
     week_start = datetime(monday.year, monday.month, monday.day, 0, 0, 0)
     week_end = week_start + timedelta(days=7)
-
-    conflict_stmt = (
-        select(func.count())
-        .select_from(Collection)
+    return (
+        select(Collection.id)
         .where(
             and_(
                 Collection.user_id == user_id,
@@ -66,52 +55,182 @@ async def create(
                 Collection.scheduled_at < week_end,
             )
         )
+        .exists()
     )
-    conflicts = await session.scalar(conflict_stmt)
-    if int(conflicts or 0) > 0:
-        raise ValueError("Weekly pickup limit reached. You can only have one pickup per week.")
 
-    col = Collection(
-        user_id=user_id,
-        scheduled_at=scheduled_at,
-        return_point_id=return_point_id,
-        bag_count=bag_count or 1,
-        notes=notes,
-        pickup_address=pickup_address,
-        voucher_preference=voucher_preference or "wallet",
-        charity_id=charity_id,
-        collection_type=collection_type or "bottles",
-        status="scheduled",
+
+async def create(
+    session: AsyncSession,
+    user_id: int,
+    scheduled_at: datetime,
+    return_point_id: int,
+    bag_count: int | None,
+    notes: str | None,
+    pickup_address: str | None = None,
+    voucher_preference: str | None = "wallet",
+    charity_id: str | None = None,
+    collection_type: str | None = "bottles",
+) -> tuple[Collection, str | None]:
+    """
+    Book a one-off collection; returns (collection, return point name).
+
+    A place in the pickup window is taken first with one upsert on its
+    capacity counter, so a full window is refused without touching
+    collections. Validation and insert are then a single INSERT ... SELECT
+    ... WHERE NOT EXISTS ... RETURNING, so a successful booking is two round
+    trips. A rejected booking pays for one more query to pick the error message.
+    On Postgres the user's row is locked first (lock_user_bookings), since
+    NOT EXISTS alone lets two concurrent bookings both pass.
+    """
+    _validate_scheduled_at(scheduled_at)
+    await lock_user_bookings(session, user_id)
+    if not await reserve(session, window_for(pickup_address, scheduled_at)):
+        await session.rollback()
+        raise ValueError("That pickup window is fully booked. Please choose another time.")
+    now = datetime.utcnow()
+    pickup_lat, pickup_lng = geocode(pickup_address) or (None, None)
+    values = {
+        "user_id": user_id,
+        "scheduled_at": scheduled_at,
+        "return_point_id": return_point_id,
+        "bag_count": bag_count or 1,
+        "notes": notes,
+        "pickup_address": pickup_address,
+        "pickup_lat": pickup_lat,
+        "pickup_lng": pickup_lng,
+        "voucher_preference": voucher_preference or "wallet",
+        "charity_id": charity_id,
+        "collection_type": collection_type or "bottles",
+        "status": "scheduled",
+        "is_archived": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+    columns = Collection.__table__.c
+    source = select(*(literal(v, columns[k].type) for k, v in values.items())).where(
+        ~_has_active_slot(user_id), ~_has_one_off_in_week(user_id, scheduled_at)
     )
-    session.add(col)
+    return_point_name = select(ReturnPoint.name).where(ReturnPoint.id == return_point_id).scalar_subquery()
+    stmt = insert(Collection).from_select(list(values), source).returning(Collection, return_point_name)
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        has_slot = await session.scalar(select(_has_active_slot(user_id)))
+        await session.rollback()  # gives back the window place
+        if has_slot:
+            raise ValueError("You already have a recurring pickup scheduled. Disable it before creating a one-off collection.")
+        raise ValueError("Weekly pickup limit reached. You can only have one pickup per week.")
     await session.commit()
-    await session.refresh(col)
-    return col
+    return row[0], row[1]
+
+
+# Projected columns for list views: rows come back as tuples, no ORM identity-map work.
+ME_LIST_COLUMNS = (
+    Collection.id,
+    Collection.user_id,
+    Collection.scheduled_at,
+    Collection.return_point_id,
+    Collection.status,
+    Collection.bag_count,
+    Collection.notes,
+    Collection.pickup_address,
+    Collection.voucher_amount_cents,
+    Collection.voucher_preference,
+    Collection.charity_id,
+    Collection.collection_type,
+    Collection.created_at,
+    Collection.updated_at,
+    Collection.version,
+)
+ADMIN_LIST_COLUMNS = (
+    Collection.id,
+    Collection.user_id,
+    Collection.return_point_id,
+    Collection.scheduled_at,
+    Collection.status,
+    Collection.bag_count,
+    Collection.notes,
+    Collection.driver_id,
+    Collection.proof_url,
+    Collection.voucher_amount_cents,
+    Collection.collection_slot_id,
+    Collection.collection_type,
+    Collection.version,
+)
+
+
+def _keyset_page(stmt, page_size: int, after: Tuple[datetime, int] | None):
+    """Newest-first by (scheduled_at, id), one extra row to detect a next page."""
+    if after is not None:
+        stmt = stmt.where(tuple_(Collection.scheduled_at, Collection.id) < tuple_(*after))
+    return stmt.order_by(desc(Collection.scheduled_at), desc(Collection.id)).limit(page_size + 1)
+
+
+def _split_page(rows: list[Row], page_size: int) -> Tuple[List[Row], Tuple[datetime, int] | None]:
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (rows[-1].scheduled_at, rows[-1].id)
 
 
 async def list_me(
-    session: AsyncSession, user_id: int, status: str | None, page: int, page_size: int
-) -> Tuple[List[Collection], int]:
-    base = select(Collection).where(Collection.user_id == user_id, Collection.is_archived == False)  # noqa: E712
+    session: AsyncSession,
+    user_id: int,
+    status: str | None,
+    page: int,
+    page_size: int,
+    after: Tuple[datetime, int] | None = None,
+) -> Tuple[List[Row], int | None, Tuple[datetime, int] | None]:
+    """
+    A page of the user's live collections as ME_LIST_COLUMNS rows.
+
+    With `after` (the (scheduled_at, id) of the last row seen) this is a keyset
+    page: `page` is ignored and total is None, so no COUNT(*) is run. Without
+    it, OFFSET paging with a total, as before. Returns (rows, total, next_key).
+    """
+    base = select(*ME_LIST_COLUMNS).where(Collection.user_id == user_id, Collection.is_archived == False)  # noqa: E712
     if status:
         base = base.where(Collection.status == status)
-    total = await session.scalar(select(func.count()).select_from(base.subquery()))
-    rows = (
-        await session.execute(base.order_by(Collection.scheduled_at.desc()).offset((page - 1) * page_size).limit(page_size))
-    ).scalars().all()
-    return rows, int(total or 0)
+    total = None
+    stmt = _keyset_page(base, page_size, after)
+    if after is None:
+        total = int(await session.scalar(select(func.count()).select_from(base.subquery())) or 0)
+        stmt = stmt.offset((page - 1) * page_size)
+    rows, next_key = _split_page(list((await session.execute(stmt)).all()), page_size)
+    return rows, total, next_key
 
 
-async def cancel(session: AsyncSession, user_id: int, id_: int) -> Collection | None:
-    stmt = select(Collection).where(Collection.id == id_, Collection.user_id == user_id).limit(1)
-    col = (await session.execute(stmt)).scalars().first()
-    if col is None:
-        return None
-    col.status = "canceled"
-    await session.commit()
-    await session.refresh(col)
-    return col
+async def list_admin(
+    session: AsyncSession,
+    limit: int,
+    after: Tuple[datetime, int] | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    driver_id: int | None = None,
+    return_point_id: int | None = None,
+    zone: str | None = None,
+) -> Tuple[List[Row], Tuple[datetime, int] | None]:
+    """
+    Keyset page of live collections for the admin list, as ADMIN_LIST_COLUMNS rows.
 
+    Each filter narrows to a (filter column, scheduled_at, id) index; `zone`
+    matches collections assigned to a driver in that zone. Returns (rows, next_key).
+    """
+    stmt = select(*ADMIN_LIST_COLUMNS).where(Collection.is_archived == False)  # noqa: E712
+    if status:
+        stmt = stmt.where(Collection.status == status)
+    if since is not None:
+        stmt = stmt.where(Collection.scheduled_at >= since)
+    if until is not None:
+        stmt = stmt.where(Collection.scheduled_at < until)
+    if driver_id is not None:
+        stmt = stmt.where(Collection.driver_id == driver_id)
+    if return_point_id is not None:
+        stmt = stmt.where(Collection.return_point_id == return_point_id)
+    if zone:
+        stmt = stmt.where(Collection.driver_id.in_(select(Driver.id).where(Driver.zone == zone)))
+    rows = list((await session.execute(_keyset_page(stmt, limit, after))).all())
+    return _split_page(rows, limit)
 
 
 ALLOWED_TRANSITIONS: dict[str, set[str]] = {
@@ -125,55 +244,120 @@ ALLOWED_TRANSITIONS: dict[str, set[str]] = {
 VALID_STATUSES = {"scheduled", "assigned", "collected", "completed", "canceled"}
 
 
-async def admin_transition_status(session: AsyncSession, id_: int, new_status: str) -> tuple[Collection | None, str | None]:
-    stmt = select(Collection).where(Collection.id == id_).limit(1)
-    col = (await session.execute(stmt)).scalars().first()
+def sources_for(new_status: str) -> list[str]:
+    """Statuses that may move to `new_status`."""
+    return [current for current, allowed in ALLOWED_TRANSITIONS.items() if new_status in allowed]
+
+
+async def transition(
+    session: AsyncSession,
+    id_: int,
+    sources: list[str],
+    values: dict,
+    *where,
+    expected_version: int | None = None,
+) -> Collection | None:
+    """
+    Move collection `id_` out of one of `sources` with a single conditional
+    UPDATE ... RETURNING, applying `values`, bumping `version` and guarded by
+    any extra `where` clauses (and `version = expected_version` if given).
+    Returns the updated row, or None when nothing matched.
+    """
+    stmt = (
+        update(Collection)
+        .where(Collection.id == id_, Collection.status.in_(sources), *where)
+        .values(**values, version=Collection.version + 1, updated_at=datetime.utcnow())
+        .returning(Collection)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(Collection.version == expected_version)
+    return (await session.execute(stmt)).scalars().first()
+
+
+def conflict_for(row: Row, sources: list[str], expected_version: int | None, invalid: str) -> TransitionConflict:
+    """Why a transition matched nothing, given the row's current (status, version)."""
+    if row.status not in sources:
+        return TransitionConflict(invalid)
+    if expected_version is not None and row.version != expected_version:
+        return TransitionConflict(f"Collection is at version {row.version}, not {expected_version}")
+    return TransitionConflict("Collection was changed concurrently; reload and retry")
+
+
+async def cancel(session: AsyncSession, user_id: int, id_: int, expected_version: int | None = None) -> Collection | None:
+    """
+    Cancel the user's collection in one conditional UPDATE. Returns None if
+    the user has no such collection; raises TransitionConflict if it can no
+    longer be canceled (or is not at `expected_version`).
+    """
+    sources = sources_for("canceled")
+    col = await transition(
+        session, id_, sources, {"status": "canceled"}, Collection.user_id == user_id, expected_version=expected_version
+    )
     if col is None:
-        return None, None
-    current = col.status
+        row = (
+            await session.execute(
+                select(Collection.status, Collection.version).where(Collection.id == id_, Collection.user_id == user_id)
+            )
+        ).first()
+        if row is None:
+            return None
+        raise conflict_for(row, sources, expected_version, f"Cannot cancel: current status is '{row.status}'")
+    await release(session, [window_for(col.pickup_address, col.scheduled_at)])
+    await session.commit()
+    return col
+
+
+def credit_note(collection_id: int, amount_cents: int, driver_id: int | None, proof_url: str | None) -> str:
+    proof_ref = "-"
+    if proof_url:
+        proof_ref = Path(proof_url).name or "-"
+        if len(proof_ref) > 64:
+            proof_ref = proof_ref[:61] + "..."
+    return (
+        f"Credit for collection #{collection_id} "
+        f"(voucher €{amount_cents / 100:.2f}) "
+        f"driver_id={driver_id or '-'} "
+        f"proof={proof_ref}"
+    )
+
+
+async def admin_transition_status(
+    session: AsyncSession, id_: int, new_status: str, expected_version: int | None = None
+) -> tuple[Collection | None, str | None]:
+    """
+    Admin status change as one conditional UPDATE ... RETURNING. Returns
+    (None, None) if not found, (None, error) for an unknown status; raises
+    TransitionConflict when the current status doesn't allow the move (or
+    the row is not at `expected_version`).
+    """
     if new_status not in VALID_STATUSES:
-        return col, "Invalid status"
-    allowed = ALLOWED_TRANSITIONS.get(current, set())
-    if new_status not in allowed:
-        return col, f"Invalid transition: {current} -> {new_status}"
-    col.status = new_status
+        return None, "Invalid status"
+    sources = sources_for(new_status)
+    col = await transition(session, id_, sources, {"status": new_status}, expected_version=expected_version)
+    if col is None:
+        row = (await session.execute(select(Collection.status, Collection.version).where(Collection.id == id_))).first()
+        if row is None:
+            return None, None
+        raise conflict_for(row, sources, expected_version, f"Invalid transition: {row.status} -> {new_status}")
+
+    if new_status == "canceled":
+        await release(session, [window_for(col.pickup_address, col.scheduled_at)])
 
     # Auto-credit wallet when collection is completed
     if new_status == "completed":
-        # Idempotency: check if credit already exists for this collection
-        existing_credit = await session.scalar(
-            select(func.count())
-            .select_from(WalletTransaction)
-            .where(
-                WalletTransaction.user_id == col.user_id,
-                WalletTransaction.kind == "collection_credit",
-                WalletTransaction.note.like(f"%collection #{col.id}%"),
+        # Idempotent per (collection_id, kind): an existing credit makes the insert a no-op.
+        amount_cents = int(col.voucher_amount_cents or 0)
+        if amount_cents > 0:
+            await credit_wallet_for_collection(
+                session,
+                col.user_id,
+                col.id,
+                amount_cents,
+                note=credit_note(col.id, amount_cents, col.driver_id, col.proof_url),
             )
-        )
-        if int(existing_credit or 0) == 0:
-            amount_cents = int(col.voucher_amount_cents or 0)
-            if amount_cents > 0:
-                proof_ref = "-"
-                if col.proof_url:
-                    proof_ref = Path(col.proof_url).name or "-"
-                    if len(proof_ref) > 64:
-                        proof_ref = proof_ref[:61] + "..."
-                note = (
-                    f"Credit for collection #{col.id} "
-                    f"(voucher €{amount_cents / 100:.2f}) "
-                    f"driver_id={col.driver_id or '-'} "
-                    f"proof={proof_ref}"
-                )
-                await credit_wallet_for_collection(
-                    session,
-                    col.user_id,
-                    col.id,
-                    amount_cents,
-                    note=note,
-                )
 
     await session.commit()
-    await session.refresh(col)
 
     # Publish events for admin-triggered completion
     if new_status == "completed":
@@ -187,20 +371,99 @@ async def admin_transition_status(session: AsyncSession, id_: int, new_status: s
             })
             amount_cents = int(col.voucher_amount_cents or 0)
             if amount_cents > 0:
-                balance = await session.scalar(
-                    select(func.coalesce(func.sum(WalletTransaction.amount_cents), 0)).where(
-                        WalletTransaction.user_id == col.user_id
-                    )
-                )
+                balance_cents, _ = await get_balance(session, col.user_id)
                 await publish_event("wallet.credit.created", {
                     "email": user.email,
                     "amount_eur": amount_cents / 100,
-                    "new_balance_eur": int(balance or 0) / 100,
+                    "new_balance_eur": balance_cents / 100,
                 })
 
     return col, None
 
 
+async def bulk_transition_status(
+    session: AsyncSession, ids: list[int], new_status: str
+) -> tuple[dict[int, str | None], list[tuple[str, dict]]]:
+    """
+    Apply one status transition to many collections.
+
+    Only rows whose current status allows `new_status` are touched, by a
+    single UPDATE ... WHERE id IN (...) AND status IN (...) RETURNING. For
+    `completed`, wallet credits are batch-inserted (idempotent per collection)
+    and balances upserted once. Returns ({id: None on success, else an error
+    message or "Not found"}, [(event_name, payload)]) with the events for the
+    caller to publish after the commit. Raises ValueError for an unknown status.
+    """
+    if new_status not in VALID_STATUSES:
+        raise ValueError("Invalid status")
+    ids = list(dict.fromkeys(ids))
+    sources = sources_for(new_status)
+    stmt = (
+        update(Collection)
+        .where(Collection.id.in_(ids), Collection.status.in_(sources))
+        .values(status=new_status, version=Collection.version + 1, updated_at=datetime.utcnow())
+        .returning(
+            Collection.id,
+            Collection.user_id,
+            Collection.driver_id,
+            Collection.proof_url,
+            Collection.voucher_amount_cents,
+            Collection.pickup_address,
+            Collection.scheduled_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    changed = list((await session.execute(stmt)).all()) if sources else []
+    if new_status == "canceled":
+        await release(session, [window_for(row.pickup_address, row.scheduled_at) for row in changed])
+
+    outcomes: dict[int, str | None] = {row.id: None for row in changed}
+    rest = [id_ for id_ in ids if id_ not in outcomes]
+    if rest:
+        current = dict((await session.execute(select(Collection.id, Collection.status).where(Collection.id.in_(rest)))).all())
+        for id_ in rest:
+            outcomes[id_] = f"Invalid transition: {current[id_]} -> {new_status}" if id_ in current else "Not found"
+    outcomes = {id_: outcomes[id_] for id_ in ids}  # request order
+
+    credited: list[tuple[int, int, int]] = []
+    if new_status == "completed":
+        rows = [
+            {
+                "user_id": row.user_id,
+                "kind": "collection_credit",
+                "amount_cents": int(row.voucher_amount_cents),
+                "note": credit_note(row.id, int(row.voucher_amount_cents), row.driver_id, row.proof_url),
+                "collection_id": row.id,
+            }
+            for row in changed
+            if (row.voucher_amount_cents or 0) > 0
+        ]
+        credited = [(t.collection_id, t.user_id, t.amount_cents) for t in await add_transactions(session, rows)]
+    await session.commit()
+
+    events: list[tuple[str, dict]] = []
+    if new_status == "completed" and changed:
+        user_ids = {row.user_id for row in changed}
+        emails = dict((await session.execute(select(User.id, User.email).where(User.id.in_(user_ids)))).all())
+        for row in changed:
+            if row.user_id in emails:
+                events.append(("collection.completed", {
+                    "email": emails[row.user_id],
+                    "collection_id": row.id,
+                    "proof_url": row.proof_url or "",
+                    "voucher_amount_eur": (row.voucher_amount_cents or 0) / 100,
+                }))
+        balances = await get_balances(session, {user_id for _, user_id, _ in credited}) if credited else {}
+        for _, user_id, amount_cents in credited:
+            if user_id in emails:
+                events.append(("wallet.credit.created", {
+                    "email": emails[user_id],
+                    "amount_eur": amount_cents / 100,
+                    "new_balance_eur": balances.get(user_id, 0) / 100,
+                }))
+    return outcomes, events
+
+
 async def assign_driver(session: AsyncSession, collection_id: int, driver_id: int) -> tuple[Collection | None, str | None]:
     col = (await session.execute(select(Collection).where(Collection.id == collection_id).limit(1))).scalars().first()
     if col is None:
@@ -213,11 +476,49 @@ async def assign_driver(session: AsyncSession, collection_id: int, driver_id: in
     col.driver_id = driver.id
     if col.status == "scheduled":
         col.status = "assigned"
+    col.version += 1
     await session.commit()
     await session.refresh(col)
     return col, None
 
 
+async def bulk_assign_driver(session: AsyncSession, pairs: list[tuple[int, int]]) -> dict[int, str | None]:
+    """
+    Assign drivers to many collections: one query validates every driver id,
+    one UPDATE ... SET driver_id = CASE id ... applies all assignments and the
+    scheduled -> assigned moves, same rules as assign_driver.
+
+    A collection listed twice takes its last pair. Returns {collection_id:
+    None on success, "Driver not found" or "Not found"} in request order.
+    """
+    wanted = dict(pairs)
+    driver_ids = set(wanted.values())
+    known = set((await session.scalars(select(Driver.id).where(Driver.id.in_(driver_ids)))).all())
+    outcomes: dict[int, str | None] = {
+        col_id: None if driver_id in known else "Driver not found" for col_id, driver_id in wanted.items()
+    }
+    to_apply = {col_id: driver_id for col_id, driver_id in wanted.items() if driver_id in known}
+    if to_apply:
+        stmt = (
+            update(Collection)
+            .where(Collection.id.in_(list(to_apply)))
+            .values(
+                driver_id=case(to_apply, value=Collection.id),
+                status=case((Collection.status == "scheduled", "assigned"), else_=Collection.status),
+                version=Collection.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(Collection.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set((await session.scalars(stmt)).all())
+        for col_id in to_apply:
+            if col_id not in updated:
+                outcomes[col_id] = "Not found"
+        await session.commit()
+    return outcomes
+
+
 async def delete_canceled(session: AsyncSession, user_id: int, id_: int) -> tuple[bool, str | None]:
     """
     Soft delete (archive) a collection if it belongs to the user and is already canceled.
@@ -1,10 +1,19 @@
-from typing import AsyncGenerator
+import logging
+import time
+from typing import Any, AsyncGenerator
 import os
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Depends
+from sqlalchemy import event, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from ..config import get_settings
+from ..config import Settings, get_settings
+
+logger = logging.getLogger("gc.db")
 
 
 class Base(DeclarativeBase):
@@ -14,6 +23,15 @@ class Base(DeclarativeBase):
 _settings = get_settings()
 _running_alembic = os.getenv("RUNNING_ALEMBIC") == "1"
 
+
+def _normalize_url(url: str | None) -> str | None:
+    # ✅ Normalize: force async driver if using Postgres and URL lacks +asyncpg
+    if url and url.startswith("postgresql://"):
+        # Example: "postgresql://..."  ->  "postgresql+asyncpg://..."
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
 resolved_database_url: str | None
 if _settings.database_url:
     resolved_database_url = _settings.database_url
@@ -22,17 +40,91 @@ elif _settings.use_sqlite_dev:
 else:
     resolved_database_url = None
 
-# ✅ Normalize: force async driver if using Postgres and URL lacks +asyncpg
-if resolved_database_url and resolved_database_url.startswith("postgresql://"):
-    # Example: "postgresql://..."  ->  "postgresql+asyncpg://..."
-    resolved_database_url = resolved_database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+resolved_database_url = _normalize_url(resolved_database_url)
+resolved_replica_url = _normalize_url(_settings.database_replica_url) if resolved_database_url else None
 
 # Optional: If using public network, you can add sslmode=require here:
 # if resolved_database_url and "proxy.rlwy.net" in resolved_database_url and "sslmode=" not in resolved_database_url:
 #     resolved_database_url += ("&" if "?" in resolved_database_url else "?") + "sslmode=require"
 
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait to get a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquires = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def connect(self):  # type: ignore[override]
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.acquires += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def _install_idle_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Ping a connection on checkout only if it sat idle in the pool for a while.
+
+    pool_pre_ping costs a round trip on every checkout; connections that were
+    returned moments ago are almost certainly alive, so we skip those.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):  # noqa: ANN001
+        connection_record.info["gc_checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # noqa: ANN001
+        checked_in_at = connection_record.info.get("gc_checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as ping_exc:
+            # The pool discards this connection and retries with a fresh one.
+            logger.info("Discarding stale pooled connection: %s", ping_exc)
+            raise exc.DisconnectionError() from ping_exc
+
+
+def build_engine(url: str, settings: Settings) -> AsyncEngine:
+    kwargs: dict[str, Any] = {"echo": False}
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    if parsed.get_driver_name() == "asyncpg":
+        # asyncpg's own per-connection cache, and SQLAlchemy's prepared-statement cache on top.
+        # Set both to 0 behind pgbouncer in transaction mode.
+        kwargs["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+        parsed = parsed.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_prepared_statement_cache_size)}
+        )
+    engine = create_async_engine(parsed, **kwargs)
+    if not settings.db_pool_pre_ping and settings.db_pool_ping_idle_seconds > 0:
+        _install_idle_ping(engine, settings.db_pool_ping_idle_seconds)
+    return engine
+
+
 engine = (
-    create_async_engine(resolved_database_url, echo=False, pool_pre_ping=True)
+    build_engine(resolved_database_url, _settings)
     if (resolved_database_url and not _running_alembic)
     else None
 )
@@ -42,9 +134,97 @@ SessionLocal = (
     else None
 )
 
+# Optional read replica for read-only endpoints (see get_read_session).
+read_engine = (
+    build_engine(resolved_replica_url, _settings)
+    if (resolved_replica_url and not _running_alembic)
+    else None
+)
+ReadSessionLocal = (
+    async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+    if read_engine is not None
+    else None
+)
+_replica_down_until = 0.0
+
+
+def pool_stats(target: AsyncEngine | None = None) -> dict[str, Any]:
+    eng = target if target is not None else engine
+    if eng is None:
+        return {"configured": False}
+    pool = eng.pool
+    stats: dict[str, Any] = {"configured": True, "pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            acquires=pool.acquires,
+            timeouts=pool.timeouts,
+            avg_wait_ms=(pool.total_wait_seconds / pool.acquires * 1000) if pool.acquires else 0.0,
+            max_wait_ms=pool.max_wait_seconds * 1000,
+        )
+    return stats
+
+
+def dialect_insert(session: AsyncSession, table: Any):  # noqa: ANN201
+    """INSERT for the session's dialect, so callers can use on_conflict_do_update/do_nothing."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     if SessionLocal is None:
         raise RuntimeError("Database not configured. Set DATABASE_URL or USE_SQLITE_DEV=true.")
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_session(
+    primary: AsyncSession = Depends(get_db_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints: the replica when configured and reachable,
+    otherwise the primary. Reads may lag the primary by the replication delay.
+
+    The primary session is opened lazily, so it costs nothing when unused.
+    """
+    global _replica_down_until
+    if ReadSessionLocal is None or time.monotonic() < _replica_down_until:
+        yield primary
+        return
+
+    replica = ReadSessionLocal()
+    try:
+        await replica.connection()
+    except (OSError, exc.DBAPIError, exc.TimeoutError) as replica_exc:
+        await replica.close()
+        # Don't pay the connect timeout on every request while the replica is down.
+        _replica_down_until = time.monotonic() + _settings.database_replica_retry_seconds
+        logger.warning("Read replica unavailable, falling back to primary: %s", replica_exc)
+        yield primary
+        return
+    try:
+        yield replica
+    finally:
+        await replica.close()
+
+
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Session factory for read-only work that outlives the request's dependencies.
+
+    FastAPI closes yield-dependencies before a StreamingResponse body is sent,
+    so streaming endpoints open their own session from this factory inside the
+    body generator. Prefers the replica, like get_read_session.
+    """
+    if ReadSessionLocal is not None and time.monotonic() >= _replica_down_until:
+        return ReadSessionLocal
+    if SessionLocal is None:
+        raise RuntimeError("Database not configured. Set DATABASE_URL or USE_SQLITE_DEV=true.")
+    return SessionLocal
@@ -0,0 +1,200 @@
+"""
+Automatic driver dispatch for a day's scheduled collections.
+
+Each collection's zone is the Eircode routing key of its pickup address,
+falling back to its return point's. A driver's zone is a label from the
+driver app ("Dublin 2-4", "South County") covering one or more routing keys
+(eircode.zone_routing_keys). Collections are handed out per zone, largest
+bag_count first, each to the in-zone driver with the most spare capacity (a
+heap per routing key), then to drivers with no recognised zone. Capacity is
+bags per day by vehicle type, less what the driver already carries that day.
+Planning is O(n log d) and pure, so a dry run costs the reads only.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.eircode import routing_key, zone_routing_keys
+from ..models import Collection, Driver, ReturnPoint
+
+# Bags a driver can take in a day, by Driver.vehicle_type.
+VEHICLE_CAPACITY_BAGS = {"bike": 30, "car": 80, "van": 200}
+DEFAULT_CAPACITY_BAGS = 80
+ANY_ZONE = None  # drivers without a recognised zone pick up overflow from every zone
+
+NO_ZONE = "No zone for pickup address or return point"
+NO_CAPACITY = "No driver with spare capacity in zone"
+CHANGED = "Collection changed since planning"
+
+_APPLY_CHUNK = 1000
+
+
+@dataclass
+class DispatchCollection:
+    id: int
+    zone: str | None
+    bags: int
+
+
+@dataclass
+class DispatchDriver:
+    id: int
+    zone: str | None  # label as stored on Driver.zone
+    capacity: int
+    load: int = 0
+
+    @property
+    def spare(self) -> int:
+        return self.capacity - self.load
+
+
+@dataclass
+class DispatchPlan:
+    day: date
+    assignments: dict[int, int] = field(default_factory=dict)  # collection id -> driver id
+    unassigned: dict[int, str] = field(default_factory=dict)  # collection id -> reason
+    drivers: list[DispatchDriver] = field(default_factory=list)
+    zones: dict[int, str | None] = field(default_factory=dict)  # collection id -> zone
+
+
+def vehicle_capacity(vehicle_type: str | None) -> int:
+    return VEHICLE_CAPACITY_BAGS.get((vehicle_type or "").lower(), DEFAULT_CAPACITY_BAGS)
+
+
+def plan_assignments(
+    collections: list[DispatchCollection], drivers: list[DispatchDriver]
+) -> tuple[dict[int, int], dict[int, str]]:
+    """
+    Greedy first-fit-decreasing assignment; mutates each driver's `load`.
+
+    Returns ({collection id: driver id}, {collection id: reason}).
+    """
+    heaps: dict[str | None, list[tuple[int, int, DispatchDriver]]] = {}
+    for d in drivers:
+        # (-spare, id) pops the emptiest driver first, ties broken by id for stable plans.
+        for key in zone_routing_keys(d.zone) or (ANY_ZONE,):
+            heaps.setdefault(key, []).append((-d.spare, d.id, d))
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    assignments: dict[int, int] = {}
+    unassigned: dict[int, str] = {}
+    for c in sorted(collections, key=lambda c: (-c.bags, c.id)):
+        if c.zone is None and not heaps.get(ANY_ZONE):
+            unassigned[c.id] = NO_ZONE
+            continue
+        for zone in (c.zone, ANY_ZONE) if c.zone is not None else (ANY_ZONE,):
+            heap = heaps.get(zone)
+            # A driver covering several keys sits in several heaps; loads taken through another
+            # heap leave stale (too roomy) entries, so refresh the top until it is current.
+            while heap and -heap[0][0] != heap[0][2].spare:
+                driver = heap[0][2]
+                heapq.heapreplace(heap, (-driver.spare, driver.id, driver))
+            # The top of the heap has the most room; if it can't fit c, nobody in the zone can.
+            if heap and -heap[0][0] >= c.bags:
+                _, _, driver = heapq.heappop(heap)
+                driver.load += c.bags
+                heapq.heappush(heap, (-driver.spare, driver.id, driver))
+                assignments[c.id] = driver.id
+                break
+        else:
+            unassigned[c.id] = NO_CAPACITY
+    return assignments, unassigned
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+async def plan_dispatch(session: AsyncSession, day: date) -> DispatchPlan:
+    """Plan assignments for every unassigned, scheduled, live collection on `day`."""
+    start, end = _day_bounds(day)
+    rows = (
+        await session.execute(
+            select(Collection.id, Collection.bag_count, Collection.pickup_address, ReturnPoint.eircode)
+            .outerjoin(ReturnPoint, ReturnPoint.id == Collection.return_point_id)
+            .where(
+                Collection.is_archived == False,  # noqa: E712
+                Collection.status == "scheduled",
+                Collection.driver_id.is_(None),
+                Collection.scheduled_at >= start,
+                Collection.scheduled_at < end,
+            )
+        )
+    ).all()
+    collections = [
+        DispatchCollection(id=r.id, zone=routing_key(r.pickup_address) or routing_key(r.eircode), bags=r.bag_count or 1)
+        for r in rows
+    ]
+
+    loads = dict(
+        (
+            await session.execute(
+                select(Collection.driver_id, func.sum(Collection.bag_count))
+                .where(
+                    Collection.is_archived == False,  # noqa: E712
+                    Collection.driver_id.is_not(None),
+                    Collection.status.in_(("assigned", "collected")),
+                    Collection.scheduled_at >= start,
+                    Collection.scheduled_at < end,
+                )
+                .group_by(Collection.driver_id)
+            )
+        ).all()
+    )
+    drivers = [
+        DispatchDriver(
+            id=d.id,
+            zone=(d.zone or "").strip() or ANY_ZONE,
+            capacity=vehicle_capacity(d.vehicle_type),
+            load=int(loads.get(d.id) or 0),
+        )
+        for d in (
+            await session.execute(select(Driver.id, Driver.zone, Driver.vehicle_type).where(Driver.is_available == True))  # noqa: E712
+        ).all()
+    ]
+
+    assignments, unassigned = plan_assignments(collections, drivers)
+    return DispatchPlan(
+        day=day,
+        assignments=assignments,
+        unassigned=unassigned,
+        drivers=drivers,
+        zones={c.id: c.zone for c in collections},
+    )
+
+
+async def apply_dispatch(session: AsyncSession, plan: DispatchPlan) -> set[int]:
+    """
+    Write the plan's assignments and the scheduled -> assigned moves.
+
+    Rows are only touched if they are still scheduled and unassigned; any that
+    changed since planning move to plan.unassigned. Returns the applied ids.
+    """
+    items = list(plan.assignments.items())
+    applied: set[int] = set()
+    for i in range(0, len(items), _APPLY_CHUNK):
+        chunk = dict(items[i:i + _APPLY_CHUNK])
+        stmt = (
+            update(Collection)
+            .where(Collection.id.in_(list(chunk)), Collection.status == "scheduled", Collection.driver_id.is_(None))
+            .values(
+                driver_id=case(chunk, value=Collection.id),
+                status="assigned",
+                version=Collection.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(Collection.id)
+            .execution_options(synchronize_session=False)
+        )
+        applied.update((await session.scalars(stmt)).all())
+    await session.commit()
+    for col_id in [c for c in plan.assignments if c not in applied]:
+        del plan.assignments[col_id]
+        plan.unassigned[col_id] = CHANGED
+    return applied
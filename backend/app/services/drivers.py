@@ -1,7 +1,6 @@
-from pathlib import Path
 from typing import List
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 CHARITY_NAMES: dict[str, str] = {
     "friends_of_earth": "Friends of the Earth Ireland",
@@ -13,13 +12,14 @@ CHARITY_NAMES: dict[str, str] = {
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.events import publish_event
+from ..core.principal_cache import invalidate_principal
 from ..models.user import User
 from ..models.driver import Driver
 from ..models.collection import Collection
-from ..models import WalletTransaction
-from ..core.security import get_password_hash
+from ..core.password_hasher import hash_password
+from .collections import conflict_for, credit_note, transition
 from .driver_payouts import create_earning
-from .wallet import credit_wallet_for_collection, get_balance
+from .wallet import add_transaction, credit_wallet_for_collection, get_balance
 
 
 async def create_driver(
@@ -43,7 +43,7 @@ async def create_driver(
     user = User(
         email=email,
         full_name=full_name,
-        password_hash=get_password_hash(password),
+        password_hash=await hash_password(password),
         is_driver=True,
     )
     session.add(user)
@@ -58,6 +58,7 @@ async def create_driver(
     )
     session.add(driver)
     await session.commit()
+    invalidate_principal(user.id)
     await session.refresh(driver)
     return driver
 
@@ -79,36 +80,67 @@ async def get_driver_collections(
     return list(rows)
 
 
-async def mark_collected(
-    session: AsyncSession,
-    collection_id: int,
-    driver_user_id: int,
+async def _diagnose(
+    session: AsyncSession, collection_id: int, driver_user_id: int, required: str, expected_version: int | None, action: str
 ) -> tuple[Collection | None, str | None]:
+    """Why a driver transition matched no row; raises TransitionConflict for state / version changes."""
     driver = await get_driver_by_user_id(session, driver_user_id)
     if driver is None:
         return None, "Driver profile not found"
-
-    col = (await session.execute(
-        select(Collection).where(Collection.id == collection_id).limit(1)
-    )).scalars().first()
-    if col is None:
+    row = (
+        await session.execute(
+            select(Collection.status, Collection.version, Collection.driver_id).where(Collection.id == collection_id)
+        )
+    ).first()
+    if row is None:
         return None, None
+    if row.driver_id != driver.id:
+        return None, "Collection not assigned to you"
+    raise conflict_for(row, [required], expected_version, f"Cannot mark as {action}: current status is '{row.status}'")
 
-    if col.driver_id != driver.id:
-        return col, "Collection not assigned to you"
 
-    if col.status != "assigned":
-        return col, f"Cannot mark as collected: current status is '{col.status}'"
+def _own_driver_id(driver_user_id: int):
+    return select(Driver.id).where(Driver.user_id == driver_user_id).scalar_subquery()
 
-    col.status = "collected"
-    await create_earning(session, driver.id, col.id, col.bag_count or 1)
+
+async def mark_collected(
+    session: AsyncSession,
+    collection_id: int,
+    driver_user_id: int,
+    expected_version: int | None = None,
+) -> tuple[Collection | None, str | None]:
+    """
+    assigned -> collected for the calling driver's collection, as one
+    conditional UPDATE ... RETURNING, plus the driver's earning row.
+    Returns (None, None) if not found, (None, error) if it isn't theirs;
+    raises TransitionConflict if it is no longer `assigned`.
+    """
+    col = await transition(
+        session,
+        collection_id,
+        ["assigned"],
+        {"status": "collected"},
+        Collection.driver_id == _own_driver_id(driver_user_id),
+        expected_version=expected_version,
+    )
+    if col is None:
+        return await _diagnose(session, collection_id, driver_user_id, "assigned", expected_version, "collected")
+
+    await create_earning(session, col.driver_id, col.id, col.bag_count or 1)
     await session.commit()
-    await session.refresh(col)
     # Publish event for email notification
-    user = (await session.execute(select(User).where(User.id == col.user_id).limit(1))).scalars().first()
+    users = {
+        u.id: u
+        for u in (
+            await session.execute(
+                select(User.id, User.email, User.full_name).where(User.id.in_([col.user_id, driver_user_id]))
+            )
+        ).all()
+    }
+    user = users.get(col.user_id)
     if user:
-        driver_user = (await session.execute(select(User).where(User.id == driver.user_id).limit(1))).scalars().first()
-        driver_name = driver_user.full_name if driver_user and driver_user.full_name else f"Driver #{driver.id}"
+        driver_user = users.get(driver_user_id)
+        driver_name = driver_user.full_name if driver_user and driver_user.full_name else f"Driver #{col.driver_id}"
         await publish_event("collection.collected", {
             "email": user.email,
             "collection_id": col.id,
@@ -123,77 +155,48 @@ async def mark_completed(
     driver_user_id: int,
     proof_url: str | None = None,
     voucher_amount_cents: int | None = None,
+    expected_version: int | None = None,
 ) -> tuple[Collection | None, str | None]:
-    driver = await get_driver_by_user_id(session, driver_user_id)
-    if driver is None:
-        return None, "Driver profile not found"
-
-    col = (await session.execute(
-        select(Collection).where(Collection.id == collection_id).limit(1)
-    )).scalars().first()
-    if col is None:
-        return None, None
-
-    if col.driver_id != driver.id:
-        return col, "Collection not assigned to you"
-
-    if col.status != "collected":
-        return col, f"Cannot mark as completed: current status is '{col.status}'"
-
+    """
+    collected -> completed for the calling driver's collection, as one
+    conditional UPDATE ... RETURNING, then the wallet credit or donation.
+    Same return / conflict contract as mark_collected.
+    """
     amt = int(voucher_amount_cents or 0)
     if amt <= 0 or amt > 50_000:
-        return col, "Voucher amount must be > 0 and <= 50000 cents"
+        return None, "Voucher amount must be > 0 and <= 50000 cents"
 
-    col.status = "completed"
+    values = {"status": "completed", "voucher_amount_cents": amt}
     if proof_url:
-        col.proof_url = proof_url
-    col.voucher_amount_cents = amt
+        values["proof_url"] = proof_url
+    col = await transition(
+        session,
+        collection_id,
+        ["collected"],
+        values,
+        Collection.driver_id == _own_driver_id(driver_user_id),
+        expected_version=expected_version,
+    )
+    if col is None:
+        return await _diagnose(session, collection_id, driver_user_id, "collected", expected_version, "completed")
 
     is_donation = col.voucher_preference == "donate"
 
-    # Idempotency: check if credit or donation already exists for this collection
-    existing_credit = await session.scalar(
-        select(func.count())
-        .select_from(WalletTransaction)
-        .where(
-            WalletTransaction.user_id == col.user_id,
-            WalletTransaction.kind.in_(["collection_credit", "donation"]),
-            WalletTransaction.note.like(f"%collection #{col.id}%"),
+    # Idempotent per (collection_id, kind): a repeat completion inserts nothing.
+    if is_donation:
+        charity_name = CHARITY_NAMES.get(col.charity_id or "", col.charity_id or "a charity")
+        donation_note = f"Donated to {charity_name} — collection #{col.id} (€{amt / 100:.2f})"
+        await add_transaction(session, col.user_id, "donation", amt, note=donation_note, collection_id=col.id)
+    else:
+        await credit_wallet_for_collection(
+            session,
+            col.user_id,
+            col.id,
+            amt,
+            note=credit_note(col.id, amt, col.driver_id, proof_url),
         )
-    )
-    if int(existing_credit or 0) == 0 and amt > 0:
-        if is_donation:
-            charity_name = CHARITY_NAMES.get(col.charity_id or "", col.charity_id or "a charity")
-            donation_note = f"Donated to {charity_name} — collection #{col.id} (€{amt / 100:.2f})"
-            txn = WalletTransaction(
-                user_id=col.user_id,
-                kind="donation",
-                amount_cents=amt,
-                note=donation_note,
-            )
-            session.add(txn)
-        else:
-            proof_ref = "-"
-            if proof_url:
-                proof_ref = Path(proof_url).name or "-"
-                if len(proof_ref) > 64:
-                    proof_ref = proof_ref[:61] + "..."
-            note = (
-                f"Credit for collection #{col.id} "
-                f"(voucher €{amt / 100:.2f}) "
-                f"driver_id={col.driver_id or '-'} "
-                f"proof={proof_ref}"
-            )
-            await credit_wallet_for_collection(
-                session,
-                col.user_id,
-                col.id,
-                amt,
-                note=note,
-            )
 
     await session.commit()
-    await session.refresh(col)
     # Publish event for email notification
     user = (await session.execute(select(User).where(User.id == col.user_id).limit(1))).scalars().first()
     if user:
@@ -203,7 +206,7 @@ async def mark_completed(
             "proof_url": col.proof_url or "",
             "voucher_amount_eur": (col.voucher_amount_cents or 0) / 100,
         })
-        if amt > 0 and not is_donation:
+        if not is_donation:
             balance_cents, _ = await get_balance(session, col.user_id)
             await publish_event("wallet.credit.created", {
                 "email": user.email,
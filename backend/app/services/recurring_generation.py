@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Collection, CollectionSlot
 from ..models.user import User
+from .capacity import add_bookings, window_for
 
 
 def _get_occurrence_dates(
@@ -68,10 +69,13 @@ async def generate_collections(
 ) -> dict:
     """
     Generate collection rows from active recurring slots for the next weeks_ahead weeks.
+    Generated pickups are counted in the capacity calendar in the same
+    transaction; a recurring pickup is never refused for a full window.
     Returns {"generated": count_created, "skipped": count_already_existed}.
     """
     generated = 0
     skipped = 0
+    booked_windows = []
 
     slots = (
         await session.execute(
@@ -81,9 +85,10 @@ async def generate_collections(
 
     user_ids = list({slot.user_id for slot in slots})
     user_rows = (
-        await session.execute(select(User.id, User.address).where(User.id.in_(user_ids)))
+        await session.execute(select(User.id, User.address, User.lat, User.lng).where(User.id.in_(user_ids)))
     ).all()
     user_address_map = {row[0]: row[1] for row in user_rows}
+    user_point_map = {row[0]: (row[2], row[3]) for row in user_rows}
 
     for slot in slots:
         if slot.preferred_return_point_id is None:
@@ -114,6 +119,7 @@ async def generate_collections(
                 skipped += 1
                 continue
 
+            pickup_lat, pickup_lng = user_point_map.get(slot.user_id, (None, None))
             col = Collection(
                 user_id=slot.user_id,
                 return_point_id=slot.preferred_return_point_id,
@@ -122,11 +128,15 @@ async def generate_collections(
                 bag_count=1,
                 notes=None,
                 pickup_address=user_address_map.get(slot.user_id),
+                pickup_lat=pickup_lat,
+                pickup_lng=pickup_lng,
                 collection_slot_id=slot.id,
                 driver_id=None,
             )
             session.add(col)
+            booked_windows.append(window_for(col.pickup_address, scheduled_at))
             generated += 1
 
+    await add_bookings(session, booked_windows)
     await session.commit()
     return {"generated": generated, "skipped": skipped}
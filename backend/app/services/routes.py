@@ -0,0 +1,192 @@
+"""
+Daily route planning for a driver's manifest.
+
+A route visits every open pickup for the day and ends at the drop-off
+return point (the one most of the day's collections name). Stops are
+ordered by nearest neighbour, built backwards from the drop-off, then
+improved with 2-opt; the drop-off stays fixed as the last stop.
+
+Planned routes are cached per (driver, day) together with a signature of
+the manifest (ids, status, address, coordinates, return point, updated_at), so any
+assignment or status change elsewhere simply produces a cache miss.
+"""
+
+from collections import Counter, OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..core.gazetteer import geocode
+from ..core.geo import LatLng, haversine_km
+from ..models import Collection, ReturnPoint
+
+OPEN_STATUSES = ("scheduled", "assigned", "collected")
+_MAX_2OPT_PASSES = 50
+
+
+def order_stops(points: list[LatLng], end: LatLng | None = None) -> list[int]:
+    """
+    Visiting order (indices into `points`) for a path that finishes at `end`.
+
+    With no `end`, both ends of the path are free.
+    """
+    n = len(points)
+    if n <= 1:
+        return list(range(n))
+    nodes = points + ([end] if end is not None else [])
+    dist = [[haversine_km(a, b) for b in nodes] for a in nodes]
+
+    # Nearest neighbour outward from the drop-off (or stop 0), then reversed.
+    current = n if end is not None else 0
+    unvisited = set(range(n)) - {current}
+    path = [] if end is not None else [0]
+    while unvisited:
+        current = min(unvisited, key=lambda j: (dist[current][j], j))
+        unvisited.remove(current)
+        path.append(current)
+    path.reverse()
+    seq = path + ([n] if end is not None else [])
+
+    # 2-opt: reverse seq[i..k] when that shortens the path. The drop-off (if any) never moves.
+    last = n - 1  # highest index that may be part of a reversal
+    for _ in range(_MAX_2OPT_PASSES):
+        improved = False
+        for i in range(0, last):
+            for k in range(i + 1, last + 1):
+                before = dist[seq[i - 1]][seq[i]] if i > 0 else 0.0
+                after = dist[seq[i - 1]][seq[k]] if i > 0 else 0.0
+                if k + 1 < len(seq):
+                    before += dist[seq[k]][seq[k + 1]]
+                    after += dist[seq[i]][seq[k + 1]]
+                if after < before - 1e-9:
+                    seq[i:k + 1] = reversed(seq[i:k + 1])
+                    improved = True
+        if not improved:
+            break
+    return [i for i in seq if i < n]
+
+
+def path_length_km(points: list[LatLng]) -> float:
+    return sum(haversine_km(a, b) for a, b in zip(points, points[1:]))
+
+
+def locate(row) -> LatLng | None:  # noqa: ANN001
+    """Stored pickup coordinates, else whatever the gazetteer makes of the address."""
+    if row.pickup_lat is not None and row.pickup_lng is not None:
+        return row.pickup_lat, row.pickup_lng
+    return geocode(row.pickup_address)
+
+
+class RouteCache:
+    """LRU of planned routes keyed by (driver_id, day), valid while the manifest signature matches."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, date], tuple[tuple, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[int, date], signature: tuple) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != signature:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple[int, date], signature: tuple, route: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (signature, route)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+route_cache = RouteCache(max_entries=get_settings().route_cache_max_entries)
+
+
+async def plan_driver_route(session: AsyncSession, driver_id: int, day: date) -> dict[str, Any]:
+    """
+    Ordered stops for a driver's open collections on `day`, ending at the drop-off.
+
+    Stops whose address can't be located keep their scheduled order and go
+    just before the drop-off, flagged `located: False`.
+    """
+    start = datetime.combine(day, time.min)
+    rows = (
+        await session.execute(
+            select(
+                Collection.id,
+                Collection.scheduled_at,
+                Collection.status,
+                Collection.pickup_address,
+                Collection.pickup_lat,
+                Collection.pickup_lng,
+                Collection.return_point_id,
+                Collection.updated_at,
+            )
+            .where(
+                Collection.driver_id == driver_id,
+                Collection.is_archived == False,  # noqa: E712
+                Collection.status.in_(OPEN_STATUSES),
+                Collection.scheduled_at >= start,
+                Collection.scheduled_at < start + timedelta(days=1),
+            )
+            .order_by(Collection.scheduled_at, Collection.id)
+        )
+    ).all()
+    signature = tuple(tuple(r) for r in rows)
+    cached = route_cache.get((driver_id, day), signature)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    drop_off = None
+    if rows:
+        rp_id = Counter(r.return_point_id for r in rows).most_common(1)[0][0]
+        drop_off = (
+            await session.execute(
+                select(ReturnPoint.id, ReturnPoint.name, ReturnPoint.lat, ReturnPoint.lng).where(ReturnPoint.id == rp_id)
+            )
+        ).first()
+    end = (drop_off.lat, drop_off.lng) if drop_off is not None else None
+
+    located = [(r, locate(r)) for r in rows]
+    placed = [(r, p) for r, p in located if p is not None]
+    order = order_stops([p for _, p in placed], end)
+    sequence = [placed[i] for i in order] + [(r, None) for r, p in located if p is None]
+
+    route = {
+        "driverId": driver_id,
+        "date": day,
+        "stops": [
+            {
+                "sequence": n + 1,
+                "collectionId": r.id,
+                "scheduledAt": r.scheduled_at,
+                "status": r.status,
+                "pickupAddress": r.pickup_address,
+                "lat": p[0] if p else None,
+                "lng": p[1] if p else None,
+                "located": p is not None,
+            }
+            for n, (r, p) in enumerate(sequence)
+        ],
+        "dropOff": (
+            {"returnPointId": drop_off.id, "name": drop_off.name, "lat": drop_off.lat, "lng": drop_off.lng}
+            if drop_off is not None
+            else None
+        ),
+        "distanceKm": round(path_length_km([p for _, p in sequence if p] + ([end] if end else [])), 3),
+    }
+    route_cache.put((driver_id, day), signature, route)
+    return {**route, "cached": False}
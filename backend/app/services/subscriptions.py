@@ -18,19 +18,28 @@ async def get_me(session: AsyncSession, user_id: int) -> Subscription | None:
     return (await session.execute(stmt)).scalars().first()
 
 
-async def is_subscription_active(session: AsyncSession, user_id: int) -> bool:
-    sub = await get_me(session, user_id)
+def active_until(sub: Subscription | None) -> date | None:
+    """Last day the subscription grants access, or None if it grants none."""
     if sub is None:
-        return False
+        return None
 
     if sub.status not in {"active", "canceled"}:
-        return False
+        return None
 
     # Grandfather clause for existing rows created before period tracking existed.
     if sub.current_period_end is None:
-        return True
+        return date.max
+
+    return sub.current_period_end
+
 
-    return sub.current_period_end >= date.today()
+async def get_active_until(session: AsyncSession, user_id: int) -> date | None:
+    return active_until(await get_me(session, user_id))
+
+
+async def is_subscription_active(session: AsyncSession, user_id: int) -> bool:
+    until = await get_active_until(session, user_id)
+    return until is not None and until >= date.today()
 
 
 async def activate(session: AsyncSession, user_id: int) -> Subscription:
@@ -52,6 +61,8 @@ async def activate(session: AsyncSession, user_id: int) -> Subscription:
 
 
 async def cancel(session: AsyncSession, user_id: int) -> Subscription:
+    # A canceled subscription still grants access until current_period_end, so
+    # active_until() doesn't change and issued sub_active_until claims stay right.
     sub = await get_me(session, user_id)
     if sub is None:
         sub = Subscription(user_id=user_id, status="inactive")
@@ -0,0 +1,139 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..core.principal_cache import invalidate_principal
+from ..core.security import build_token_claims, create_access_token
+from ..models.refresh_token import RefreshToken
+from ..models.user import User
+from .subscriptions import get_active_until
+
+
+def _hash_refresh_token(raw: str) -> str:
+    # Refresh tokens are 256-bit random values, so a fast digest is enough (no bcrypt).
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def issue_access_token(session: AsyncSession, user: User) -> str:
+    """Sign an access token carrying the user's role and subscription claims."""
+    sub_until = None
+    if not (user.is_admin or user.is_driver):
+        sub_until = await get_active_until(session, user.id)
+    claims = build_token_claims(
+        is_admin=user.is_admin,
+        is_driver=user.is_driver,
+        token_version=user.token_version,
+        subscription_active_until=sub_until,
+    )
+    return create_access_token(subject=user.id, claims=claims)
+
+
+def _new_refresh_token(user_id: int, family_id: str | None = None) -> tuple[str, RefreshToken]:
+    settings = get_settings()
+    raw = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(raw),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    )
+    return raw, row
+
+
+async def issue_token_pair(session: AsyncSession, user: User) -> tuple[str, str]:
+    """Start a new refresh-token family for a fresh login. Commits."""
+    raw, row = _new_refresh_token(user.id)
+    session.add(row)
+    access = await issue_access_token(session, user)
+    await session.commit()
+    return access, raw
+
+
+async def rotate_refresh_token(session: AsyncSession, raw: str) -> tuple[str, str]:
+    """
+    Exchange a refresh token for a new access/refresh pair.
+
+    The presented token is revoked and replaced in the same family. Presenting
+    an already-rotated token means it leaked, so the whole family is revoked.
+    Raises ValueError if the token is unknown, revoked or expired.
+    """
+    now = datetime.utcnow()
+    row = (
+        await session.execute(
+            select(RefreshToken, User)
+            .join(User, User.id == RefreshToken.user_id)
+            .where(RefreshToken.token_hash == _hash_refresh_token(raw))
+            .limit(1)
+        )
+    ).first()
+    if row is None:
+        raise ValueError("Invalid refresh token")
+    current, user = row
+
+    if current.revoked_at is not None:
+        await _revoke_family(session, current.family_id, now)
+        raise ValueError("Refresh token has been revoked")
+    if current.expires_at <= now:
+        raise ValueError("Refresh token expired")
+
+    new_raw, new_row = _new_refresh_token(user.id, current.family_id)
+    session.add(new_row)
+    await session.flush()
+
+    # Conditional update so two concurrent refreshes of the same token cannot both win.
+    result = await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == current.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, replaced_by_id=new_row.id)
+    )
+    if result.rowcount != 1:
+        await session.rollback()
+        raise ValueError("Refresh token has been revoked")
+
+    access = await issue_access_token(session, user)
+    await session.commit()
+    return access, new_raw
+
+
+async def revoke_refresh_token(session: AsyncSession, raw: str) -> bool:
+    """Log out one session. Returns False if the token was unknown or already revoked."""
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == _hash_refresh_token(raw),
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
+    await session.commit()
+    return bool(result.rowcount)
+
+
+async def _revoke_family(session: AsyncSession, family_id: str, now: datetime) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    await session.commit()
+
+
+async def revoke_tokens(session: AsyncSession, user_id: int) -> bool:
+    """Invalidate every access and refresh token issued to the user so far."""
+    result = await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+    )
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    await session.commit()
+    invalidate_principal(user_id)
+    return bool(result.rowcount)
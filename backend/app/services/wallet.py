@@ -1,36 +1,164 @@
 from datetime import datetime
-from typing import Tuple, List
+from typing import Iterable, Tuple, List
 
-from sqlalchemy import select, func, desc
+from sqlalchemy import Row, and_, case, delete, select, func, desc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import WalletTransaction
+from ..models import Collection, WalletBalance, WalletTransaction
+from .db import dialect_insert
+
+# Ledger kinds recorded for history but excluded from the spendable balance.
+NON_BALANCE_KINDS = ("donation",)
+_REBUILD_CHUNK = 500
+_INSERT_CHUNK = 1000
+
+
+def _balance_delta(kind: str, amount_cents: int) -> int:
+    return 0 if kind in NON_BALANCE_KINDS else int(amount_cents)
 
 
 async def get_balance(session: AsyncSession, user_id: int) -> Tuple[int, datetime]:
-    sum_stmt = select(func.coalesce(func.sum(WalletTransaction.amount_cents), 0)).where(
-        WalletTransaction.user_id == user_id,
-        WalletTransaction.kind != "donation",
+    row = (
+        await session.execute(
+            select(WalletBalance.balance_cents, WalletBalance.last_updated).where(WalletBalance.user_id == user_id)
+        )
+    ).first()
+    if row is None:
+        return 0, datetime.fromtimestamp(0)
+    return int(row.balance_cents), (row.last_updated or datetime.fromtimestamp(0))
+
+
+async def add_transaction(
+    session: AsyncSession,
+    user_id: int,
+    kind: str,
+    amount_cents: int,
+    note: str | None = None,
+    collection_id: int | None = None,
+) -> WalletTransaction | None:
+    """
+    Append a ledger row and fold it into wallet_balances in the same transaction.
+
+    Does not commit; the caller's commit covers both writes. Rows tied to a
+    collection are idempotent per (collection_id, kind): a repeat insert hits
+    the unique index, ON CONFLICT DO NOTHING skips it, and None is returned
+    with the balance untouched. The balance row is updated with a single
+    atomic upsert, so concurrent credits for the same user can't lose an update.
+    """
+    txns = await add_transactions(
+        session,
+        [
+            {
+                "user_id": user_id,
+                "kind": kind,
+                "amount_cents": int(amount_cents),
+                "note": note,
+                "collection_id": collection_id,
+            }
+        ],
     )
-    balance_cents = await session.scalar(sum_stmt)
-    ts_stmt = (
-        select(WalletTransaction.ts)
-        .where(WalletTransaction.user_id == user_id)
-        .order_by(desc(WalletTransaction.ts))
-        .limit(1)
+    return txns[0] if txns else None
+
+
+async def add_transactions(session: AsyncSession, rows: list[dict]) -> List[WalletTransaction]:
+    """
+    Batch form of add_transaction: one multi-row INSERT per chunk, then one
+    upsert covering every affected balance.
+
+    Each row has user_id, kind, amount_cents and optional note/collection_id.
+    Returns the rows actually inserted; duplicates per (collection_id, kind)
+    are skipped the same way as in add_transaction. Does not commit.
+    """
+    inserted: List[WalletTransaction] = []
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        chunk = [{"note": None, "collection_id": None, **r} for r in rows[start:start + _INSERT_CHUNK]]
+        stmt = dialect_insert(session, WalletTransaction).values(chunk)
+        if any(r["collection_id"] is not None for r in chunk):
+            stmt = stmt.on_conflict_do_nothing(index_elements=["collection_id", "kind"])
+        inserted.extend((await session.scalars(stmt.returning(WalletTransaction))).all())
+    if not inserted:
+        return inserted
+
+    totals: dict[int, list] = {}
+    for txn in inserted:
+        delta, count, latest = totals.get(txn.user_id, (0, 0, txn.ts))
+        totals[txn.user_id] = [delta + _balance_delta(txn.kind, txn.amount_cents), count + 1, max(latest, txn.ts)]
+    stmt = dialect_insert(session, WalletBalance).values(
+        [
+            {"user_id": user_id, "balance_cents": delta, "last_updated": latest, "version": count}
+            for user_id, (delta, count, latest) in totals.items()
+        ]
+    )
+    current = WalletBalance.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[current.user_id],
+        set_={
+            "balance_cents": current.balance_cents + stmt.excluded.balance_cents,
+            "last_updated": case(
+                (current.last_updated.is_(None) | (stmt.excluded.last_updated > current.last_updated),
+                 stmt.excluded.last_updated),
+                else_=current.last_updated,
+            ),
+            "version": current.version + stmt.excluded.version,
+        },
+    )
+    await session.execute(stmt)
+    return inserted
+
+
+async def get_balances(session: AsyncSession, user_ids: Iterable[int]) -> dict[int, int]:
+    """balance_cents for each user id that has a wallet_balances row."""
+    rows = await session.execute(
+        select(WalletBalance.user_id, WalletBalance.balance_cents).where(WalletBalance.user_id.in_(list(user_ids)))
     )
-    last_updated = await session.scalar(ts_stmt)
-    return int(balance_cents or 0), (last_updated or datetime.fromtimestamp(0))
+    return {user_id: int(balance) for user_id, balance in rows}
+
+
+async def count_history(session: AsyncSession, user_id: int) -> int:
+    """Ledger row count for a user, read from wallet_balances.version instead of COUNT(*)."""
+    version = await session.scalar(select(WalletBalance.version).where(WalletBalance.user_id == user_id))
+    return int(version or 0)
 
 
 async def get_history(
-    session: AsyncSession, user_id: int, page: int, page_size: int
-) -> Tuple[List[WalletTransaction], int]:
-    base = select(WalletTransaction).where(WalletTransaction.user_id == user_id)
-    total = await session.scalar(select(func.count()).select_from(base.subquery()))
-    rows_stmt = base.order_by(desc(WalletTransaction.ts)).offset((page - 1) * page_size).limit(page_size)
-    rows = (await session.execute(rows_stmt)).scalars().all()
-    return rows, int(total or 0)
+    session: AsyncSession,
+    user_id: int,
+    page: int,
+    page_size: int,
+    after: Tuple[datetime, int] | None = None,
+) -> Tuple[List[Row], int, Tuple[datetime, int] | None]:
+    """
+    Newest-first page of a user's ledger, ordered by (ts, id).
+
+    Each row is (WalletTransaction, collection_status, proof_url); the
+    collection columns come from a left join on collection_id and are None
+    for entries not tied to one of the user's collections.
+
+    With `after` (the (ts, id) of the last row already seen) this is a keyset
+    page and `page` is ignored; otherwise it falls back to OFFSET paging.
+    Returns (rows, total, next_key); next_key is None on the last page.
+    """
+    stmt = (
+        select(WalletTransaction, Collection.status, Collection.proof_url)
+        .outerjoin(
+            Collection,
+            and_(Collection.id == WalletTransaction.collection_id, Collection.user_id == WalletTransaction.user_id),
+        )
+        .where(WalletTransaction.user_id == user_id)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(WalletTransaction.ts, WalletTransaction.id) < tuple_(*after))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    stmt = stmt.order_by(desc(WalletTransaction.ts), desc(WalletTransaction.id)).limit(page_size + 1)
+    rows = list((await session.execute(stmt)).all())
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1][0]
+        next_key = (last.ts, last.id)
+    total = await count_history(session, user_id)
+    return rows, total, next_key
 
 
 async def credit_wallet_for_collection(
@@ -39,24 +167,98 @@ async def credit_wallet_for_collection(
     collection_id: int,
     amount_cents: int,
     note: str | None = None,
-) -> WalletTransaction:
+) -> WalletTransaction | None:
     """
-    Link a completed collection to a wallet credit.
+    Link a completed collection to a wallet credit (None if it was already credited).
 
     Intended flow (not fully implemented end-to-end yet):
     1) A Collection is marked as completed/approved.
     2) A Claim may be created and approved for that Collection (if needed).
     3) This helper is called to add a positive Transaction to the user's wallet.
     """
-    txn = WalletTransaction(
-        user_id=user_id,
-        kind="collection_credit",
-        amount_cents=int(amount_cents),
+    return await add_transaction(
+        session,
+        user_id,
+        "collection_credit",
+        amount_cents,
         note=note or f"Credit for collection #{collection_id}",
+        collection_id=collection_id,
+    )
+
+
+def _ledger_totals():  # noqa: ANN202
+    return select(
+        WalletTransaction.user_id,
+        func.coalesce(
+            func.sum(
+                case((WalletTransaction.kind.in_(NON_BALANCE_KINDS), 0), else_=WalletTransaction.amount_cents)
+            ),
+            0,
+        ).label("balance_cents"),
+        func.max(WalletTransaction.ts).label("last_updated"),
+        func.count().label("version"),
+    ).group_by(WalletTransaction.user_id)
+
+
+async def rebuild_balances(session: AsyncSession, user_ids: Iterable[int] | None = None) -> int:
+    """Recompute wallet_balances from the ledger (all users, or just user_ids). Does not commit."""
+    columns = ["user_id", "balance_cents", "last_updated", "version"]
+    if user_ids is None:
+        await session.execute(delete(WalletBalance))
+        result = await session.execute(WalletBalance.__table__.insert().from_select(columns, _ledger_totals()))
+        return int(result.rowcount or 0)
+
+    ids = list(user_ids)
+    rebuilt = 0
+    for start in range(0, len(ids), _REBUILD_CHUNK):
+        chunk = ids[start:start + _REBUILD_CHUNK]
+        await session.execute(delete(WalletBalance).where(WalletBalance.user_id.in_(chunk)))
+        result = await session.execute(
+            WalletBalance.__table__.insert().from_select(
+                columns, _ledger_totals().where(WalletTransaction.user_id.in_(chunk))
+            )
+        )
+        rebuilt += int(result.rowcount or 0)
+    return rebuilt
+
+
+async def find_balance_drift(session: AsyncSession) -> list[dict]:
+    """
+    Users whose wallet_balances row disagrees with the ledger (or is missing).
+
+    Compares balance_cents and last_updated; version is informational only.
+    """
+    ledger = _ledger_totals().subquery()
+    stmt = (
+        select(
+            ledger.c.user_id,
+            ledger.c.balance_cents.label("ledger_cents"),
+            WalletBalance.balance_cents.label("stored_cents"),
+            ledger.c.last_updated.label("ledger_last_updated"),
+            WalletBalance.last_updated.label("stored_last_updated"),
+        )
+        .select_from(ledger)
+        .outerjoin(WalletBalance, WalletBalance.user_id == ledger.c.user_id)
+        .where(
+            WalletBalance.user_id.is_(None)
+            | (WalletBalance.balance_cents != ledger.c.balance_cents)
+            | (WalletBalance.last_updated != ledger.c.last_updated)
+        )
+    )
+    drift = [dict(row._mapping) for row in (await session.execute(stmt)).all()]
+    # Balance rows whose ledger is gone entirely (e.g. deleted by hand).
+    orphans = (
+        await session.execute(
+            select(WalletBalance.user_id, WalletBalance.balance_cents).where(
+                ~WalletBalance.user_id.in_(select(WalletTransaction.user_id).distinct())
+            )
+        )
+    ).all()
+    drift.extend(
+        {"user_id": r.user_id, "ledger_cents": 0, "stored_cents": r.balance_cents,
+         "ledger_last_updated": None, "stored_last_updated": None}
+        for r in orphans
     )
-    session.add(txn)
-    await session.commit()
-    await session.refresh(txn)
-    return txn
+    return drift
 
 
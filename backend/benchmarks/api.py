@@ -0,0 +1,368 @@
+"""
+In-process API benchmark at production-like data volumes.
+
+Builds a fresh app with create_app(), points get_db_session at a dedicated
+database (the same override conftest.py uses) and drives it through
+httpx.ASGITransport, so the numbers cover routing, auth, serialisation and SQL
+without network noise. The database is filled by app.scripts.seed.generate_bulk
+with a synthetic dataset scaled by --size (number of collection rows) and
+reused on later runs unless --reseed is given.
+
+Each scenario reports p50/p95/p99 latency and throughput. Results are written
+as JSON; pass --baseline to compare p95 against a stored run and exit non-zero
+when any scenario regressed by more than --max-regression.
+
+Usage (from backend/):
+    python -m benchmarks.api --size 10k
+    python -m benchmarks.api --size 100k --output benchmarks/results/100k.json
+    python -m benchmarks.api --size 100k --baseline benchmarks/results/100k.json
+    python -m benchmarks.api --size 1M --database-url postgresql+asyncpg://u:p@localhost/gc_bench
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+from app.core.security import build_token_claims, create_access_token
+from app.models import Collection, User
+from app.scripts.seed import BulkSpec, generate_bulk
+from app.services.capacity import rebuild as rebuild_capacity
+from app.services.db import Base, get_db_session
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+PASSWORD = "bench-password"
+BOOKING_NOTE = "bench-booking"
+TRANSITION_NOTE = "bench-transition"
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+
+@dataclass
+class Dataset:
+    users: int
+    drivers: int
+    return_points: int
+
+    @classmethod
+    def for_size(cls, collections: int) -> "Dataset":
+        users = max(collections // 10, 100)
+        return cls(users=users, drivers=max(users // 100, 5), return_points=200)
+
+    # Mirrors generate_bulk's id layout on an empty database: customers, driver users, admin.
+    @property
+    def driver_user_ids(self) -> range:
+        return range(self.users + 1, self.users + self.drivers + 1)
+
+    @property
+    def admin_user_id(self) -> int:
+        return self.users + self.drivers + 1
+
+    @property
+    def booking_user_ids(self) -> range:
+        # generate_bulk gives recurring slots (which block one-off bookings) to the last fifth.
+        return range(1, self.users - self.users // 5 + 1)
+
+
+def _bulk_spec(size: int, ds: Dataset) -> BulkSpec:
+    return BulkSpec(
+        users=ds.users,
+        collections=size,
+        drivers=ds.drivers,
+        admins=1,
+        return_points=ds.return_points,
+        slot_fraction=0.2,
+        email_prefix="bench",
+        password=PASSWORD,
+        seed=size,
+    )
+
+
+async def _prepare_database(engine: AsyncEngine, SessionLocal, size: int, ds: Dataset, reseed: bool) -> None:  # noqa: ANN001
+    if reseed:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        existing = await session.scalar(select(func.count()).select_from(User))
+        if existing:
+            print(f"reusing dataset ({existing} users)", file=sys.stderr)
+        else:
+            started = time.perf_counter()
+            await generate_bulk(session, _bulk_spec(size, ds))
+            print(f"seeded {size} collections in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        # Leftovers from a previous run would trip the weekly booking limit.
+        await session.execute(delete(Collection).where(Collection.notes == BOOKING_NOTE))
+        await rebuild_capacity(session, date.today())
+        await session.commit()
+
+
+def _bearer(user_id: int, *, is_admin: bool = False, is_driver: bool = False) -> dict[str, str]:
+    claims = build_token_claims(
+        is_admin=is_admin,
+        is_driver=is_driver,
+        token_version=0,
+        subscription_active_until=date.today() + timedelta(days=30),
+    )
+    return {"Authorization": f"Bearer {create_access_token(subject=user_id, claims=claims)}"}
+
+
+Scenario = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+def _scenarios(ds: Dataset, transition_ids: list[int]) -> dict[str, tuple[Scenario, int]]:
+    """name -> (request for iteration i, expected status)."""
+    booking_users = ds.booking_user_ids
+    headers = {uid: _bearer(uid) for uid in booking_users[:1000]}
+    driver_headers = _bearer(ds.driver_user_ids[0], is_driver=True)
+    admin_headers = _bearer(ds.admin_user_id, is_admin=True)
+    monday = date.today() - timedelta(days=date.today().weekday())
+
+    def user_headers(i: int) -> dict[str, str]:
+        return headers[booking_users[i % len(headers)]]
+
+    async def login(client: AsyncClient, i: int) -> Response:
+        uid = booking_users[i % len(booking_users)]
+        return await client.post("/auth/login", json={"email": f"bench{uid}@example.com", "password": PASSWORD})
+
+    async def book(client: AsyncClient, i: int) -> Response:
+        # One booking per user per ISO week, well past any seeded collections.
+        uid = booking_users[i % len(booking_users)]
+        week = 10 + i // len(booking_users)
+        when = datetime.combine(monday + timedelta(weeks=week), datetime.min.time()).replace(hour=10)
+        return await client.post(
+            "/collections",
+            json={"scheduledAt": when.isoformat(), "returnPointId": 1, "notes": BOOKING_NOTE},
+            headers=headers.get(uid) or _bearer(uid),
+        )
+
+    async def collections_me(client: AsyncClient, i: int) -> Response:
+        return await client.get("/collections/me", headers=user_headers(i))
+
+    async def wallet_history(client: AsyncClient, i: int) -> Response:
+        return await client.get("/wallet/history", headers=user_headers(i))
+
+    async def return_points_near(client: AsyncClient, i: int) -> Response:
+        lat = 53.25 + (i % 20) * 0.01
+        return await client.get(f"/return-points?near={lat:.3f},-6.26&pageSize=20")
+
+    async def driver_transition(client: AsyncClient, i: int) -> Response:
+        cid = transition_ids[i]
+        resp = await client.patch(f"/drivers/me/collections/{cid}/mark-collected", headers=driver_headers)
+        if resp.status_code != 200:
+            return resp
+        return await client.patch(
+            f"/drivers/me/collections/{cid}/mark-completed",
+            json={"voucherAmountCents": 500},
+            headers=driver_headers,
+        )
+
+    async def admin_metrics(client: AsyncClient, i: int) -> Response:
+        return await client.get("/admin/metrics", headers=admin_headers)
+
+    return {
+        "login": (login, 200),
+        "book_collection": (book, 201),
+        "collections_me": (collections_me, 200),
+        "wallet_history": (wallet_history, 200),
+        "return_points_near": (return_points_near, 200),
+        "driver_transition": (driver_transition, 200),
+        "admin_metrics": (admin_metrics, 200),
+    }
+
+
+async def _add_transition_work(SessionLocal, ds: Dataset, n: int) -> list[int]:  # noqa: ANN001
+    """Fresh collections assigned to the benchmark driver, one per transition request."""
+    async with SessionLocal() as session:
+        rows = [
+            Collection(
+                user_id=(i % ds.users) + 1,
+                return_point_id=1,
+                scheduled_at=datetime.utcnow() + timedelta(days=1),
+                status="assigned",
+                driver_id=1,
+                notes=TRANSITION_NOTE,
+            )
+            for i in range(n)
+        ]
+        session.add_all(rows)
+        await session.commit()
+        return [c.id for c in rows]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    idx = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+    return samples[idx]
+
+
+async def _run_scenario(
+    client: AsyncClient, scenario: Scenario, expected: int, requests: int, concurrency: int, warmup: int
+) -> dict[str, Any]:
+    samples: list[float] = []
+    errors = 0
+    next_i = 0
+
+    async def worker() -> None:
+        nonlocal next_i, errors
+        while next_i < warmup + requests:
+            i = next_i
+            next_i += 1
+            started = time.perf_counter()
+            resp = await scenario(client, i)
+            elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            if resp.status_code != expected:
+                errors += 1
+            samples.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - started
+    samples.sort()
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": _percentile(samples, 50) * 1000,
+        "p95_ms": _percentile(samples, 95) * 1000,
+        "p99_ms": _percentile(samples, 99) * 1000,
+        "throughput_per_s": len(samples) / wall if wall else 0.0,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Every booking lands in one Monday 10:00 window per week; window capacity isn't what's measured here.
+    os.environ.setdefault("PICKUP_WINDOW_CAPACITY", str(10**9))
+    get_settings.cache_clear()
+    size = SIZES[args.size]
+    ds = Dataset.for_size(size)
+    url = args.database_url
+    if url is None:
+        DEFAULT_DATA_DIR.mkdir(parents=True, exist_ok=True)
+        url = f"sqlite+aiosqlite:///{DEFAULT_DATA_DIR / f'api_{args.size}.db'}"
+    engine = create_async_engine(url)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    await _prepare_database(engine, SessionLocal, size, ds, args.reseed)
+
+    from app.main import create_app
+
+    app = create_app()
+
+    async def _bench_db_session():
+        async with SessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = _bench_db_session
+
+    selected = args.scenario or None
+    needed_transitions = args.warmup + args.requests
+    transition_ids = await _add_transition_work(SessionLocal, ds, needed_transitions)
+    scenarios = _scenarios(ds, transition_ids)
+
+    results: dict[str, Any] = {}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (scenario, expected) in scenarios.items():
+            if selected and name not in selected:
+                continue
+            # bcrypt is the whole cost of login; a handful of calls is representative.
+            requests = min(args.requests, 50) if name == "login" else args.requests
+            results[name] = await _run_scenario(
+                client, scenario, expected, requests, args.concurrency, min(args.warmup, requests)
+            )
+            r = results[name]
+            print(
+                f"{name:20} {r['requests']:>6} {r['errors']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+                f"{r['p99_ms']:>9.1f} {r['throughput_per_s']:>9.0f}",
+                file=sys.stderr,
+            )
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+    return {
+        "meta": {
+            "size": args.size,
+            "collections": size,
+            "users": ds.users,
+            "drivers": ds.drivers,
+            "dialect": engine.dialect.name,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Scenarios whose p95 grew by more than max_regression (0.25 = 25%) over the baseline."""
+    regressions = []
+    print(f"\n{'scenario':20} {'base p95':>10} {'p95':>10} {'change':>8}", file=sys.stderr)
+    for name, r in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("p95_ms"):
+            continue
+        change = r["p95_ms"] / base["p95_ms"] - 1
+        flag = "  REGRESSION" if change > max_regression else ""
+        print(f"{name:20} {base['p95_ms']:>10.1f} {r['p95_ms']:>10.1f} {change:>+7.0%}{flag}", file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    if baseline.get("meta", {}).get("size") != current["meta"]["size"]:
+        print("warning: baseline was recorded at a different dataset size", file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=list(SIZES), default="10k", help="collections in the dataset")
+    parser.add_argument("--database-url", default=None, help="defaults to a SQLite file under benchmarks/.data/")
+    parser.add_argument("--reseed", action="store_true", help="drop and regenerate the dataset")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--output", type=Path, default=None, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=None, help="results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 growth vs baseline")
+    args = parser.parse_args()
+
+    # Request/email INFO logs and the slow-query warnings expected at 1M rows drown the table.
+    logging.disable(logging.INFO)
+    logging.getLogger("gc.sql").setLevel(logging.ERROR)
+
+    print(f"{'scenario':20} {'reqs':>6} {'errors':>6} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'req/s':>9}", file=sys.stderr)
+    current = asyncio.run(run(args))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    else:
+        print(json.dumps(current, indent=2))
+
+    if args.baseline:
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            print(f"p95 regressed beyond {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Dispatch engine throughput: one day's collections across a driver fleet.
+
+Times the pure planner (services.dispatch.plan_assignments) and the full
+plan_dispatch + apply_dispatch round trip against a throwaway SQLite
+database, and exits 1 if the end-to-end run exceeds --budget-ms.
+
+Usage (from backend/):
+    python -m benchmarks.dispatch --collections 10000 --drivers 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import Collection, Driver, ReturnPoint
+from app.scripts.seed import DUBLIN_ZONES
+from app.services.db import Base
+from app.services.dispatch import (
+    DispatchCollection,
+    DispatchDriver,
+    apply_dispatch,
+    plan_assignments,
+    plan_dispatch,
+    vehicle_capacity,
+)
+
+DAY = date(2026, 6, 1)
+VEHICLES = ["van", "car", "bike"]
+
+
+def _synthetic(collections: int, drivers: int, rnd: random.Random):
+    cols = [DispatchCollection(id=i, zone=rnd.choice(DUBLIN_ZONES), bags=rnd.randint(1, 5)) for i in range(collections)]
+    fleet = [
+        DispatchDriver(id=i, zone=DUBLIN_ZONES[i % len(DUBLIN_ZONES)], capacity=vehicle_capacity(rnd.choice(VEHICLES)))
+        for i in range(drivers)
+    ]
+    return cols, fleet
+
+
+def bench_planner(collections: int, drivers: int, repeats: int) -> dict[str, float]:
+    samples = []
+    assigned = 0
+    for r in range(repeats):
+        cols, fleet = _synthetic(collections, drivers, random.Random(r))
+        started = time.perf_counter()
+        assignments, _ = plan_assignments(cols, fleet)
+        samples.append(time.perf_counter() - started)
+        assigned = len(assignments)
+    return {"median_ms": statistics.median(samples) * 1000, "max_ms": max(samples) * 1000, "assigned": assigned}
+
+
+async def bench_end_to_end(collections: int, drivers: int) -> dict[str, float]:
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'dispatch.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with SessionLocal() as session:
+            await session.execute(
+                insert(ReturnPoint),
+                [{"id": 1, "external_id": "rp1", "name": "RP", "type": "rvm", "lat": 53.3, "lng": -6.2, "eircode": "D02 X285"}],
+            )
+            await session.execute(
+                insert(Driver),
+                [
+                    {"id": i + 1, "user_id": i + 1, "zone": DUBLIN_ZONES[i % len(DUBLIN_ZONES)],
+                     "vehicle_type": rnd.choice(VEHICLES)}
+                    for i in range(drivers)
+                ],
+            )
+            start = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=8)
+            await session.execute(
+                insert(Collection),
+                [
+                    {"user_id": drivers + i, "return_point_id": 1, "bag_count": rnd.randint(1, 5),
+                     "scheduled_at": start + timedelta(seconds=rnd.randrange(12 * 3600)),
+                     "pickup_address": f"{i} Load Street, Dublin {rnd.choice(DUBLIN_ZONES)[1:].lstrip('0')}"}
+                    for i in range(collections)
+                ],
+            )
+            await session.commit()
+
+        async with SessionLocal() as session:
+            started = time.perf_counter()
+            plan = await plan_dispatch(session, DAY)
+            planned = time.perf_counter() - started
+            await apply_dispatch(session, plan)
+            total = time.perf_counter() - started
+        await engine.dispose()
+    return {
+        "plan_ms": planned * 1000,
+        "plan_and_apply_ms": total * 1000,
+        "assigned": len(plan.assignments),
+        "unassigned": len(plan.unassigned),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collections", type=int, default=10_000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5, help="planner-only repetitions")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="fail if plan+apply is slower")
+    args = parser.parse_args()
+
+    planner = bench_planner(args.collections, args.drivers, args.repeats)
+    print(
+        f"planner     {args.collections} collections / {args.drivers} drivers: "
+        f"median {planner['median_ms']:.1f} ms, max {planner['max_ms']:.1f} ms, {planner['assigned']} assigned"
+    )
+    e2e = asyncio.run(bench_end_to_end(args.collections, args.drivers))
+    print(
+        f"end-to-end  plan {e2e['plan_ms']:.1f} ms, plan+apply {e2e['plan_and_apply_ms']:.1f} ms, "
+        f"{e2e['assigned']} assigned, {e2e['unassigned']} unassigned"
+    )
+    if e2e["plan_and_apply_ms"] > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Cold vs warm cost of core.security.decode_token under concurrent load.
+
+Simulates N concurrent clients, each resending its own bearer token on every
+request, and times decode_token with the verified-token cache empty (every
+call verifies the HMAC) and primed (every call is a digest + dict lookup).
+
+Usage (from backend/):
+    python -m benchmarks.token_decode --clients 200 --requests 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.security import build_token_claims, create_access_token, decode_token, token_cache
+
+
+def _mint_tokens(n: int) -> list[str]:
+    claims = build_token_claims(is_admin=False, is_driver=False, token_version=0, subscription_active_until=None)
+    return [create_access_token(subject=i + 1, claims=claims) for i in range(n)]
+
+
+async def _client(token: str, requests: int, samples: list[float], cold: bool) -> None:
+    for _ in range(requests):
+        if cold:
+            token_cache.clear()
+        started = time.perf_counter()
+        decode_token(token)
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0)  # interleave with the other clients like real requests
+
+
+async def _run(tokens: list[str], requests: int, cold: bool) -> dict[str, float]:
+    samples: list[float] = []
+    token_cache.clear()
+    if not cold:
+        for t in tokens:
+            decode_token(t)
+    started = time.perf_counter()
+    await asyncio.gather(*[_client(t, requests, samples, cold) for t in tokens])
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[int(len(samples) * 0.95)] * 1e6,
+        "throughput_per_s": len(samples) / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    args = parser.parse_args()
+
+    tokens = _mint_tokens(args.clients)
+    cold = asyncio.run(_run(tokens, args.requests, cold=True))
+    warm = asyncio.run(_run(tokens, args.requests, cold=False))
+
+    print(f"{'':6} {'calls':>8} {'mean_us':>10} {'p50_us':>10} {'p95_us':>10} {'ops/s':>12}")
+    for name, r in (("cold", cold), ("warm", warm)):
+        print(
+            f"{name:6} {r['calls']:>8} {r['mean_us']:>10.1f} {r['p50_us']:>10.1f} "
+            f"{r['p95_us']:>10.1f} {r['throughput_per_s']:>12.0f}"
+        )
+    print(f"speedup (mean): {cold['mean_us'] / warm['mean_us']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,9 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.services.db import Base, get_db_session
+from app.services.db import Base, get_db_session, get_read_session_factory
 from app.config import get_settings
+from app.core.principal_cache import principal_cache
 
 
 @pytest.fixture()
@@ -31,6 +32,7 @@ async def app(tmp_path):
         await conn.run_sync(Base.metadata.create_all)
 
     get_settings.cache_clear()
+    principal_cache.clear()
 
     from app.main import create_app
 
@@ -42,6 +44,7 @@ async def app(tmp_path):
             yield session
 
     application.dependency_overrides[get_db_session] = _test_db_session
+    application.dependency_overrides[get_read_session_factory] = lambda: TestSessionLocal
 
     # Expose test engine/session on the app so tests like healthz can access them
     application.state.test_engine = test_engine
@@ -53,6 +56,7 @@ async def app(tmp_path):
     application.dependency_overrides.clear()
     await test_engine.dispose()
     get_settings.cache_clear()
+    principal_cache.clear()
 
 
 @pytest.fixture()
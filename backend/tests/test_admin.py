@@ -30,13 +30,247 @@ async def test_admin_metrics(client, admin_headers):
 
 
 async def test_admin_list_collections(client, admin_headers):
-    """Admin collections endpoint returns 200 with a list."""
+    """Admin collections endpoint returns 200 with a page of items."""
     resp = await client.get("/admin/collections", headers=admin_headers)
     assert resp.status_code == 200
-    assert isinstance(resp.json(), list)
+    assert isinstance(resp.json()["items"], list)
 
 
 async def test_admin_collections_forbidden_for_non_admin(client, auth_headers):
     """Admin collections endpoint returns 403 for non-admin users."""
     resp = await client.get("/admin/collections", headers=auth_headers)
     assert resp.status_code == 403
+
+
+async def test_server_timing_reports_query_count(client, auth_headers):
+    """Every response carries a Server-Timing header with the SQL statement count."""
+    first = await client.get("/wallet/balance", headers=auth_headers)
+    assert 'desc="2 queries"' in first.headers["server-timing"]  # user lookup + balance row
+
+    resp = await client.get("/wallet/balance", headers=auth_headers)
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="1 queries"' in timing  # principal served from cache
+
+
+async def test_admin_query_stats_aggregates_per_route(client, admin_headers):
+    """Per-route statement totals are exposed to admins."""
+    await client.delete("/admin/stats/queries", headers=admin_headers)
+    for _ in range(2):
+        await client.get("/admin/metrics", headers=admin_headers)
+
+    resp = await client.get("/admin/stats/queries", headers=admin_headers)
+    assert resp.status_code == 200
+    metrics_stats = resp.json()["GET /admin/metrics"]
+    assert metrics_stats["requests"] == 2
+    assert metrics_stats["statements"] >= 2 * 9
+
+
+
+def test_failed_statement_does_not_leak_query_start():
+    """A statement that errors pops its start time, so later timings pair with their own start."""
+    import pytest
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    from app.core.query_stats import install_query_instrumentation
+
+    install_query_instrumentation()
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["gc_query_start"] == []
+
+
+async def test_admin_collections_keyset_pages_and_filters(client, app, admin_headers):
+    """nextCursor walks every live collection newest-first; filters narrow by date, driver, return point and zone."""
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from app.models import Collection, Driver
+
+    base = datetime(2026, 3, 2, 9)
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(Driver), [{"id": 900, "user_id": 900, "zone": "D08"}, {"id": 901, "user_id": 901, "zone": "D04"}]
+        )
+        await session.execute(
+            insert(Collection),
+            [
+                {
+                    "user_id": 1,
+                    "return_point_id": 1 + i % 2,
+                    # Pairs share a timestamp so the id tiebreak is exercised.
+                    "scheduled_at": base + timedelta(hours=i // 2),
+                    "status": "assigned",
+                    "driver_id": 900 if i % 3 == 0 else 901,
+                    "is_archived": i == 0,
+                }
+                for i in range(25)
+            ],
+        )
+        await session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/admin/collections?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        body = (await client.get(url, headers=admin_headers)).json()
+        seen.extend((c["scheduled_at"], c["id"]) for c in body["items"])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 24 and len(set(seen)) == 24
+    assert seen == sorted(seen, reverse=True)
+
+    async def ids(query: str) -> set[int]:
+        resp = await client.get(f"/admin/collections?limit=200&{query}", headers=admin_headers)
+        assert resp.status_code == 200, resp.text
+        return {c["id"] for c in resp.json()["items"]}
+
+    by_zone = await ids("zone=D08")
+    assert by_zone == await ids("driverId=900") and len(by_zone) == 8  # i = 3, 6, ..., 24
+    assert len(await ids("returnPointId=2")) == 12
+    assert len(await ids("since=2026-03-02T10:00:00&until=2026-03-02T12:00:00")) == 4
+    assert (await client.get("/admin/collections?cursor=bogus", headers=admin_headers)).status_code == 400
+
+
+async def test_admin_bulk_status_transition(client, app, admin_headers):
+    """One request moves many collections; credits are batch-written once and bad ids get per-id errors."""
+    from datetime import datetime
+
+    from sqlalchemy import insert, select
+
+    from app.core.events import clear_handlers, register_handler
+    from app.models import Collection, User, WalletBalance, WalletTransaction
+
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(User), [{"id": 901 + u, "email": f"bulk{u}@example.com", "password_hash": "x"} for u in range(3)]
+        )
+        await session.execute(
+            insert(Collection),
+            [
+                {"id": 500 + i, "user_id": 901 + i % 3, "return_point_id": 1, "scheduled_at": datetime(2026, 2, 2, 10),
+                 "status": "collected" if i < 8 else "scheduled", "voucher_amount_cents": 100 if i < 8 else None}
+                for i in range(10)
+            ],
+        )
+        await session.commit()
+
+    published = []
+
+    async def _capture(payload):
+        published.append(payload)
+
+    register_handler("wallet.credit.created", _capture)
+    try:
+        ids = list(range(500, 510)) + [999]
+        resp = await client.post(
+            "/admin/collections/bulk-status", json={"collectionIds": ids, "status": "completed"}, headers=admin_headers
+        )
+    finally:
+        clear_handlers("wallet.credit.created")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["updated"] == 8
+    assert [r["id"] for r in body["results"]] == ids
+    assert body["results"][8]["error"] == "Invalid transition: scheduled -> completed"
+    assert body["results"][10]["error"] == "Not found"
+    assert len(published) == 8
+
+    async with app.state.test_session_local() as session:
+        balances = dict((await session.execute(select(WalletBalance.user_id, WalletBalance.balance_cents))).all())
+        txns = (await session.scalars(select(WalletTransaction.collection_id))).all()
+    assert sorted(txns) == list(range(500, 508))
+    assert balances == {901: 300, 902: 300, 903: 200}
+
+    # Re-running is harmless: nothing is in a state that allows the move any more.
+    again = await client.post(
+        "/admin/collections/bulk-status", json={"collectionIds": ids, "status": "completed"}, headers=admin_headers
+    )
+    assert again.json()["updated"] == 0
+    bad = await client.post(
+        "/admin/collections/bulk-status", json={"collectionIds": [500], "status": "nope"}, headers=admin_headers
+    )
+    assert bad.status_code == 400
+
+
+async def test_admin_bulk_assign_driver(client, app, admin_headers):
+    """Many assignments land in one statement; unknown drivers and collections are reported per id."""
+    from datetime import datetime
+
+    from sqlalchemy import insert, select
+
+    from app.models import Collection, Driver
+
+    async with app.state.test_session_local() as session:
+        await session.execute(insert(Driver), [{"id": 700, "user_id": 700}, {"id": 701, "user_id": 701}])
+        await session.execute(
+            insert(Collection),
+            [
+                {"id": 600 + i, "user_id": 1, "return_point_id": 1, "scheduled_at": datetime(2026, 2, 2, 10),
+                 "status": "scheduled" if i < 3 else "collected"}
+                for i in range(4)
+            ],
+        )
+        await session.commit()
+
+    assignments = [
+        {"collectionId": 600, "driverId": 700},
+        {"collectionId": 601, "driverId": 701},
+        {"collectionId": 602, "driverId": 799},
+        {"collectionId": 603, "driverId": 700},
+        {"collectionId": 999, "driverId": 701},
+    ]
+    await client.get("/admin/ping", headers=admin_headers)  # warm the principal cache
+    resp = await client.post(
+        "/admin/collections/bulk-assign-driver", json={"assignments": assignments}, headers=admin_headers
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["updated"] == 3
+    assert [r["error"] for r in body["results"]] == [None, None, "Driver not found", None, "Not found"]
+    assert 'desc="2 queries"' in resp.headers["server-timing"]  # driver check + UPDATE ... RETURNING
+
+    async with app.state.test_session_local() as session:
+        rows = {r.id: (r.driver_id, r.status) for r in await session.scalars(select(Collection).where(Collection.id >= 600))}
+    assert rows == {600: (700, "assigned"), 601: (701, "assigned"), 602: (None, "scheduled"), 603: (700, "collected")}
+
+
+async def test_admin_status_transition_is_versioned(client, app, admin_headers):
+    """Each transition is one conditional UPDATE; a stale version is rejected with 409."""
+    from datetime import datetime
+
+    from sqlalchemy import insert
+
+    from app.models import Collection
+
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(Collection),
+            [{"id": 710, "user_id": 1, "return_point_id": 1, "status": "scheduled", "scheduled_at": datetime(2026, 5, 12, 10)}],
+        )
+        await session.commit()
+    await client.get("/admin/ping", headers=admin_headers)  # warm the principal cache
+
+    resp = await client.patch("/admin/collections/710/status?version=0", json={"status": "assigned"}, headers=admin_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["version"] == 1
+    assert 'desc="1 queries"' in resp.headers["server-timing"]
+
+    stale = await client.patch("/admin/collections/710/status?version=0", json={"status": "canceled"}, headers=admin_headers)
+    assert stale.status_code == 409
+    assert "version 1" in stale.json()["detail"]
+    invalid = await client.patch("/admin/collections/710/status", json={"status": "completed"}, headers=admin_headers)
+    assert invalid.status_code == 409
+    assert invalid.json()["detail"] == "Invalid transition: assigned -> completed"
+    assert (await client.patch("/admin/collections/710/status", json={"status": "nope"}, headers=admin_headers)).status_code == 400
+    assert (await client.patch("/admin/collections/9999/status", json={"status": "canceled"}, headers=admin_headers)).status_code == 404
+
+    resp = await client.patch("/admin/collections/710/status?version=1", json={"status": "canceled"}, headers=admin_headers)
+    assert resp.status_code == 200
+    assert resp.json()["version"] == 2
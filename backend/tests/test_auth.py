@@ -82,3 +82,214 @@ async def test_me_admin_flag(client, admin_headers):
     assert resp.status_code == 200
     data = resp.json()
     assert data["is_admin"] is True
+
+
+async def test_me_served_from_principal_cache(client, auth_headers, admin_headers):
+    """Repeated authenticated requests reuse the cached principal."""
+    await client.get("/auth/me", headers=auth_headers)
+    before = (await client.get("/admin/stats/principal-cache", headers=admin_headers)).json()
+
+    for _ in range(3):
+        resp = await client.get("/auth/me", headers=auth_headers)
+        assert resp.status_code == 200
+
+    after = (await client.get("/admin/stats/principal-cache", headers=admin_headers)).json()
+    # 3 user lookups + 1 admin lookup, all hits
+    assert after["hits"] - before["hits"] == 4
+    assert after["misses"] == before["misses"]
+
+
+async def test_update_me_invalidates_principal_cache(client, auth_headers):
+    """Profile changes are visible immediately despite the principal cache."""
+    await client.get("/auth/me", headers=auth_headers)
+    resp = await client.patch(
+        "/users/me",
+        json={"full_name": "Renamed User", "address": "1 Main St"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+
+    resp = await client.get("/auth/me", headers=auth_headers)
+    data = resp.json()
+    assert data["full_name"] == "Renamed User"
+    assert data["address"] == "1 Main St"
+
+
+async def test_concurrent_logins_do_not_block_event_loop(client, auth_token):
+    """bcrypt runs in the hashing pool, so the loop keeps ticking during a login burst."""
+    import asyncio
+
+    ticks = 0
+    stop = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    resps = await asyncio.gather(
+        *[
+            client.post(
+                "/auth/login",
+                json={"email": "testuser@example.com", "password": "test123456"},
+            )
+            for _ in range(4)
+        ]
+    )
+    stop.set()
+    await tick_task
+
+    assert all(r.status_code == 200 for r in resps)
+    assert ticks > 4
+
+
+async def test_access_token_carries_role_and_subscription_claims(client, auth_token, admin_token):
+    """Login embeds role flags, subscription expiry and token version in the JWT."""
+    from app.core.security import decode_token
+
+    user_claims = decode_token(auth_token)
+    assert user_claims["is_admin"] is False
+    assert user_claims["is_driver"] is False
+    assert user_claims["sub_active_until"] is None
+    assert user_claims["tv"] == 0
+
+    assert decode_token(admin_token)["is_admin"] is True
+
+
+async def test_subscription_claim_refreshes_on_login(client, auth_headers):
+    """A fresh login after choosing a plan carries the active-until date."""
+    from app.core.security import decode_token
+
+    resp = await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=auth_headers)
+    assert resp.status_code == 200
+    period_end = resp.json()["currentPeriodEnd"]
+
+    resp = await client.post(
+        "/auth/login",
+        json={"email": "testuser@example.com", "password": "test123456"},
+    )
+    assert decode_token(resp.json()["access_token"])["sub_active_until"] == period_end
+
+
+async def test_revoked_token_is_rejected(client, auth_headers, admin_headers):
+    """Bumping the token version invalidates previously issued tokens."""
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+
+    resp = await client.post(f"/admin/users/{me['id']}/revoke-tokens", headers=admin_headers)
+    assert resp.status_code == 200
+
+    resp = await client.get("/auth/me", headers=auth_headers)
+    assert resp.status_code == 401
+
+    resp = await client.post(
+        "/auth/login",
+        json={"email": "testuser@example.com", "password": "test123456"},
+    )
+    new_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    assert (await client.get("/auth/me", headers=new_headers)).status_code == 200
+
+
+async def test_cancel_keeps_subscription_claim_valid(client, auth_headers):
+    """Cancelling runs to the period end: the claim is unchanged and issued tokens keep working."""
+    from app.core.security import decode_token
+
+    await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=auth_headers)
+    resp = await client.post("/auth/login", json={"email": "testuser@example.com", "password": "test123456"})
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = await client.post("/subscriptions/cancel", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "canceled"
+    assert decode_token(token)["sub_active_until"] == resp.json()["currentPeriodEnd"]
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+
+def test_decode_token_reuses_verified_payload():
+    """A token is verified once, then served from the cache until its exp."""
+    from app.core.security import create_access_token, decode_token, token_cache
+
+    token_cache.clear()
+    token = create_access_token(subject=42)
+    assert decode_token(token)["sub"] == "42"
+    assert decode_token(token)["sub"] == "42"
+    assert token_cache.stats()["hits"] == 1
+    assert token_cache.stats()["misses"] == 1
+
+
+def test_decode_token_cache_respects_exp():
+    """Expired cache entries are re-verified (and rejected) instead of served."""
+    import hashlib
+    import time
+
+    import pytest
+    from jose import JWTError
+
+    from app.config import get_settings
+    from app.core.security import create_access_token, decode_token, token_cache
+
+    token_cache.clear()
+    token = create_access_token(subject=7)
+    decode_token(token)
+    # Force the cached entry to look expired.
+    settings = get_settings()
+    key = hashlib.sha256(f"{settings.jwt_algorithm}:{settings.jwt_secret_key}:{token}".encode()).digest()
+    token_cache._entries[key] = (time.time() - 1, {"sub": "7", "exp": 0})
+    assert decode_token(token)["sub"] == "7"
+    assert token_cache.stats()["misses"] == 2
+
+    expired = create_access_token(subject=7, expires_minutes=-1)
+    with pytest.raises(JWTError):
+        decode_token(expired)
+
+
+async def _login_pair(client) -> dict:
+    await client.post(
+        "/auth/register",
+        json={"email": "refresh@example.com", "password": "pass123456"},
+    )
+    resp = await client.post(
+        "/auth/login",
+        json={"email": "refresh@example.com", "password": "pass123456"},
+    )
+    assert resp.status_code == 200
+    return resp.json()
+
+
+async def test_refresh_rotates_tokens(client):
+    """/auth/refresh returns a new pair and the new access token works."""
+    pair = await _login_pair(client)
+    assert pair["refresh_token"]
+
+    resp = await client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert resp.status_code == 200
+    rotated = resp.json()
+    assert rotated["refresh_token"] != pair["refresh_token"]
+
+    me = await client.get("/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["email"] == "refresh@example.com"
+
+
+async def test_refresh_token_reuse_revokes_family(client):
+    """Replaying a rotated refresh token fails and kills its successor too."""
+    pair = await _login_pair(client)
+    rotated = (await client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})).json()
+
+    replay = await client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert replay.status_code == 401
+
+    resp = await client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert resp.status_code == 401
+
+
+async def test_logout_revokes_refresh_token(client):
+    """After /auth/logout the refresh token can no longer be used."""
+    pair = await _login_pair(client)
+    resp = await client.post("/auth/logout", json={"refresh_token": pair["refresh_token"]})
+    assert resp.status_code == 204
+
+    resp = await client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert resp.status_code == 401
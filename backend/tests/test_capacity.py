@@ -0,0 +1,92 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import func, insert, select, update
+
+from app.models import Collection, CollectionSlot, PickupCapacity
+from app.services.capacity import UNZONED, capacity_zone, day_windows, rebuild, window_start
+from app.services.recurring_generation import generate_collections
+
+
+def test_windows_tile_the_service_day():
+    day = date(2026, 6, 1)
+    windows = day_windows(day)
+    assert [(s.hour, e.hour) for s, e in windows] == [(8, 10), (10, 12), (12, 14), (14, 16), (16, 18), (18, 20)]
+    assert window_start(datetime(2026, 6, 1, 11, 59)) == datetime(2026, 6, 1, 10)
+    assert window_start(datetime(2026, 6, 1, 20, 0)) == datetime(2026, 6, 1, 18)  # closing time is bookable
+    assert capacity_zone("1 Road, Dublin 4") == "D04"
+    assert capacity_zone(None) == UNZONED
+
+
+async def _subscriber_headers(client, email: str, address: str) -> dict:
+    await client.post("/auth/register", json={"email": email, "password": "test123456", "full_name": "Booker"})
+    resp = await client.post("/auth/login", json={"email": email, "password": "test123456"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    await client.patch("/users/me", json={"full_name": "Booker", "address": address}, headers=headers)
+    await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=headers)
+    resp = await client.post("/auth/login", json={"email": email, "password": "test123456"})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def test_booking_and_cancel_move_the_window_counter(client, app):
+    """Bookings take places from the counter, a full window is refused without counting collections, cancels give back."""
+    first = await _subscriber_headers(client, "first@example.com", "1 Road, Dublin 4")
+    second = await _subscriber_headers(client, "second@example.com", "2 Road, D04 AC12")
+    day = (datetime.utcnow() + timedelta(days=7)).date()
+    when = datetime.combine(day, time(10, 30))
+    window = datetime.combine(day, time(10))
+
+    resp = await client.post("/collections", json={"scheduledAt": when.isoformat(), "returnPointId": 1}, headers=first)
+    assert resp.status_code == 201, resp.text
+    first_id = resp.json()["id"]
+
+    async with app.state.test_session_local() as session:
+        counter = (await session.execute(select(PickupCapacity).where(PickupCapacity.zone == "D04"))).scalar_one()
+        assert (counter.starts_at, counter.booked, counter.capacity) == (window, 1, 12)
+        await session.execute(update(PickupCapacity).values(capacity=1))
+        await session.commit()
+
+    avail = (await client.get(f"/collections/availability?weekStart={day.isoformat()}", headers=second)).json()
+    assert avail["zone"] == "D04"
+    starts = {w["startsAt"] for w in avail["windows"]}
+    assert window.isoformat() not in starts
+    assert datetime.combine(day, time(12)).isoformat() in starts
+    assert len(avail["windows"]) == 7 * 6 - 1
+
+    full = await client.post("/collections", json={"scheduledAt": when.isoformat(), "returnPointId": 1}, headers=second)
+    assert full.status_code == 400
+    assert "fully booked" in full.json()["detail"]
+    assert 'desc="1 queries"' in full.headers["server-timing"]
+    other_zone = await client.get(f"/collections/availability?weekStart={day.isoformat()}&zone=d15", headers=second)
+    assert window.isoformat() in {w["startsAt"] for w in other_zone.json()["windows"]}
+
+    assert (await client.patch(f"/collections/{first_id}/cancel", headers=first)).status_code == 200
+    resp = await client.post("/collections", json={"scheduledAt": when.isoformat(), "returnPointId": 1}, headers=second)
+    assert resp.status_code == 201, resp.text
+    async with app.state.test_session_local() as session:
+        assert await session.scalar(select(PickupCapacity.booked).where(PickupCapacity.zone == "D04")) == 1
+
+
+async def test_generation_counts_and_rebuild_recounts(app):
+    today = datetime.utcnow().date()
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(CollectionSlot),
+            [{"id": 1, "user_id": 77, "weekday": (today.weekday() + 2) % 7, "start_time": time(9), "end_time": time(10),
+              "preferred_return_point_id": 1, "frequency": "weekly", "status": "active"}],
+        )
+        await session.commit()
+        result = await generate_collections(session, weeks_ahead=2)
+        assert result["generated"] >= 2
+        counters = (await session.execute(select(PickupCapacity.zone, PickupCapacity.starts_at, PickupCapacity.booked))).all()
+        assert {c.zone for c in counters} == {UNZONED}
+        assert all(c.starts_at.hour == 8 and c.booked == 1 for c in counters)
+        assert len(counters) == result["generated"]
+
+        # Drift (e.g. rows written around the service layer) is repaired by a rebuild.
+        await session.execute(update(PickupCapacity).values(booked=5))
+        first_id = await session.scalar(select(func.min(Collection.id)))
+        await session.execute(update(Collection).where(Collection.id == first_id).values(status="canceled"))
+        assert await rebuild(session, today) == result["generated"] - 1
+        await session.commit()
+        booked = (await session.scalars(select(PickupCapacity.booked).order_by(PickupCapacity.starts_at))).all()
+        assert sorted(booked) == [0] + [1] * (result["generated"] - 1)
@@ -29,3 +29,81 @@ async def test_create_collection_requires_active_subscription(client, auth_heade
         headers=auth_headers,
     )
     assert resp.status_code == 403
+
+
+async def test_create_collection_with_subscription_claim(client, auth_headers):
+    """A token minted after subscribing authorizes booking."""
+    from datetime import datetime, timedelta
+
+    resp = await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=auth_headers)
+    assert resp.status_code == 200
+    resp = await client.post(
+        "/auth/login",
+        json={"email": "testuser@example.com", "password": "test123456"},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    when = (datetime.utcnow() + timedelta(days=7)).replace(hour=10, minute=0, second=0, microsecond=0)
+    resp = await client.post(
+        "/collections",
+        json={"scheduledAt": when.isoformat(), "returnPointId": 1, "bagCount": 2},
+        headers=headers,
+    )
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["status"] == "scheduled"
+
+
+async def test_create_collection_statement_count(client, auth_headers):
+    """Booking takes a window place, then validates and inserts in one statement; a rejection costs one more."""
+    from datetime import datetime, timedelta
+
+    await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=auth_headers)
+    resp = await client.post("/auth/login", json={"email": "testuser@example.com", "password": "test123456"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    await client.get("/wallet/balance", headers=headers)  # warm the principal cache
+
+    when = (datetime.utcnow() + timedelta(days=7)).replace(hour=10, minute=0, second=0, microsecond=0)
+    payload = {"scheduledAt": when.isoformat(), "returnPointId": 1}
+    resp = await client.post("/collections", json=payload, headers=headers)
+    assert resp.status_code == 201, resp.text
+    assert 'desc="2 queries"' in resp.headers["server-timing"]
+
+    resp = await client.post("/collections", json=payload, headers=headers)
+    assert resp.status_code == 400
+    assert "Weekly pickup limit" in resp.json()["detail"]
+    assert 'desc="3 queries"' in resp.headers["server-timing"]
+
+
+async def test_list_my_collections_cursor_pagination(client, app, auth_headers):
+    """nextCursor pages match OFFSET pages; cursor pages skip the total count."""
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from app.models import Collection
+
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(Collection),
+            [
+                {"user_id": me["id"], "return_point_id": 1, "scheduled_at": datetime(2026, 5, 4, 9) + timedelta(days=i // 2)}
+                for i in range(9)
+            ],
+        )
+        await session.commit()
+
+    body = (await client.get("/collections/me?pageSize=4", headers=auth_headers)).json()
+    assert body["total"] == 9
+    seen, cursor = [c["id"] for c in body["items"]], body["nextCursor"]
+    while cursor:
+        body = (await client.get(f"/collections/me?pageSize=4&cursor={cursor}", headers=auth_headers)).json()
+        assert body["total"] is None
+        seen.extend(c["id"] for c in body["items"])
+        cursor = body["nextCursor"]
+
+    paged = []
+    for page in (1, 2, 3):
+        body = (await client.get(f"/collections/me?page={page}&pageSize=4", headers=auth_headers)).json()
+        paged.extend(c["id"] for c in body["items"])
+    assert seen == paged and len(set(seen)) == 9
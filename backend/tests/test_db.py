@@ -0,0 +1,78 @@
+"""Tests for engine/pool wiring in services/db.py."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services.db import InstrumentedQueuePool, _install_idle_ping, pool_stats
+
+
+async def test_pool_stats_report_checkouts_and_wait(tmp_path):
+    """Instrumented pool exposes checked-out count and acquire wait time."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'p.db'}", poolclass=InstrumentedQueuePool)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine)
+            assert stats["checked_out"] == 1
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["acquires"] == 1
+        assert stats["avg_wait_ms"] >= 0.0
+    finally:
+        await engine.dispose()
+
+
+async def test_idle_ping_only_pings_idle_connections(tmp_path, monkeypatch):
+    """Fresh checkouts skip the ping; connections idle past the threshold get one."""
+    import asyncio
+
+    async def run(idle_seconds: float, pause: float) -> int:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'p.db'}", poolclass=InstrumentedQueuePool)
+        pings = []
+        monkeypatch.setattr(engine.sync_engine.dialect, "do_ping", lambda dbapi_conn: pings.append(1) or True)
+        _install_idle_ping(engine, idle_seconds=idle_seconds)
+        try:
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(pause)
+        finally:
+            await engine.dispose()
+        return len(pings)
+
+    assert await run(idle_seconds=3600, pause=0) == 0
+    # First checkout opens a new connection (no ping); the two reuses were idle long enough.
+    assert await run(idle_seconds=0.01, pause=0.02) == 2
+
+
+async def test_read_session_uses_replica_or_falls_back(tmp_path, monkeypatch):
+    """get_read_session yields the replica when reachable, else the primary."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    import app.services.db as db_mod
+
+    primary = object()
+
+    async def first(gen):
+        value = await gen.__anext__()
+        await gen.aclose()
+        return value
+
+    # No replica configured -> primary
+    monkeypatch.setattr(db_mod, "ReadSessionLocal", None)
+    assert await first(db_mod.get_read_session(primary)) is primary
+
+    # Reachable replica -> replica session
+    good = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(db_mod, "ReadSessionLocal", async_sessionmaker(good, class_=AsyncSession))
+    monkeypatch.setattr(db_mod, "_replica_down_until", 0.0)
+    session = await first(db_mod.get_read_session(primary))
+    assert isinstance(session, AsyncSession)
+    await good.dispose()
+
+    # Unreachable replica -> primary, and the replica is skipped for a while
+    bad = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(db_mod, "ReadSessionLocal", async_sessionmaker(bad, class_=AsyncSession))
+    assert await first(db_mod.get_read_session(primary)) is primary
+    assert db_mod._replica_down_until > 0
+    await bad.dispose()
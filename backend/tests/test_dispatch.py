@@ -0,0 +1,112 @@
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+
+from app.core.eircode import routing_key, zone_routing_keys
+from app.models import Collection, Driver
+from app.services.dispatch import NO_CAPACITY, NO_ZONE, DispatchCollection, DispatchDriver, plan_assignments
+
+
+def test_routing_key_from_addresses():
+    assert routing_key("12 Main St, Ranelagh, D06 X2Y3") == "D06"
+    assert routing_key("1 Load Street, Dublin 4") == "D04"
+    assert routing_key("Flat 2, Dublin 6W") == "D6W"
+    assert routing_key("t12 ac34") == "T12"
+    assert routing_key("Somewhere, Ireland") is None
+
+
+def test_plan_respects_zone_capacity_and_balances_load():
+    drivers = [
+        DispatchDriver(id=1, zone="D04", capacity=10),
+        DispatchDriver(id=2, zone="D04", capacity=10, load=6),
+        DispatchDriver(id=3, zone=None, capacity=5),
+    ]
+    collections = [
+        DispatchCollection(id=10, zone="D04", bags=6),  # placed after 14; nobody has 6 spare by then
+        DispatchCollection(id=11, zone="D04", bags=4),
+        DispatchCollection(id=12, zone="D04", bags=3),  # D04 full: overflows to the unzoned driver
+        DispatchCollection(id=13, zone="D08", bags=2),  # no D08 driver: unzoned driver too
+        DispatchCollection(id=14, zone="D04", bags=9),  # largest first, to the emptiest D04 driver
+        DispatchCollection(id=15, zone=None, bags=1),
+    ]
+    assignments, unassigned = plan_assignments(collections, drivers)
+    assert assignments == {14: 1, 11: 2, 12: 3, 13: 3}
+    assert unassigned == {10: NO_CAPACITY, 15: NO_CAPACITY}
+    assert [d.load for d in drivers] == [9, 10, 5]
+
+    even = [DispatchDriver(id=1, zone="D04", capacity=10), DispatchDriver(id=2, zone="D04", capacity=10)]
+    plan_assignments([DispatchCollection(id=i, zone="D04", bags=1) for i in range(6)], even)
+    assert [d.load for d in even] == [3, 3]
+
+    _, unassigned = plan_assignments([DispatchCollection(id=20, zone=None, bags=1)], [DispatchDriver(1, "D04", 5)])
+    assert unassigned == {20: NO_ZONE}
+
+
+
+def test_driver_app_zone_labels_cover_routing_keys():
+    """The labels offered by the driver app (DriverPage DRIVER_ZONES) reach real collections."""
+    assert zone_routing_keys("Dublin 1") == {"D01"}
+    assert zone_routing_keys("Dublin 2-4") == {"D02", "D03", "D04"}
+    assert zone_routing_keys("Dublin 6-8") == {"D06", "D6W", "D07", "D08"}
+    assert "D18" in zone_routing_keys("South County") and "K67" in zone_routing_keys("north  county")
+    assert zone_routing_keys("D04, Dublin 8") == {"D04", "D08"}
+    assert zone_routing_keys("Somewhere") == frozenset()
+
+    assignments, _ = plan_assignments(
+        [DispatchCollection(1, routing_key("1 Main St, Dublin 1"), 5)], [DispatchDriver(7, "Dublin 1", 80)]
+    )
+    assert assignments == {1: 7}
+
+    # One driver in several heaps: loads taken through D02 count against D04 too.
+    drivers = [DispatchDriver(1, "Dublin 2-4", 10), DispatchDriver(2, "D04", 10, load=3)]
+    collections = [
+        DispatchCollection(10, "D02", bags=8),
+        DispatchCollection(11, "D04", bags=5),
+        DispatchCollection(12, "D04", bags=3),
+    ]
+    assignments, unassigned = plan_assignments(collections, drivers)
+    assert assignments == {10: 1, 11: 2} and unassigned == {12: NO_CAPACITY}
+    assert [d.load for d in drivers] == [8, 8]
+
+
+async def test_dispatch_dry_run_then_apply(client, app, admin_headers):
+    """Dry run writes nothing; apply assigns and moves rows to assigned, skipping ones already taken."""
+    day = date(2026, 4, 6)
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(Driver),
+            [
+                {"id": 800, "user_id": 800, "zone": "D04", "vehicle_type": "bike"},
+                {"id": 801, "user_id": 801, "zone": "D08", "vehicle_type": "van"},
+                {"id": 802, "user_id": 802, "zone": "D08", "vehicle_type": "van", "is_available": False},
+            ],
+        )
+        await session.execute(
+            insert(Collection),
+            [
+                {"id": 900, "user_id": 1, "return_point_id": 1, "scheduled_at": datetime(2026, 4, 6, 9),
+                 "pickup_address": "1 Road, Dublin 4", "bag_count": 2},
+                {"id": 901, "user_id": 1, "return_point_id": 1, "scheduled_at": datetime(2026, 4, 6, 11),
+                 "pickup_address": "2 Road, D08 AC12", "bag_count": 5},
+                {"id": 902, "user_id": 1, "return_point_id": 1, "scheduled_at": datetime(2026, 4, 6, 12),
+                 "pickup_address": "3 Road, Dublin 8", "bag_count": 1, "driver_id": 801, "status": "assigned"},
+                {"id": 903, "user_id": 1, "return_point_id": 1, "scheduled_at": datetime(2026, 4, 7, 9),
+                 "pickup_address": "4 Road, Dublin 4", "bag_count": 1},
+            ],
+        )
+        await session.commit()
+
+    resp = await client.post("/admin/dispatch", json={"date": day.isoformat()}, headers=admin_headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["dryRun"] is True
+    assert {a["collectionId"]: a["driverId"] for a in body["assignments"]} == {900: 800, 901: 801}
+    assert {d["driverId"]: d["loadBags"] for d in body["drivers"]} == {800: 2, 801: 6}
+    async with app.state.test_session_local() as session:
+        assert await session.scalar(select(Collection.driver_id).where(Collection.id == 900)) is None
+
+    resp = await client.post("/admin/dispatch", json={"date": day.isoformat(), "dryRun": False}, headers=admin_headers)
+    assert resp.json()["assigned"] == 2
+    async with app.state.test_session_local() as session:
+        rows = dict((await session.execute(select(Collection.id, Collection.status).where(Collection.id.in_([900, 901, 903])))).all())
+    assert rows == {900: "assigned", 901: "assigned", 903: "scheduled"}
@@ -63,3 +63,47 @@ async def test_admin_lists_all_drivers(client, admin_headers):
     data = resp.json()
     assert isinstance(data, list)
     assert len(data) >= 1
+
+
+async def test_parallel_transitions_have_one_winner(client, app, driver_headers, admin_headers, auth_headers):
+    """Racing driver completions, admin cancels and a user cancel: one conditional UPDATE wins, the rest get 409."""
+    import asyncio
+    from datetime import datetime
+
+    from sqlalchemy import insert, select
+
+    from app.models import Collection, WalletTransaction
+
+    profile = (await client.get("/drivers/me/profile", headers=driver_headers)).json()
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(Collection),
+            [{"id": 700, "user_id": me["id"], "return_point_id": 1, "driver_id": profile["id"], "status": "collected",
+              "scheduled_at": datetime(2026, 5, 12, 10)}],
+        )
+        await session.commit()
+
+    requests = [
+        client.patch("/drivers/me/collections/700/mark-completed", json={"voucherAmountCents": 250}, headers=driver_headers)
+        for _ in range(4)
+    ] + [
+        client.patch("/admin/collections/700/status", json={"status": "canceled"}, headers=admin_headers)
+        for _ in range(4)
+    ] + [client.patch("/collections/700/cancel", headers=auth_headers)]
+    responses = await asyncio.gather(*requests)
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200] + [409] * 8, [r.text for r in responses]
+    winner = next(r.json() for r in responses if r.status_code == 200)
+    assert winner["version"] == 1
+
+    async with app.state.test_session_local() as session:
+        status, version = (await session.execute(select(Collection.status, Collection.version).where(Collection.id == 700))).one()
+        credits = (await session.scalars(select(WalletTransaction.amount_cents).where(WalletTransaction.collection_id == 700))).all()
+    assert (status, version) == (winner["status"], 1)
+    assert credits == ([250] if status == "completed" else [])
+
+    # A transition from a state that can't move is a conflict too; an unknown id is still 404.
+    again = await client.patch("/drivers/me/collections/700/mark-collected", headers=driver_headers)
+    assert again.status_code == 409
+    assert (await client.patch("/drivers/me/collections/9999/mark-collected", headers=driver_headers)).status_code == 404
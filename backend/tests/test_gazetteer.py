@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.gazetteer import Gazetteer, build
+from app.core.geo import DISTRICT_CENTROIDS
+from app.models import Collection
+from app.models.user import User
+from app.scripts.build_gazetteer import read_entries
+
+
+def test_lookup_exact_code_then_routing_key_centroid():
+    gazetteer = Gazetteer(build([
+        ("D04 AC12", 53.3301, -6.2302),
+        ("D04 AC13", 53.3261, -6.2258),
+        ("D6W XY12", 53.3091, -6.3010),
+        ("A65 F4E2", 53.5000, -6.6500),
+    ]))
+    assert gazetteer.lookup("Flat 2, 5 Road, Dublin 4, D04AC12") == (53.3301, -6.2302)
+    # Unknown code in a known routing key: the mean of that key's codes.
+    assert gazetteer.lookup("D04 XY99") == (53.3281, -6.228)
+    assert gazetteer.lookup("9 Terrace, Dublin 6W") == (53.3091, -6.301)
+    assert gazetteer.lookup("D01 AC12") is None
+    assert gazetteer.lookup("No code here") is None
+    assert gazetteer.lookup(None) is None
+
+
+def test_gazetteer_file_round_trip(tmp_path):
+    source = tmp_path / "eircodes.csv"
+    source.write_text(
+        "eircode,lat,lng\n"
+        "D02 X285,53.3386,-6.2592\n"
+        "d02x286,53.3390,-6.2600\n"
+        "D15,53.3900,-6.3800\n"
+        "not a code,1,2\n"
+        "D07 AC12,,\n"
+    )
+    entries, skipped = read_entries(source, "eircode", "lat", "lng")
+    assert skipped == 2
+    path = tmp_path / "eircodes.gceg"
+    path.write_bytes(build(entries))
+
+    gazetteer = Gazetteer.open(path)
+    assert gazetteer.size == 4  # two codes, D15 and the derived D02 centroid
+    assert gazetteer.lookup("D02 X286") == (53.339, -6.26)
+    assert gazetteer.lookup("1 Road, Dublin 15") == (53.39, -6.38)
+    assert gazetteer.lookup("D02 AC12") == (53.3388, -6.2596)
+
+
+async def test_profile_and_booking_store_coordinates(client, app, auth_headers):
+    resp = await client.patch(
+        "/users/me", json={"full_name": "Test User", "address": "12 Pembroke Road, Dublin 4"}, headers=auth_headers
+    )
+    assert resp.status_code == 200
+
+    await client.post("/subscriptions/choose", json={"planCode": "monthly"}, headers=auth_headers)
+    resp = await client.post("/auth/login", json={"email": "testuser@example.com", "password": "test123456"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    when = (datetime.utcnow() + timedelta(days=7)).replace(hour=10, minute=0, second=0, microsecond=0)
+    resp = await client.post("/collections", json={"scheduledAt": when.isoformat(), "returnPointId": 1}, headers=headers)
+    assert resp.status_code == 201, resp.text
+
+    async with app.state.test_session_local() as session:
+        user = (await session.execute(select(User.lat, User.lng).where(User.email == "testuser@example.com"))).one()
+        col = (
+            await session.execute(
+                select(Collection.pickup_lat, Collection.pickup_lng).where(Collection.id == resp.json()["id"])
+            )
+        ).one()
+    assert tuple(user) == tuple(col) == DISTRICT_CENTROIDS["D04"]
@@ -0,0 +1,278 @@
+"""Query-plan regression tests for the service layer.
+
+Each case calls a real function from app/services/* against a seeded database,
+captures every SELECT (and INSERT ... SELECT) it issues, and EXPLAINs it. A hot query that falls back
+to a full table scan (SQLite "SCAN <table>" without an index, Postgres
+"Seq Scan" with enable_seqscan=off) fails the test, so a migration or model
+change can't silently turn an indexed lookup into a scan.
+
+SQLite always runs. Set TEST_POSTGRES_URL=postgresql+asyncpg://... to also
+check Postgres.
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import (
+    Claim,
+    Collection,
+    CollectionSlot,
+    Driver,
+    DriverEarning,
+    DriverPayout,
+    Notification,
+    ReturnPoint,
+    Subscription,
+    User,
+    WalletTransaction,
+)
+from app.services import (
+    claims,
+    collection_slots,
+    collections,
+    driver_payouts,
+    drivers,
+    notifications,
+    subscriptions,
+    tokens,
+    wallet,
+)
+from app.services.db import Base
+
+# Tables small enough (or only ever read in full) that a scan is the right plan.
+SCAN_ALLOWED = {"return_points"}
+
+USERS = 50
+USER_ID = 7
+DRIVER_USER_ID = USERS + 1
+
+
+def _backends():
+    yield pytest.param("sqlite", id="sqlite")
+    pg_url = os.getenv("TEST_POSTGRES_URL")
+    yield pytest.param(
+        pg_url or "postgres",
+        id="postgres",
+        marks=pytest.mark.skipif(not pg_url, reason="TEST_POSTGRES_URL not set"),
+    )
+
+
+async def _seed(session: AsyncSession) -> None:
+    now = datetime.utcnow()
+    users = [
+        {"id": i, "email": f"u{i}@example.com", "password_hash": "x"} for i in range(1, USERS + 1)
+    ]
+    users.append({"id": DRIVER_USER_ID, "email": "driver@example.com", "password_hash": "x", "is_driver": True})
+    await session.execute(insert(User), users)
+    await session.execute(insert(Driver), [{"id": 1, "user_id": DRIVER_USER_ID, "zone": "D04"}])
+    await session.execute(
+        insert(ReturnPoint),
+        [{"external_id": f"rp{i}", "name": f"RP {i}", "type": "rvm", "lat": 53.3, "lng": -6.2} for i in range(5)],
+    )
+    await session.execute(
+        insert(Subscription),
+        [{"user_id": u, "status": "active", "plan_code": "monthly"} for u in range(1, USERS + 1)],
+    )
+    await session.execute(
+        insert(CollectionSlot),
+        [
+            {"user_id": u, "weekday": u % 7, "start_time": datetime(2026, 1, 1, 9).time(),
+             "end_time": datetime(2026, 1, 1, 11).time(), "status": "cancelled"}
+            for u in range(1, USERS + 1)
+        ],
+    )
+    statuses = ["scheduled", "assigned", "collected", "completed", "canceled"]
+    await session.execute(
+        insert(Collection),
+        [
+            {
+                "user_id": (i % USERS) + 1,
+                "return_point_id": 1,
+                "scheduled_at": now - timedelta(days=i),
+                "status": statuses[i % len(statuses)],
+                "driver_id": 1 if i % 3 == 0 else None,
+                "collection_slot_id": (i % USERS) + 1 if i % 4 == 0 else None,
+                "is_archived": i % 10 == 0,
+            }
+            for i in range(500)
+        ],
+    )
+    await session.execute(
+        insert(WalletTransaction),
+        [
+            {"user_id": (i % USERS) + 1, "ts": now - timedelta(hours=i), "kind": "collection_credit",
+             "amount_cents": 100, "note": f"Credit for collection #{i}"}
+            for i in range(500)
+        ],
+    )
+    await session.execute(
+        insert(DriverEarning),
+        [{"driver_id": 1, "collection_id": i, "amount_cents": 50} for i in range(1, 100)],
+    )
+    await session.execute(insert(DriverPayout), [{"driver_id": 1, "amount_cents": 100} for _ in range(10)])
+    await session.execute(
+        insert(Claim),
+        [{"user_id": (i % USERS) + 1, "description": "d", "status": ["open", "resolved"][i % 2]} for i in range(200)],
+    )
+    await session.execute(
+        insert(Notification),
+        [{"user_id": (i % USERS) + 1 if i % 5 else None, "title": "t", "body": "b"} for i in range(200)],
+    )
+    await session.commit()
+
+
+@pytest.fixture(params=list(_backends()))
+async def plan_db(request, tmp_path):
+    """Seeded engine and session factory for one backend."""
+    url = request.param
+    if url == "sqlite":
+        url = f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with SessionLocal() as session:
+        await _seed(session)
+
+    yield engine, SessionLocal
+
+    if engine.dialect.name == "postgresql":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def _sqlite_violations(conn, statement, parameters, allowed: set[str]) -> list[str]:
+    rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+    bad = []
+    for row in rows:
+        detail = row[-1]
+        m = re.match(r"SCAN (\w+)$", detail)
+        if m and m.group(1) not in allowed:
+            bad.append(detail)
+    return bad
+
+
+def _pg_seq_scans(node: dict, allowed: set[str]) -> list[str]:
+    found = []
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") not in allowed:
+        found.append(f"Seq Scan on {node.get('Relation Name')}")
+    for child in node.get("Plans", []):
+        found.extend(_pg_seq_scans(child, allowed))
+    return found
+
+
+async def _postgres_violations(conn, statement, parameters, allowed: set[str]) -> list[str]:
+    await conn.exec_driver_sql("SET enable_seqscan = off")
+    raw = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return _pg_seq_scans(plan[0]["Plan"], allowed)
+
+
+async def _assert_no_full_scans(plan_db, call, allowed: set[str] = SCAN_ALLOWED) -> None:
+    engine, SessionLocal = plan_db
+    captured: list[tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if statement.lstrip().upper().startswith(("SELECT", "INSERT")):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        async with SessionLocal() as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+
+    assert captured, "service call issued no SELECT/INSERT"
+    check = _postgres_violations if engine.dialect.name == "postgresql" else _sqlite_violations
+    failures = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            bad = await check(conn, statement, parameters, allowed)
+            if bad:
+                failures.append(f"{bad}\n  {' '.join(statement.split())}")
+    assert not failures, "full table scan in hot query:\n" + "\n".join(failures)
+
+
+HOT_QUERIES = {
+    "wallet.get_balance": lambda s: wallet.get_balance(s, USER_ID),
+    "wallet.get_history": lambda s: wallet.get_history(s, USER_ID, 2, 5),
+    "wallet.get_history(cursor)": lambda s: wallet.get_history(s, USER_ID, 1, 5, after=(datetime.utcnow(), 10**6)),
+    "subscriptions.get_me": lambda s: subscriptions.get_me(s, USER_ID),
+    "subscriptions.is_subscription_active": lambda s: subscriptions.is_subscription_active(s, USER_ID),
+    "collections.list_me": lambda s: collections.list_me(s, USER_ID, None, 1, 20),
+    "collections.list_me(status)": lambda s: collections.list_me(s, USER_ID, "completed", 1, 20),
+    "collections.list_me(cursor)": lambda s: collections.list_me(s, USER_ID, None, 1, 20, after=(datetime.utcnow(), 10**6)),
+    "collections.list_admin": lambda s: collections.list_admin(s, 50),
+    "collections.list_admin(cursor)": lambda s: collections.list_admin(s, 50, after=(datetime.utcnow(), 10**6)),
+    "collections.list_admin(status)": lambda s: collections.list_admin(s, 50, status="assigned"),
+    "collections.list_admin(dates)": lambda s: collections.list_admin(
+        s, 50, since=datetime.utcnow() - timedelta(days=30), until=datetime.utcnow()
+    ),
+    "collections.list_admin(driver)": lambda s: collections.list_admin(s, 50, driver_id=1),
+    "collections.list_admin(return_point)": lambda s: collections.list_admin(s, 50, return_point_id=1),
+    "collections.list_admin(zone)": lambda s: collections.list_admin(s, 50, zone="D04"),
+    "collection_slots.get_me": lambda s: collection_slots.get_me(s, USER_ID),
+    "drivers.get_driver_by_user_id": lambda s: drivers.get_driver_by_user_id(s, DRIVER_USER_ID),
+    "drivers.get_driver_collections": lambda s: drivers.get_driver_collections(s, DRIVER_USER_ID),
+    "driver_payouts.get_driver_balance": lambda s: driver_payouts.get_driver_balance(s, 1),
+    "driver_payouts.get_driver_earnings": lambda s: driver_payouts.get_driver_earnings(s, 1),
+    "driver_payouts.get_driver_payouts_list": lambda s: driver_payouts.get_driver_payouts_list(s, 1),
+    "claims.get_user_claims": lambda s: claims.get_user_claims(s, USER_ID),
+    "claims.get_all_claims(status)": lambda s: claims.get_all_claims(s, status="open"),
+    "notifications.get_user_notifications": lambda s: notifications.get_user_notifications(s, USER_ID),
+    "tokens.rotate_refresh_token": lambda s: tokens.rotate_refresh_token(s, "unknown-token"),
+}
+
+
+async def _swallow_value_error(coro) -> None:
+    try:
+        await coro
+    except ValueError:
+        pass
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_index(plan_db, name):
+    """The named service call never falls back to a full table scan."""
+    await _assert_no_full_scans(plan_db, lambda s: _swallow_value_error(HOT_QUERIES[name](s)))
+
+
+async def test_collection_create_validation_uses_indexes(plan_db):
+    """Booking validation (active slot + weekly limit) stays on indexes."""
+    when = (datetime.utcnow() + timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0)
+    await _assert_no_full_scans(
+        plan_db, lambda s: collections.create(s, USER_ID, when, 1, 1, None)
+    )
+
+
+async def test_recurring_generation_duplicate_check_uses_index(plan_db):
+    """The per-occurrence existence check in recurring generation is an index search."""
+    from app.services.recurring_generation import generate_collections
+
+    _, SessionLocal = plan_db
+    async with SessionLocal() as session:
+        await session.execute(
+            insert(CollectionSlot),
+            [{"user_id": USER_ID, "weekday": 2, "start_time": datetime(2026, 1, 1, 9).time(),
+              "end_time": datetime(2026, 1, 1, 11).time(), "status": "active", "preferred_return_point_id": 1}],
+        )
+        await session.commit()
+    await _assert_no_full_scans(plan_db, lambda s: generate_collections(s, weeks_ahead=2))
+
+
+async def test_dispatch_planning_uses_indexes(plan_db):
+    """Dispatch reads the day's collections by index; only the (small) driver roster is read in full."""
+    from app.services.dispatch import plan_dispatch
+
+    await _assert_no_full_scans(
+        plan_db, lambda s: plan_dispatch(s, datetime.utcnow().date()), allowed=SCAN_ALLOWED | {"drivers"}
+    )
@@ -0,0 +1,79 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.core.geo import DISTRICT_CENTROIDS
+from app.models import Collection, ReturnPoint
+from app.services.routes import order_stops, path_length_km, route_cache
+
+
+@pytest.fixture(autouse=True)
+def _empty_route_cache():
+    route_cache.clear()
+    yield
+    route_cache.clear()
+
+
+def test_order_stops_untangles_and_ends_at_drop_off():
+    # Four corners of a square visited in a crossing order; the drop-off sits beside corner 0.
+    square = [(53.30, -6.30), (53.34, -6.20), (53.30, -6.20), (53.34, -6.30)]
+    drop_off = (53.29, -6.30)
+    order = order_stops(square, drop_off)
+    assert sorted(order) == [0, 1, 2, 3]
+    assert order[-1] == 0  # finish next to the drop-off
+    route = [square[i] for i in order] + [drop_off]
+    naive = square + [drop_off]
+    assert path_length_km(route) < path_length_km(naive)
+
+    # No crossing edges remain: the perimeter order is optimal for a square.
+    assert order in ([1, 3, 2, 0], [3, 1, 2, 0], [2, 1, 3, 0])
+
+
+def test_order_stops_open_path():
+    line = [(53.0 + i * 0.01, -6.2) for i in (3, 0, 4, 1, 2)]
+    order = order_stops(line)
+    assert [line[i][0] for i in order] in (sorted(p[0] for p in line), sorted((p[0] for p in line), reverse=True))
+
+
+async def test_driver_route_is_ordered_and_cached_until_manifest_changes(client, app, driver_headers, admin_headers):
+    profile = (await client.get("/drivers/me/profile", headers=driver_headers)).json()
+    day = date(2026, 5, 12)
+    rp_lat, rp_lng = DISTRICT_CENTROIDS["D02"]
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(ReturnPoint),
+            [{"id": 50, "external_id": "route-rp", "name": "City RVM", "type": "rvm", "lat": rp_lat, "lng": rp_lng}],
+        )
+        addresses = ["1 Road, Dublin 15", "2 Road, D02 AC12", "3 Road, Dublin 7", "4 Road, Dublin 11", "Somewhere"]
+        await session.execute(
+            insert(Collection),
+            [
+                {"id": 300 + i, "user_id": 1, "return_point_id": 50, "driver_id": profile["id"], "status": "assigned",
+                 "scheduled_at": datetime(2026, 5, 12, 9 + i), "pickup_address": address}
+                for i, address in enumerate(addresses)
+            ],
+        )
+        await session.commit()
+
+    resp = await client.get(f"/drivers/me/route?date={day.isoformat()}", headers=driver_headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["cached"] is False
+    assert body["dropOff"]["returnPointId"] == 50
+    # Outermost district first, working in towards the drop-off in D02; the unlocatable stop goes last.
+    assert [s["collectionId"] for s in body["stops"]] == [300, 303, 302, 301, 304]
+    assert body["stops"][-1]["located"] is False
+
+    again = (await client.get(f"/drivers/me/route?date={day.isoformat()}", headers=driver_headers)).json()
+    assert again["cached"] is True and again["stops"] == body["stops"]
+    admin_view = (await client.get(f"/admin/drivers/{profile['id']}/route?date={day.isoformat()}", headers=admin_headers)).json()
+    assert admin_view["stops"] == body["stops"]
+    assert (await client.get("/admin/drivers/9999/route", headers=admin_headers)).status_code == 404
+
+    async with app.state.test_session_local() as session:
+        await session.execute(update(Collection).where(Collection.id == 303).values(status="canceled"))
+        await session.commit()
+    changed = (await client.get(f"/drivers/me/route?date={day.isoformat()}", headers=driver_headers)).json()
+    assert changed["cached"] is False
+    assert 303 not in [s["collectionId"] for s in changed["stops"]]
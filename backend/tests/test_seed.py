@@ -0,0 +1,56 @@
+"""Bulk synthetic data generator (app.scripts.seed.generate_bulk)."""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import Collection, Driver, DriverEarning, User, WalletTransaction
+from app.scripts.seed import BulkSpec, _parse_args, generate_bulk
+from app.services.db import Base
+from app.services.wallet import find_balance_drift
+
+
+async def test_generate_bulk_shapes_and_appends(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bulk.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    spec = BulkSpec(users=50, collections=400, drivers=3, batch_size=64)
+    async with SessionLocal() as session:
+        counts = await generate_bulk(session, spec)
+        assert counts["users"] == 50 + 3 + 1
+        assert counts["collections"] == 400
+        assert await session.scalar(select(func.count()).select_from(Driver)) == 3
+        # Every collected/completed collection with a driver earns exactly once.
+        assert counts["driver_earnings"] == await session.scalar(
+            select(func.count()).select_from(Collection).where(
+                Collection.status.in_(["collected", "completed"]), Collection.driver_id.is_not(None)
+            )
+        )
+        # Credits/donations mirror completed collections.
+        assert counts["wallet_transactions"] == await session.scalar(
+            select(func.count()).select_from(Collection).where(Collection.status == "completed")
+        )
+        assert await find_balance_drift(session) == []
+        statuses = set((await session.execute(select(Collection.status).distinct())).scalars())
+        assert statuses == {"scheduled", "assigned", "collected", "completed", "canceled"}
+
+        # A second run appends after the existing ids instead of colliding.
+        await generate_bulk(session, BulkSpec(users=10, collections=20, drivers=1, batch_size=64))
+        assert await session.scalar(select(func.count()).select_from(User)) == 54 + 12
+        assert await session.scalar(select(func.count()).select_from(DriverEarning)) >= counts["driver_earnings"]
+        assert await session.scalar(select(func.max(WalletTransaction.user_id))) <= 54 + 12
+    await engine.dispose()
+
+
+def test_bulk_rows_need_customers():
+    with pytest.raises(ValueError):
+        BulkSpec(users=0, collections=10)
+    with pytest.raises(ValueError):
+        BulkSpec(users=0, collections=0, notifications=5)
+    BulkSpec(users=0, collections=0, drivers=2)  # drivers alone are fine
+    for flag in ("--collections", "--claims", "--notifications"):
+        with pytest.raises(SystemExit):
+            _parse_args([flag, "10"])
+    assert _parse_args(["--users", "5", "--claims", "10"]).claims == 10
@@ -20,3 +20,149 @@ async def test_wallet_balance_with_auth(client, auth_headers):
     balance = resp.json()
     assert "balanceCents" in balance
     assert "lastUpdated" in balance
+
+
+async def test_wallet_balance_maintained_on_write(client, app, auth_headers):
+    """Ledger writes keep wallet_balances in step; reconciliation spots and repairs drift."""
+    from sqlalchemy import update
+
+    from app.models import WalletBalance
+    from app.services.wallet import add_transaction, find_balance_drift, rebuild_balances
+
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    async with app.state.test_session_local() as session:
+        await add_transaction(session, me["id"], "collection_credit", 500, note="Credit for collection #1")
+        await add_transaction(session, me["id"], "donation", 200, note="Donated — collection #2")
+        await add_transaction(session, me["id"], "collection_credit", 300, note="Credit for collection #3")
+        await session.commit()
+
+    resp = await client.get("/wallet/balance", headers=auth_headers)
+    assert resp.json()["balanceCents"] == 800  # donations are not spendable
+
+    async with app.state.test_session_local() as session:
+        row = await session.get(WalletBalance, me["id"])
+        assert row.version == 3
+        assert await find_balance_drift(session) == []
+
+        await session.execute(update(WalletBalance).values(balance_cents=1))
+        await session.commit()
+        drift = await find_balance_drift(session)
+        assert [(d["user_id"], d["stored_cents"], d["ledger_cents"]) for d in drift] == [(me["id"], 1, 800)]
+
+        await rebuild_balances(session, [me["id"]])
+        await session.commit()
+        assert await find_balance_drift(session) == []
+
+
+async def test_wallet_history_cursor_pagination(client, app, auth_headers):
+    """nextCursor walks the ledger newest-first by (ts, id), matching page/pageSize results."""
+    from datetime import datetime
+
+    from sqlalchemy import update
+
+    from app.models import WalletTransaction
+    from app.services.wallet import add_transaction
+
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    async with app.state.test_session_local() as session:
+        for i in range(7):
+            await add_transaction(session, me["id"], "collection_credit", 100 + i)
+        # Identical timestamps: the id tiebreak must keep pages disjoint.
+        await session.execute(update(WalletTransaction).values(ts=datetime(2026, 1, 1, 12)))
+        await session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/wallet/history?pageSize=3" + (f"&cursor={cursor}" if cursor else "")
+        body = (await client.get(url, headers=auth_headers)).json()
+        assert body["total"] == 7
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(seen, reverse=True) and len(set(seen)) == 7
+
+    paged = []
+    for page in (1, 2, 3):
+        body = (await client.get(f"/wallet/history?page={page}&pageSize=3", headers=auth_headers)).json()
+        paged.extend(item["id"] for item in body["items"])
+    assert paged == seen
+
+    resp = await client.get("/wallet/history?cursor=not-a-cursor", headers=auth_headers)
+    assert resp.status_code == 400
+
+
+async def test_collection_credit_is_idempotent_and_joined_into_history(client, app, auth_headers):
+    """A second credit for the same collection is a no-op; history carries the collection's status."""
+    from datetime import datetime
+
+    from app.models import Collection
+    from app.services.wallet import credit_wallet_for_collection
+
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    async with app.state.test_session_local() as session:
+        col = Collection(
+            user_id=me["id"], return_point_id=1, scheduled_at=datetime(2026, 1, 5, 10),
+            status="completed", proof_url="/uploads/proof.jpg",
+        )
+        session.add(col)
+        await session.flush()
+        first = await credit_wallet_for_collection(session, me["id"], col.id, 450)
+        again = await credit_wallet_for_collection(session, me["id"], col.id, 450)
+        await session.commit()
+    assert first is not None and again is None
+
+    assert (await client.get("/wallet/balance", headers=auth_headers)).json()["balanceCents"] == 450
+    items = (await client.get("/wallet/history", headers=auth_headers)).json()["items"]
+    assert len(items) == 1
+    assert items[0]["collectionId"] == col.id
+    assert items[0]["collectionStatus"] == "completed"
+    assert items[0]["proofUrl"] == "/uploads/proof.jpg"
+
+
+async def test_wallet_export_streams_csv_and_ndjson(client, app, auth_headers, admin_headers):
+    """Export spans many cursor chunks, carries a running balance, and the admin variant covers all users."""
+    import csv
+    import io
+    import json
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from app.models import WalletTransaction
+    from app.services.statements import STATEMENT_CHUNK_ROWS
+
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    start = datetime(2026, 1, 1)
+    rows = STATEMENT_CHUNK_ROWS * 2 + 500
+    async with app.state.test_session_local() as session:
+        await session.execute(
+            insert(WalletTransaction),
+            [
+                {"user_id": me["id"], "ts": start + timedelta(minutes=i), "kind": "collection_credit", "amount_cents": 10}
+                for i in range(rows)
+            ]
+            + [{"user_id": me["id"] + 1000, "ts": start, "kind": "collection_credit", "amount_cents": 5}],
+        )
+        await session.commit()
+
+    resp = await client.get("/wallet/export", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    lines = list(csv.reader(io.StringIO(resp.text)))
+    assert lines[0][-1] == "balance_cents"
+    assert len(lines) == rows + 1
+    assert lines[-1][-1] == str(rows * 10)
+
+    resp = await client.get(
+        "/wallet/export?format=ndjson&since=2026-01-01T00:10:00&until=2026-01-01T00:20:00", headers=auth_headers
+    )
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(records) == 10 and all(r["user_id"] == me["id"] for r in records)
+    # The running balance opens at what the 10 earlier credits already added up to.
+    assert [r["balance_cents"] for r in records[:2]] == [110, 120]
+
+    assert (await client.get("/admin/wallet/export", headers=auth_headers)).status_code == 403
+    resp = await client.get("/admin/wallet/export?format=ndjson", headers=admin_headers)
+    assert len(resp.text.splitlines()) == rows + 1
@@ -28,6 +28,7 @@ export type AdminCollection = {
   proof_url: string | null
   collection_slot_id: number | null
   collection_type: string | null
+  version?: number
 }
 
 export type AdminDriver = {
@@ -82,9 +83,24 @@ export function fetchAdminMetrics(): Promise<AdminMetrics> {
   return adminFetch<AdminMetrics>('/admin/metrics')
 }
 
+export type AdminCollectionsPage = {
+  items: AdminCollection[]
+  nextCursor: string | null
+}
+
+export function fetchAdminCollectionsPage(
+  params: { status?: string; cursor?: string; limit?: number } = {},
+): Promise<AdminCollectionsPage> {
+  const search = new URLSearchParams()
+  if (params.status) search.set('status', params.status)
+  if (params.cursor) search.set('cursor', params.cursor)
+  if (params.limit) search.set('limit', String(params.limit))
+  const qs = search.toString()
+  return adminFetch<AdminCollectionsPage>(`/admin/collections${qs ? `?${qs}` : ''}`)
+}
+
 export function fetchAdminCollections(status?: string): Promise<AdminCollection[]> {
-  const qs = status ? `?status=${encodeURIComponent(status)}` : ''
-  return adminFetch<AdminCollection[]>(`/admin/collections${qs}`)
+  return fetchAdminCollectionsPage({ status }).then((page) => page.items)
 }
 
 export function fetchAdminDrivers(): Promise<AdminDriver[]> {
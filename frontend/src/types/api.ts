@@ -26,6 +26,7 @@ export interface WalletHistoryResponse {
   total: number
   page: number
   pageSize: number
+  nextCursor?: string | null
 }
 
 export interface ClaimSubmitResponse {
@@ -99,13 +100,15 @@ export interface Collection {
   collectionType?: 'bottles' | 'glass' | 'both' | null
   createdAt: string
   updatedAt: string
+  version?: number // pass back as ?version= to reject stale transitions (409)
 }
 
 export interface CollectionsResponse {
   items: Collection[]
-  total: number
+  total: number | null // null on cursor pages
   page: number
   pageSize: number
+  nextCursor?: string | null
 }
 
 export interface DriverProfile {
@@ -135,6 +138,7 @@ export interface DriverCollection {
   collectionType?: 'bottles' | 'glass' | 'both' | null
   createdAt: string
   updatedAt: string
+  version?: number
 }
 
 export interface DriverEarning {